@@ -1,5 +1,7 @@
 from django.contrib import admin, messages
 from apps.dashboard.models import Portfolio, StockHolding, transaction, deposit, AppSecret, Ticker, TickerData, MarketRefreshState
+from apps.dashboard.services.dashboard_versions import bump_portfolio_versions
+from apps.dashboard.services.pnl import on_transactions_changed
 
 
 def reset_model_data(modeladmin, request, queryset):
@@ -21,6 +23,7 @@ def reset_portfolio(modeladmin, request, queryset):
         #TickerData.objects.filter(portfolio=portfolio).delete()
     # Ticker.objects.all().delete()
     # TickerData.objects.all().delete()
+    bump_portfolio_versions(queryset.values_list("id", flat=True))
     
     messages.success(
         request,
@@ -36,6 +39,10 @@ class PortfolioAdmin(admin.ModelAdmin):
     search_fields = ("name",)
     actions = [reset_portfolio]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_portfolio_versions([obj.pk])
+
 
 @admin.register(StockHolding)
 class HoldingAdmin(admin.ModelAdmin):
@@ -43,6 +50,15 @@ class HoldingAdmin(admin.ModelAdmin):
     list_filter = ('portfolio','Exchange',)
     search_fields = ("company_symbol",)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_portfolio_versions([obj.portfolio_id])
+
+    def delete_model(self, request, obj):
+        portfolio_id = obj.portfolio_id
+        super().delete_model(request, obj)
+        bump_portfolio_versions([portfolio_id])
+
 
 @admin.register(transaction)
 class transactionAdmin(admin.ModelAdmin):
@@ -50,12 +66,43 @@ class transactionAdmin(admin.ModelAdmin):
     list_filter = ('Holding__portfolio','transaction_type','symbol')
     search_fields = ("symbol",)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        on_transactions_changed([obj.Holding.portfolio_id], [obj.symbol])
+
+    def delete_model(self, request, obj):
+        portfolio_id, symbol = obj.Holding.portfolio_id, obj.symbol
+        super().delete_model(request, obj)
+        on_transactions_changed([portfolio_id], [symbol])
+
+    def delete_queryset(self, request, queryset):
+        affected = list(queryset.values_list("Holding__portfolio_id", "symbol").distinct())
+        super().delete_queryset(request, queryset)
+        on_transactions_changed({p for p, _ in affected}, {s for _, s in affected})
+
 @admin.register(deposit)
 class depositAdmin(admin.ModelAdmin):
     list_display = ('portfolio','currency','total_amount','date_transaction')
     list_filter = ('portfolio',)
     search_fields = ('portfolio',"currency",)
 
+    # Deposits feed the NAV, so they refresh like transactions do
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        since = min(filter(None, [obj.date_transaction, form.initial.get("date_transaction")]))
+        on_transactions_changed([obj.portfolio_id], [], since=since)
+
+    def delete_model(self, request, obj):
+        portfolio_id, since = obj.portfolio_id, obj.date_transaction
+        super().delete_model(request, obj)
+        on_transactions_changed([portfolio_id], [], since=since)
+
+    def delete_queryset(self, request, queryset):
+        rows = list(queryset.values_list("portfolio_id", "date_transaction"))
+        super().delete_queryset(request, queryset)
+        if rows:
+            on_transactions_changed({p for p, _ in rows}, [], since=min(d for _, d in rows))
+
 @admin.register(AppSecret)
 class AppSecretAdmin(admin.ModelAdmin):
     list_display = ('portfolio',"type",'key','description', "is_active")
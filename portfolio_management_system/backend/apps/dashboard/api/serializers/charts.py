@@ -0,0 +1,5 @@
+from rest_framework import serializers
+
+class ChartQuerySerializer(serializers.Serializer):
+    # Downsample long series to at most this many points (default: every point)
+    max_points = serializers.IntegerField(required=False, min_value=10, max_value=5000)
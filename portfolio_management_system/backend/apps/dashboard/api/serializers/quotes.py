@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+class LatestQuoteSerializer(serializers.Serializer):
+    ticker_code = serializers.CharField()
+    symbol = serializers.CharField()
+    last_date = serializers.DateField(allow_null=True)
+    last_close = serializers.FloatField(allow_null=True)
+    prev_date = serializers.DateField(allow_null=True)
+    prev_close = serializers.FloatField(allow_null=True)
+    change = serializers.FloatField(allow_null=True)
+    change_pct = serializers.FloatField(allow_null=True)
+    as_of = serializers.DateTimeField(allow_null=True)
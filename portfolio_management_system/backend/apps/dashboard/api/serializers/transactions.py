@@ -6,4 +6,13 @@ class TransactionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = transaction
-        fields = "__all__"   # or list fields explicitly
\ No newline at end of file
+        fields = "__all__"   # or list fields explicitly
+
+class TransactionQuerySerializer(serializers.Serializer):
+    portfolio = serializers.CharField(required=False, default="all")
+    symbol = serializers.CharField(required=False)
+    type = serializers.ListField(child=serializers.CharField(), required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(required=False, default=50, min_value=1, max_value=200)
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from apps.dashboard.api.serializers.csv_import import CSVUploadSerializer
 from apps.dashboard.models import Portfolio, StockHolding, transaction as TxnModel, deposit as DepositModel
+from apps.dashboard.services.pnl import on_transactions_changed
 from apps.dashboard.services.csv_importer import process_csv_rows  # recommended to move logic here
 
 
@@ -87,6 +88,8 @@ class CSVUploadAPI(APIView):
                     StockHolding.objects.filter(portfolio__id=portfolio_id).delete()
                     DepositModel.objects.filter(portfolio__id=portfolio_id).delete()
                     TxnModel.objects.filter(Holding__portfolio__id=portfolio_id).delete()  # if txn has portfolio FK
+                    # Symbols missing from the new file lose their ledger/PnL/NAV history too
+                    on_transactions_changed([portfolio_id])
                 # Prefer to move this into services/csv_importer.py
                 result = process_csv_rows(
                     file_obj=df,
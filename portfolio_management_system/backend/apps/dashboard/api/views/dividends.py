@@ -10,7 +10,9 @@ from apps.dashboard.api.serializers.dividends import (
     DividendConfirmSerializer,
 )
 from apps.dashboard.services.holdings import update_holdings
-import yfinance as yf
+from apps.dashboard.services.ledger import positions_as_of
+from apps.dashboard.services.pnl import on_transactions_changed
+from apps.dashboard.services.providers import get_provider
 from datetime import datetime
 import pandas as pd
 
@@ -37,6 +39,7 @@ class CheckDividendsAPI(APIView):
         if portfolio_id != "all":
             portfolios = portfolios.filter(id=portfolio_id)
 
+        portfolio_ids = list(portfolios.values_list("id", flat=True))
         user_transactions = transaction.objects.filter(
             Holding__portfolio__in=portfolios
         )
@@ -47,8 +50,8 @@ class CheckDividendsAPI(APIView):
         if not symbols:
             return Response([])
         
-        tickers = yf.download(list(symbols),actions=True,period="1y")
-        tickers=tickers['Dividends']
+        today = date.today()
+        tickers = get_provider().dividends(list(symbols), start=today - timedelta(days=365), end=today + timedelta(days=1))
 
         for ticker_n in tickers.columns:
             ticker = tickers[ticker_n]
@@ -78,19 +81,9 @@ class CheckDividendsAPI(APIView):
                     #print(f"Dividend for {symbol} with total {div_per_share} on {ex_date} already recorded")
                     continue
 
-                buys = user_transactions.filter(
-                    symbol=symbol,
-                    transaction_type="Buy",
-                    date_transaction__lte=ex_date,
-                )
-                sells = user_transactions.filter(
-                    symbol=symbol,
-                    transaction_type="Sell",
-                    date_transaction__lte=ex_date,
-                )
-                net_shares = sum(t.Quantity for t in buys) - sum(
-                    t.Quantity for t in sells
-                )
+                # Shares held on the ex-date, summed over the selected portfolios
+                held = positions_as_of(portfolio_ids, ex_date, [symbol])
+                net_shares = sum(row.quantity for row in held.values())
                 if net_shares <= 0:
                         #print(f"Dividend for {symbol} with total {div_per_share} on {ex_date} not eligible")
                         continue
@@ -114,9 +107,10 @@ class CheckDividendsAPI(APIView):
 
 class ConfirmDividendAPI(APIView):
     """
-    Confirms a single dividend:
-    - Adds a `Dividend Deposit` transaction
-    - (Optionally) handles dividend reinvestment (DRIP)
+    Confirms a single dividend, paid either:
+    - in cash: a `Dividend Deposit` transaction, or
+    - in shares (DRIP, `reinvest` with a `price`): a `Dividend Reinvestment`
+      transaction instead, so the same dividend is not booked twice
     """
     permission_classes = [IsAuthenticated]
 
@@ -137,18 +131,6 @@ class ConfirmDividendAPI(APIView):
         if not amount:
             return Response({"error": "Missing amount"}, status=400)
 
-        # Dividend Deposit transaction
-        transaction.objects.create(
-            Holding=h,
-            symbol=symbol,
-            date_transaction=ex_date,
-            Buy_Price=0,
-            Quantity=0,
-            Total=amount,
-            transaction_type="Dividend Deposit",
-            Commission=0
-        )
-
         # Dividend reinvestment (DRIP)
         if reinvest and price:
             qty = float(amount) / float(price)
@@ -162,7 +144,20 @@ class ConfirmDividendAPI(APIView):
                 transaction_type="Dividend Reinvestment",
                 Commission=0
             )
+        else:
+            # Dividend Deposit transaction
+            transaction.objects.create(
+                Holding=h,
+                symbol=symbol,
+                date_transaction=ex_date,
+                Buy_Price=0,
+                Quantity=0,
+                Total=amount,
+                transaction_type="Dividend Deposit",
+                Commission=0
+            )
 
+        on_transactions_changed([h.portfolio_id], [symbol], since=ex_date)
         return Response({"success": True, "message": "Dividend confirmed"})
 
 
@@ -231,6 +226,7 @@ class ConfirmMultipleDividendsAPI(APIView):
                 transaction_type="Dividend Deposit",
                 Commission=0
             )
+            on_transactions_changed([holding.portfolio_id], [symbol], since=ex_date)
 
             # Reinvestment
             if reinvest and price:
@@ -14,6 +14,7 @@ from apps.dashboard.api.serializers.emails import (
 from apps.dashboard.services.stake_emails import fetch_stake_trades_for_user
 from apps.dashboard.services.secrets import get_secret
 from apps.dashboard.services.holdings import update_holdings
+from apps.dashboard.services.pnl import on_transactions_changed
 
 
 class FetchStakeEmailsAPI(APIView):
@@ -122,5 +123,6 @@ class ConfirmStakeTransactionAPI(APIView):
             transaction_type=trade_type,
             Commission=commission,
         )
+        on_transactions_changed([portfolio_id], [symbol], since=trade_date)
 
         return Response({"status": "success", "message": "Transaction added"})
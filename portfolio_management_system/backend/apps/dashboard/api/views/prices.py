@@ -1,10 +1,15 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework import status
 from django.core.cache import cache
+from apps.dashboard.api.serializers.charts import ChartQuerySerializer
+from apps.dashboard.services.downsample import lttb_indices
 from apps.dashboard.services.market_data import get_prices
 from apps.dashboard.services.market_schedule import schedule_market_refresh_if_needed
+from apps.dashboard.services.price_cache import price_cache
+from apps.dashboard.services.quotes import get_latest_quotes
+from apps.dashboard.api.serializers.quotes import LatestQuoteSerializer
 from apps.dashboard.tasks.price_tasks import update_symbol_prices_task
 from apps.dashboard.models import StockHolding, Portfolio
 from datetime import datetime, timedelta
@@ -43,7 +48,9 @@ class UpdatePricesAPI(APIView):
 
 class PriceHistoryAPI(APIView):
     """
-    GET /api/v1/dashboard/prices/history/?symbol=BHP.AX&range=1y
+    GET /api/v1/dashboard/prices/history/?symbol=BHP.AX&range=1y&max_points=500
+
+    `max_points` (optional) keeps at most that many bars, chosen by LTTB on Close.
     """
     permission_classes = [IsAuthenticated]
 
@@ -55,6 +62,9 @@ class PriceHistoryAPI(APIView):
 
         symbol = request.GET.get("symbol")
         range_ = request.GET.get("range", "1y")
+        query = ChartQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        max_points = query.validated_data.get("max_points")
 
         if not symbol:
             return Response({"error": "symbol required"}, status=400)
@@ -71,7 +81,7 @@ class PriceHistoryAPI(APIView):
         days = ranges.get(range_, 365)
         start_date = datetime.today() - timedelta(days=days)
 
-        cache_key = f"prices:{symbol}:{range_}"
+        cache_key = f"prices:{symbol}:{range_}:{max_points or 'all'}"
         cached = cache.get(cache_key)
 
         if cached:
@@ -83,6 +93,9 @@ class PriceHistoryAPI(APIView):
             return Response({"error": "No price data found"}, status=400)
 
         df = df["Close"] if isinstance(df.columns, pd.MultiIndex) else df
+        if max_points:
+            close = df["Close"] if isinstance(df, pd.DataFrame) else df
+            df = df.iloc[lttb_indices(close.to_numpy(), max_points)]
         df_json = df.to_json()
 
         cache.set(cache_key, df_json, timeout=86400)  # 24 hours
@@ -111,4 +124,43 @@ class UpdatePortfolioTickersAPI(APIView):
             "status": "queued",
             "task_id": job.id,
             "symbols": symbols
-        })
\ No newline at end of file
+        })
+
+
+class QuotesAPI(APIView):
+    """
+    GET /api/v1/dashboard/prices/quotes/?symbols=BHP,CBA.AX
+
+    Last/previous close for many symbols in one call. Without `symbols`,
+    returns quotes for every symbol held across the user's portfolios.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        symbols = [
+            s.strip()
+            for raw in request.GET.getlist("symbols")
+            for s in raw.split(",")
+            if s.strip()
+        ]
+        if not symbols:
+            symbols = list(
+                StockHolding.objects.filter(portfolio__user=request.user)
+                .values_list("company_symbol", flat=True)
+                .distinct()
+            )
+
+        quotes = get_latest_quotes(symbols)
+        return Response({"quotes": LatestQuoteSerializer(quotes, many=True).data})
+
+
+class PriceCacheStatsAPI(APIView):
+    """
+    GET /api/v1/dashboard/prices/cache-stats/
+
+    Hit/miss counters of the get_prices cache for the worker serving the request.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(price_cache.stats())
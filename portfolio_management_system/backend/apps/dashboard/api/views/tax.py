@@ -7,7 +7,6 @@ from rest_framework import status
 from rest_framework.views import APIView
 
 from apps.dashboard.models import Portfolio, transaction, deposit
-from apps.dashboard.services.pnl import annotate_realized_pnl
 
 
 def financial_years_since(start_date):
@@ -88,8 +87,9 @@ class TaxOverviewAPI(APIView):
         start_date = date(start_year, 7, 1)
         end_date = date(end_year, 6, 30)
 
-        txns_data = list(
-            txns_qs.values(
+        # realized_pnl / dividends_paid are the stored FIFO values (services.pnl)
+        txns_filtered = list(
+            txns_qs.filter(date_transaction__range=[start_date, end_date]).values(
                 "id",
                 "symbol",
                 "date_transaction",
@@ -99,15 +99,11 @@ class TaxOverviewAPI(APIView):
                 "transaction_type",
                 "Commission",
                 "portfolio_name",
+                "realized_pnl",
+                "dividends_paid",
             )
         )
 
-        txns_dict = annotate_realized_pnl(txns_data)
-        txns_filtered = [
-            t for t in txns_dict
-            if start_date <= t["date_transaction"] <= end_date
-        ]
-
         deposits_sum = deposit.objects.filter(
             portfolio__in=portfolios,
             date_transaction__range=[start_date, end_date],
@@ -0,0 +1,85 @@
+import base64
+from datetime import date
+
+from django.db.models import F, Q
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.dashboard.api.serializers.transactions import TransactionQuerySerializer, TransactionSerializer
+from apps.dashboard.models import Portfolio, transaction
+
+
+def encode_cursor(day: date, pk: int) -> str:
+    return base64.urlsafe_b64encode(f"{day.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    day, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return date.fromisoformat(day), int(pk)
+
+
+class TransactionListAPI(APIView):
+    """
+    Transaction history, newest first, keyset-paginated on (date_transaction, id).
+
+    Query params:
+      - portfolio: portfolio id or 'all' (default 'all')
+      - symbol: base ticker ("BHP") or full symbol ("BHP.AX")
+      - type: transaction type, repeatable (e.g. type=Buy&type=Sell)
+      - date_from / date_to: YYYY-MM-DD, inclusive
+      - page_size: 1-200 (default 50)
+      - cursor: `next_cursor` of the previous page
+
+    realized_pnl / dividends_paid are the stored FIFO values
+    (services.pnl.recompute_realized_pnl), computed per portfolio.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = TransactionQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        q = query.validated_data
+
+        portfolios = Portfolio.objects.filter(user=request.user)
+        if q["portfolio"] != "all":
+            portfolios = portfolios.filter(id=q["portfolio"]) if q["portfolio"].isdigit() else portfolios.none()
+            if not portfolios.exists():
+                return Response({"detail": "Portfolio not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        txns = transaction.objects.filter(Holding__portfolio__in=portfolios)
+        if q.get("symbol"):
+            symbol = q["symbol"].upper()
+            base = symbol.split(".")[0]
+            txns = txns.filter(Q(symbol__iexact=symbol) | Q(symbol__iexact=base) | Q(symbol__istartswith=base + "."))
+        if q.get("type"):
+            txns = txns.filter(transaction_type__in=q["type"])
+        if q.get("date_from"):
+            txns = txns.filter(date_transaction__gte=q["date_from"])
+        if q.get("date_to"):
+            txns = txns.filter(date_transaction__lte=q["date_to"])
+
+        if q.get("cursor"):
+            try:
+                day, pk = decode_cursor(q["cursor"])
+            except ValueError:
+                return Response({"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+            txns = txns.filter(Q(date_transaction__lt=day) | Q(date_transaction=day, id__lt=pk))
+
+        page_size = q["page_size"]
+        rows = list(
+            txns.annotate(portfolio_name=F("Holding__portfolio__name"))
+            .order_by("-date_transaction", "-id")[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        return Response(
+            {
+                "results": TransactionSerializer(rows, many=True).data,
+                "next_cursor": encode_cursor(rows[-1].date_transaction, rows[-1].id) if has_more else None,
+                "page_size": page_size,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -4,11 +4,12 @@ from apps.dashboard.api.views.performance import PortfolioPerformanceAPI
 from apps.dashboard.api.views.dividends import CheckDividendsAPI,ConfirmDividendAPI,ConfirmMultipleDividendsAPI
 from apps.dashboard.api.views.csv_import import CSVUploadAPI, UpdateHoldingsAPI, TransactionFormAPI
 from apps.dashboard.api.views.emails import FetchStakeEmailsAPI,ConfirmStakeTransactionAPI
-from apps.dashboard.api.views.prices import UpdatePricesAPI,PriceHistoryAPI, UpdatePortfolioTickersAPI
+from apps.dashboard.api.views.prices import UpdatePricesAPI,PriceHistoryAPI, UpdatePortfolioTickersAPI, PriceCacheStatsAPI, QuotesAPI
 from apps.dashboard.api.views.financials import FinancialsAPI
 from apps.dashboard.api.views.insights import PortfolioInsightsAPI
 from apps.dashboard.api.views.backtesting import BacktestingAPI
 from apps.dashboard.api.views.tax import TaxOverviewAPI
+from apps.dashboard.api.views.transactions import TransactionListAPI
 
 urlpatterns = [
     path("portfolios/", UserPortfoliosAPI.as_view(), name="user_portfolios"),
@@ -24,6 +25,7 @@ urlpatterns = [
     path("csv/upload/", CSVUploadAPI.as_view(), name="csv_upload"),
     path("csv/update-holdings/", UpdateHoldingsAPI.as_view(), name="csv_update_holdings"),
     path("transactions/add/", TransactionFormAPI.as_view(), name="transactions_add"),
+    path("transactions/", TransactionListAPI.as_view(), name="transactions_list"),
     
     #Emails
     path("emails/fetch-stake/", FetchStakeEmailsAPI.as_view(), name="emails_fetch_stake"),
@@ -33,6 +35,8 @@ urlpatterns = [
     path("prices/update/", UpdatePricesAPI.as_view(), name="prices_update"),
     path("prices/history/", PriceHistoryAPI.as_view(), name="prices_history"),
     path("prices/update-portfolio/", UpdatePortfolioTickersAPI.as_view(), name="update_portfolio_tickers"),
+    path("prices/quotes/", QuotesAPI.as_view(), name="prices_quotes"),
+    path("prices/cache-stats/", PriceCacheStatsAPI.as_view(), name="prices_cache_stats"),
 
     #Tax
     path("tax/", TaxOverviewAPI.as_view(), name="tax_overview"),
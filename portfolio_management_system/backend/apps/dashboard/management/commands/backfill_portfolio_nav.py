@@ -0,0 +1,30 @@
+"""Write the daily PortfolioNAV history of portfolios."""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.models import Portfolio
+from apps.dashboard.services.nav import recompute_portfolio_nav
+
+
+class Command(BaseCommand):
+    help = "Backfill (or rewrite) PortfolioNAV rows up to the last closed session."
+
+    def add_arguments(self, parser):
+        parser.add_argument("portfolio_ids", nargs="*", type=int, help="Portfolio ids (default: all portfolios)")
+        parser.add_argument(
+            "--since", type=date.fromisoformat,
+            help="Rewrite from this date (YYYY-MM-DD) instead of the first transaction",
+        )
+
+    def handle(self, *args, **options):
+        portfolios = Portfolio.objects.all()
+        if options["portfolio_ids"]:
+            portfolios = portfolios.filter(id__in=options["portfolio_ids"])
+        portfolio_ids = list(portfolios.values_list("id", flat=True))
+        if not portfolio_ids:
+            raise CommandError("No portfolios to backfill")
+
+        written = recompute_portfolio_nav(portfolio_ids, options["since"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} NAV rows for {len(portfolio_ids)} portfolios"))
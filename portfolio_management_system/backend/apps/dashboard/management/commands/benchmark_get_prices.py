@@ -0,0 +1,81 @@
+"""Compare the per-row ORM read path with the columnar get_prices path."""
+
+import time
+from datetime import date
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.models import Ticker, TickerData
+from apps.dashboard.services.market_data import (
+    bars_to_frame,
+    load_price_columns,
+)
+
+
+def _load_rows_orm(tickers, start, end):
+    """The original loader: one model instance (and ticker lookup) per row."""
+    data_qs = (
+        TickerData.objects.filter(
+            ticker__in=tickers,
+            date__gte=start,
+            date__lte=end,
+        )
+        .order_by("ticker", "date")
+    )
+    records = []
+    for d in data_qs:
+        records.append(
+            {
+                "symbol": d.ticker.symbol,
+                "Date": d.date,
+                "Open": d.open,
+                "High": d.high,
+                "Low": d.low,
+                "Close": d.close,
+                "Volume": d.volume,
+            }
+        )
+    df = pd.DataFrame(records)
+    if not df.empty:
+        df["Date"] = pd.to_datetime(df["Date"])
+        df = df.set_index("Date")
+    return df
+
+
+def _load_rows_columnar(tickers, start, end):
+    pairs = list(tickers.values_list("id", "symbol"))
+    return bars_to_frame(load_price_columns(pairs, start, end))
+
+
+class Command(BaseCommand):
+    help = "Benchmark rows/sec of the ORM vs columnar TickerData read paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument("symbols", nargs="*", help="Base tickers (default: all tickers)")
+        parser.add_argument("--start", default="2000-01-01", help="YYYY-MM-DD")
+        parser.add_argument("--end", default=None, help="YYYY-MM-DD (default: today)")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        tickers = Ticker.objects.all()
+        if options["symbols"]:
+            tickers = tickers.filter(ticker__in=options["symbols"])
+        if not tickers.exists():
+            raise CommandError("No tickers to benchmark")
+
+        start = date.fromisoformat(options["start"])
+        end = date.fromisoformat(options["end"]) if options["end"] else date.today()
+
+        for label, loader in (("orm", _load_rows_orm), ("columnar", _load_rows_columnar)):
+            best = None
+            rows = 0
+            for _ in range(max(options["repeat"], 1)):
+                t0 = time.perf_counter()
+                df = loader(tickers, start, end)
+                elapsed = time.perf_counter() - t0
+                rows = len(df)
+                best = elapsed if best is None else min(best, elapsed)
+
+            rate = rows / best if best else 0.0
+            self.stdout.write(f"{label:>9}: {rows} rows in {best:.3f}s ({rate:,.0f} rows/sec)")
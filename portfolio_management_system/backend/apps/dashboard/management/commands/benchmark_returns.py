@@ -0,0 +1,89 @@
+"""Time the position replay and the TWR / XIRR engine on synthetic portfolios."""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.services.performance import replay_positions
+from apps.dashboard.services.returns import cumulative_twr, xirr_from_nav
+
+
+def _synthetic_portfolio(rng, days, prices, transactions):
+    """Random buys/sells over `days`, funded by monthly deposits."""
+    symbols = list(prices.columns)
+    picks = rng.integers(0, len(days), transactions)
+    txns = [
+        (
+            symbols[rng.integers(len(symbols))],
+            days[i].date(),
+            "Buy" if rng.random() < 0.7 else "Sell",
+            float(rng.integers(1, 50)),
+            float(prices.iat[i, 0]),
+            9.5,
+            0.0,
+        )
+        for i in picks
+    ]
+    deposits = [(d.date(), 5000.0) for d in days[::21]]
+    return txns, deposits
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the vectorized replay and returns engine: replay N-transaction portfolios "
+        "into daily NAV, then solve TWR and XIRR for all of them at once vs one at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--portfolios", type=int, default=20)
+        parser.add_argument("--transactions", type=int, default=10_000, help="Transactions per portfolio")
+        parser.add_argument("--symbols", type=int, default=50)
+        parser.add_argument("--years", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        end = date.today()
+        days = pd.bdate_range(end - timedelta(days=365 * options["years"]), end)
+        walk = np.exp(np.cumsum(rng.normal(0, 0.01, (len(days), options["symbols"])), axis=0)) * 20
+        prices = pd.DataFrame(walk, index=days, columns=[f"S{i}" for i in range(options["symbols"])])
+
+        portfolios = [
+            _synthetic_portfolio(rng, days, prices, options["transactions"])
+            for _ in range(options["portfolios"])
+        ]
+
+        t0 = time.perf_counter()
+        frames = [replay_positions(days, txns, deposits, prices) for txns, deposits in portfolios]
+        replay = time.perf_counter() - t0
+
+        nav = np.vstack([f["CashValue"].to_numpy() for f in frames])
+        flows = np.vstack([f["CashDeposits"].diff().fillna(f["CashDeposits"].iloc[0]).to_numpy() for f in frames])
+        offsets = (days - days[0]).days.to_numpy()
+
+        t0 = time.perf_counter()
+        twr = cumulative_twr(nav, flows)
+        rates = xirr_from_nav(nav, flows, offsets)
+        batched = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        single = [xirr_from_nav(nav[i], flows[i], offsets)[0] for i in range(len(nav))]
+        looped = time.perf_counter() - t0
+
+        n = options["portfolios"]
+        self.stdout.write(
+            f"{n} portfolios x {options['transactions']} transactions, {len(days)} days, "
+            f"{options['symbols']} symbols"
+        )
+        self.stdout.write(f"  replay to daily NAV: {replay:.3f}s ({replay / n * 1000:.1f} ms/portfolio)")
+        self.stdout.write(f"  TWR + XIRR batched:  {batched * 1000:.1f} ms")
+        self.stdout.write(f"  XIRR one at a time:  {looped * 1000:.1f} ms")
+        solved = int(np.isfinite(rates).sum())
+        agree = np.allclose(rates, single, equal_nan=True)
+        self.stdout.write(
+            f"  solved {solved}/{n}, batched == looped: {agree}, "
+            f"median TWR {np.median(twr[:, -1]) * 100:.2f}%, median XIRR {np.nanmedian(rates) * 100:.2f}%"
+        )
@@ -0,0 +1,72 @@
+"""Benchmark serial vs concurrent provider fetches against a local fake provider."""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.models import Ticker
+from apps.dashboard.services.ticker_sync import FetchJob, fetch_concurrently
+
+
+def make_fake_provider(latency: float):
+    """A stand-in for yf.download: sleeps `latency` seconds, returns synthetic bars."""
+
+    def fetch(tickers, start, end, progress=False, auto_adjust=True, timeout=None):
+        time.sleep(latency)
+        symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+        days = pd.bdate_range(start, end, name="Date")
+        columns = pd.MultiIndex.from_product(
+            [["Close", "High", "Low", "Open", "Volume"], symbols], names=["Price", "Ticker"]
+        )
+        df = pd.DataFrame(np.ones((len(days), len(columns))), index=days, columns=columns)
+        return df, df
+
+    return fetch
+
+
+class Command(BaseCommand):
+    help = "Compare serial and pooled market-data fetches using a fake provider (no network)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=40, help="Provider requests to issue")
+        parser.add_argument("--latency", type=float, default=0.25, help="Simulated seconds per request")
+        parser.add_argument("--concurrency", type=int, default=None)
+        parser.add_argument(
+            "--rate", type=float, default=None,
+            help="Requests/sec for both runs (default: MARKET_DATA_RATE_LIMIT, 0 = unlimited)",
+        )
+
+    def handle(self, *args, **options):
+        end = date.today()
+        start = end - timedelta(days=30)
+        jobs = [
+            FetchJob(
+                start=start,
+                end=end,
+                members=[(f"FAKE{i}", Ticker(ticker=f"FAKE{i}", symbol=f"FAKE{i}.AX"))],
+                download_symbols=[f"FAKE{i}.AX"],
+            )
+            for i in range(options["jobs"])
+        ]
+        provider = make_fake_provider(options["latency"])
+        concurrency = options["concurrency"] or settings.MARKET_DATA_FETCH_CONCURRENCY
+        rate = settings.MARKET_DATA_RATE_LIMIT if options["rate"] is None else options["rate"]
+
+        timings = {}
+        # Same limit for both passes, so the difference is the pool alone
+        for label, workers in (("serial", 1), ("pooled", concurrency)):
+            t0 = time.perf_counter()
+            results = list(fetch_concurrently(jobs, fetcher=provider, concurrency=workers, rate=rate))
+            timings[label] = time.perf_counter() - t0
+            errors = sum(1 for _, _, error in results if error)
+            self.stdout.write(
+                f"{label:>6}: {len(results)} requests in {timings[label]:.2f}s "
+                f"(workers={workers}, rate={rate or 'unlimited'}/s, errors={errors})"
+            )
+
+        if timings["pooled"]:
+            self.stdout.write(f"speedup: {timings['serial'] / timings['pooled']:.1f}x")
@@ -0,0 +1,53 @@
+"""Fail if building a dashboard holdings payload exceeds its query budget."""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.dashboard.models import StockHolding
+from apps.dashboard.services.dashboard import DashboardDataError, calculate_dashboard_holdings
+from apps.dashboard.services.holdings_snapshot import SNAPSHOT_QUERY_BUDGET
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the holdings payload of each user (default: every user with a portfolio) and fail "
+        f"if any build takes more than the budget ({SNAPSHOT_QUERY_BUDGET} queries), whatever "
+        "the number of positions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("usernames", nargs="*")
+        parser.add_argument("--budget", type=int, default=SNAPSHOT_QUERY_BUDGET)
+        parser.add_argument("--show-sql", action="store_true", help="Print the queries of over-budget builds")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(portfolio__isnull=False).distinct().order_by("id")
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+        if not users.exists():
+            raise CommandError("No users with portfolios")
+
+        over = []
+        for user in users:
+            positions = StockHolding.objects.filter(portfolio__user=user).count()
+            with CaptureQueriesContext(connection) as ctx:
+                try:
+                    calculate_dashboard_holdings(user, "all")
+                except DashboardDataError as exc:
+                    self.stdout.write(f"{user.username}: skipped ({exc.body})")
+                    continue
+            line = f"{user.username}: {positions} holdings, {len(ctx)} queries"
+            if len(ctx) > options["budget"]:
+                over.append(user.username)
+                self.stdout.write(self.style.ERROR(line))
+                if options["show_sql"]:
+                    for query in ctx.captured_queries:
+                        self.stdout.write(f"  {query['sql']}")
+            else:
+                self.stdout.write(line)
+
+        if over:
+            raise CommandError(f"Over the {options['budget']}-query budget: {', '.join(over)}")
+        self.stdout.write(self.style.SUCCESS(f"All builds within {options['budget']} queries"))
@@ -0,0 +1,25 @@
+"""Replay the position ledger from the full transaction history."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.models import Portfolio
+from apps.dashboard.services.ledger import update_position_ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild PositionLedger rows from transactions (e.g. after edits made outside the app)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("portfolio_ids", nargs="*", type=int, help="Portfolio ids (default: all portfolios)")
+        parser.add_argument("--symbol", action="append", dest="symbols", help="Limit to a symbol (repeatable)")
+
+    def handle(self, *args, **options):
+        portfolios = Portfolio.objects.all()
+        if options["portfolio_ids"]:
+            portfolios = portfolios.filter(id__in=options["portfolio_ids"])
+        portfolio_ids = list(portfolios.values_list("id", flat=True))
+        if not portfolio_ids:
+            raise CommandError("No portfolios to rebuild")
+
+        written = update_position_ledger(portfolio_ids, options["symbols"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} ledger rows for {len(portfolio_ids)} portfolios"))
@@ -0,0 +1,24 @@
+"""Rebuild the weekly/monthly TickerRollup bars from TickerData."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.models import Ticker
+from apps.dashboard.services.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute TickerRollup (1wk / 1mo) bars from the daily TickerData history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("symbols", nargs="*", help="Base tickers (default: all tickers)")
+
+    def handle(self, *args, **options):
+        tickers = Ticker.objects.all()
+        if options["symbols"]:
+            tickers = tickers.filter(ticker__in=options["symbols"])
+        ticker_ids = list(tickers.values_list("id", flat=True))
+        if not ticker_ids:
+            raise CommandError("No tickers to rebuild")
+
+        written = rebuild_rollups(ticker_ids)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup bars for {len(ticker_ids)} tickers"))
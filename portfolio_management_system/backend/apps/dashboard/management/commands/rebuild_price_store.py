@@ -0,0 +1,27 @@
+"""Rebuild the memory-mapped price store from TickerData / TickerRollup."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.models import Ticker
+from apps.dashboard.services.price_store import get_store
+
+
+class Command(BaseCommand):
+    help = "Export daily and rollup bars to the on-disk .npy price store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("symbols", nargs="*", help="Base tickers (default: all tickers)")
+
+    def handle(self, *args, **options):
+        tickers = Ticker.objects.all()
+        if options["symbols"]:
+            tickers = tickers.filter(ticker__in=options["symbols"])
+        ticker_ids = list(tickers.values_list("id", flat=True))
+        if not ticker_ids:
+            raise CommandError("No tickers to export")
+
+        store = get_store()
+        written = store.export_tickers(ticker_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} bars for {len(ticker_ids)} tickers to {store.root}"
+        ))
@@ -0,0 +1,48 @@
+"""Record provider data as fixtures for the offline replay provider."""
+
+import json
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.models import Ticker
+from apps.dashboard.services.providers import build_provider
+
+
+class Command(BaseCommand):
+    help = "Write <symbol>.csv / <symbol>.json fixtures to MARKET_DATA_FIXTURES_DIR for MARKET_DATA_PROVIDER=replay."
+
+    def add_arguments(self, parser):
+        parser.add_argument("symbols", nargs="*", help="Provider symbols, e.g. BHP.AX (default: all tickers)")
+        parser.add_argument("--start", type=date.fromisoformat, default=date.today() - timedelta(days=5 * 365))
+        parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+        parser.add_argument("--source", default="yfinance", help="Provider to record from")
+
+    def handle(self, *args, **options):
+        symbols = options["symbols"] or list(Ticker.objects.values_list("symbol", flat=True))
+        if not symbols:
+            raise CommandError("No symbols to record")
+
+        provider = build_provider(options["source"])
+        out_dir = settings.MARKET_DATA_FIXTURES_DIR
+        out_dir.mkdir(parents=True, exist_ok=True)
+        start, end = options["start"], options["end"] + timedelta(days=1)
+
+        for symbol in symbols:
+            history = provider.history(symbol, start, end)
+            if history.empty:
+                self.stderr.write(f"{symbol}: no data")
+                continue
+            bars = history.xs(symbol, axis=1, level="Ticker") if history.columns.nlevels > 1 else history
+            bars = bars[["Open", "High", "Low", "Close", "Volume"]].copy()
+            dividends = provider.dividends([symbol], start, end)
+            if symbol in dividends:
+                bars["Dividends"] = dividends[symbol].reindex(bars.index).fillna(0.0)
+            bars.index.name = "Date"
+            bars.to_csv(out_dir / f"{symbol}.csv")
+
+            (out_dir / f"{symbol}.json").write_text(json.dumps(provider.info(symbol), default=str))
+            self.stdout.write(f"{symbol}: {len(bars)} bars")
+
+        self.stdout.write(self.style.SUCCESS(f"Fixtures written to {out_dir}"))
@@ -0,0 +1,121 @@
+"""Race many simulated requests for the market-refresh lock and check its guarantees."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.dashboard.services.refresh_state import (
+    DatabaseRefreshState,
+    RedisRefreshState,
+    backend_name,
+    get_refresh_state,
+)
+
+
+def race_lock(state, workers: int, attempts: int, hold_ms: float):
+    """
+    Have `workers` threads each try `attempts` times to take, hold, record
+    and release the lock. Returns (acquisitions, max concurrent holders,
+    failures).
+    """
+    guard = threading.Lock()
+    holders = 0
+    max_holders = 0
+    acquired_tokens = []
+    hold = hold_ms / 1000
+
+    def worker(n):
+        nonlocal holders, max_holders
+        wins = 0
+        for _ in range(attempts):
+            token = state.acquire(f"stress-{n}", ttl_seconds=5)
+            if token is None:
+                time.sleep(hold / 4)
+                continue
+            with guard:
+                holders += 1
+                max_holders = max(max_holders, holders)
+                acquired_tokens.append(token)
+            time.sleep(hold)
+            with guard:
+                holders -= 1
+            state.record(timezone.now(), token)
+            state.release(token)
+            wins += 1
+        return wins
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        wins = list(pool.map(worker, range(workers)))
+
+    failures = []
+    if max_holders > 1:
+        failures.append(f"{max_holders} workers held the lock at the same time")
+    if acquired_tokens != sorted(acquired_tokens):
+        failures.append("fencing tokens were not increasing in acquisition order")
+    return sum(wins), max_holders, failures
+
+
+def check_fencing(state):
+    """A holder whose lock expired must not release or overwrite its successor."""
+    if not isinstance(state, RedisRefreshState):
+        return []
+
+    failures = []
+    stale = state.acquire("stale", ttl_seconds=0.05)
+    time.sleep(0.1)
+    fresh = state.acquire("fresh", ttl_seconds=5)
+    if stale is None or fresh is None:
+        return ["could not acquire the lock for the fencing check"]
+
+    state.record(timezone.now(), fresh)
+    if state.release(stale):
+        failures.append("expired holder released its successor's lock")
+    if state.record(timezone.now(), stale):
+        failures.append("expired holder overwrote its successor's refresh state")
+    if not state.release(fresh):
+        failures.append("current holder could not release its lock")
+    return failures
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress the refresh lock: concurrent workers race to acquire it, and the run fails if two "
+        "ever hold it at once, tokens go backwards, or an expired holder can still release/record."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=32)
+        parser.add_argument("--attempts", type=int, default=50, help="Acquire attempts per worker")
+        parser.add_argument("--hold-ms", type=float, default=2.0, help="Time spent holding the lock")
+        parser.add_argument(
+            "--prefix", default="pms:market-refresh:stress",
+            help="Redis key prefix, kept apart from the live lock (redis backend only)",
+        )
+
+    def handle(self, *args, **options):
+        if backend_name() == "redis":
+            state = RedisRefreshState(get_refresh_state().client, options["prefix"])
+            state.client.delete(state.lock_key, state.fence_key, state.state_key)
+        else:
+            state = DatabaseRefreshState()
+            self.stdout.write(self.style.WARNING("db backend: running against the live MarketRefreshState row"))
+
+        t0 = time.perf_counter()
+        acquisitions, max_holders, failures = race_lock(
+            state, options["workers"], options["attempts"], options["hold_ms"]
+        )
+        elapsed = time.perf_counter() - t0
+
+        attempts = options["workers"] * options["attempts"]
+        self.stdout.write(
+            f"{attempts} attempts by {options['workers']} workers in {elapsed:.2f}s: "
+            f"{acquisitions} acquisitions, max concurrent holders={max_holders}"
+        )
+
+        failures.extend(check_fencing(state))
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Lock guarantees held"))
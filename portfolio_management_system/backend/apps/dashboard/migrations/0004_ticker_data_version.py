@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_rename_plateform_portfolio_platform_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticker',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:56
+
+import django.db.models.deletion
+import numpy as np
+import pandas as pd
+from django.db import migrations, models
+
+# Frozen copy of apps.dashboard.services.rollups as of this migration, so the
+# backfill keeps working whatever that module becomes.
+ROLLUP_INTERVALS = ("1wk", "1mo")
+ROLLUP_FIELDS = ["open", "high", "low", "close", "volume"]
+REBUILD_BATCH = 50
+
+
+def period_labels(dates, interval):
+    """Week-ending Sunday / month-end label of each datetime64[D] date."""
+    if interval == "1wk":
+        weekday = (dates.astype(np.int64) + 3) % 7
+        return dates + (6 - weekday).astype("timedelta64[D]")
+    return (dates.astype("datetime64[M]") + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+
+
+def aggregate_bars(frame, interval):
+    """Daily bars ordered by (ticker_id, date) → one row per (ticker_id, period label)."""
+    frame = frame.assign(date=period_labels(frame["date"].to_numpy(dtype="datetime64[D]"), interval))
+    return (
+        frame.groupby(["ticker_id", "date"], sort=True)
+        .agg(open=("open", "first"), high=("high", "max"), low=("low", "min"), close=("close", "last"), volume=("volume", "sum"))
+        .reset_index()
+    )
+
+
+def fill_rollups(apps, schema_editor):
+    TickerData = apps.get_model("dashboard", "TickerData")
+    TickerRollup = apps.get_model("dashboard", "TickerRollup")
+    ticker_ids = sorted(TickerData.objects.order_by().values_list("ticker_id", flat=True).distinct())
+    for i in range(0, len(ticker_ids), REBUILD_BATCH):
+        daily = pd.DataFrame.from_records(
+            TickerData.objects.filter(ticker_id__in=ticker_ids[i:i + REBUILD_BATCH])
+            .order_by("ticker_id", "date")
+            .values_list("ticker_id", "date", *ROLLUP_FIELDS),
+            columns=["ticker_id", "date", *ROLLUP_FIELDS],
+        )
+        daily[ROLLUP_FIELDS] = daily[ROLLUP_FIELDS].astype(np.float64)
+        for interval in ROLLUP_INTERVALS:
+            bars = aggregate_bars(daily, interval)
+            bars = bars.astype(object).where(bars.notna(), None)
+            TickerRollup.objects.bulk_create(
+                [
+                    TickerRollup(ticker_id=ticker_id, period=interval, date=day.date(), **dict(zip(ROLLUP_FIELDS, ohlcv)))
+                    for ticker_id, day, *ohlcv in bars.itertuples(index=False)
+                ],
+                batch_size=1000,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_ticker_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TickerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('1wk', '1wk'), ('1mo', '1mo')], max_length=4)),
+                ('date', models.DateField()),
+                ('close', models.FloatField(blank=True, null=True)),
+                ('open', models.FloatField(blank=True, null=True)),
+                ('high', models.FloatField(blank=True, null=True)),
+                ('low', models.FloatField(blank=True, null=True)),
+                ('volume', models.FloatField(blank=True, null=True)),
+                ('ticker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='dashboard.ticker')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('ticker', 'period', 'date')},
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_latest_quotes(apps, schema_editor):
+    Ticker = apps.get_model('dashboard', 'Ticker')
+    TickerData = apps.get_model('dashboard', 'TickerData')
+    LatestQuote = apps.get_model('dashboard', 'LatestQuote')
+
+    now = timezone.now()
+    for ticker_id in Ticker.objects.values_list('id', flat=True):
+        closes = list(
+            TickerData.objects.filter(ticker_id=ticker_id, close__isnull=False)
+            .order_by('-date')
+            .values_list('date', 'close')[:2]
+        )
+        if not closes:
+            continue
+        last_date, last_close = closes[0]
+        prev_date, prev_close = closes[1] if len(closes) > 1 else (None, None)
+        change = last_close - prev_close if prev_close is not None else None
+        LatestQuote.objects.create(
+            ticker_id=ticker_id,
+            last_date=last_date,
+            last_close=last_close,
+            prev_date=prev_date,
+            prev_close=prev_close,
+            change=change,
+            change_pct=(change / prev_close) * 100 if prev_close else None,
+            as_of=now,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_tickerrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestQuote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('last_close', models.FloatField(blank=True, null=True)),
+                ('prev_date', models.DateField(blank=True, null=True)),
+                ('prev_close', models.FloatField(blank=True, null=True)),
+                ('change', models.FloatField(blank=True, null=True)),
+                ('change_pct', models.FloatField(blank=True, null=True)),
+                ('as_of', models.DateTimeField(blank=True, null=True)),
+                ('ticker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='latest_quote', to='dashboard.ticker')),
+            ],
+        ),
+        migrations.RunPython(backfill_latest_quotes, migrations.RunPython.noop),
+    ]
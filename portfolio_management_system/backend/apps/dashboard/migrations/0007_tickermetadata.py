@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_latestquote'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TickerMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=25, unique=True)),
+                ('long_name', models.CharField(blank=True, default='', max_length=200)),
+                ('sector', models.CharField(blank=True, default='', max_length=50)),
+                ('industry', models.CharField(blank=True, default='', max_length=100)),
+                ('currency', models.CharField(blank=True, default='', max_length=10)),
+                ('fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.CharField(blank=True, default='', max_length=250)),
+            ],
+        ),
+    ]
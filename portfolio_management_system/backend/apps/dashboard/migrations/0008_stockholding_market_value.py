@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:23
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_market_value(apps, schema_editor):
+    StockHolding = apps.get_model("dashboard", "StockHolding")
+    StockHolding.objects.update(market_value=F("number_of_shares") * F("LTP"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_tickermetadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockholding',
+            name='market_value',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(fill_market_value, migrations.RunPython.noop),
+    ]
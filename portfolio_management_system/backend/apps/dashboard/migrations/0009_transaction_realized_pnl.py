@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:26
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from apps.dashboard.services.pnl import PNL_FIELDS, annotate_realized_pnl
+
+
+def fill_realized_pnl(apps, schema_editor):
+    Transaction = apps.get_model("dashboard", "transaction")
+    by_portfolio = defaultdict(list)
+    for row in Transaction.objects.values(*PNL_FIELDS, "Holding__portfolio_id"):
+        by_portfolio[row.pop("Holding__portfolio_id")].append(row)
+
+    updates = []
+    for rows in by_portfolio.values():
+        for t in annotate_realized_pnl(rows):
+            updates.append(Transaction(
+                id=t["id"],
+                realized_pnl=None if t["realized_pnl"] is None else float(t["realized_pnl"]),
+                dividends_paid=None if t["dividends_paid"] is None else float(t["dividends_paid"]),
+            ))
+    Transaction.objects.bulk_update(updates, ["realized_pnl", "dividends_paid"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_stockholding_market_value'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='dividends_paid',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='realized_pnl',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date_transaction', 'id'], name='txn_date_id_idx'),
+        ),
+        migrations.RunPython(fill_realized_pnl, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_transaction_realized_pnl'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=25)),
+                ('date', models.DateField()),
+                ('quantity', models.FloatField(default=0)),
+                ('cost_basis', models.FloatField(default=0)),
+                ('cash', models.FloatField(default=0)),
+                ('portfolio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger', to='dashboard.portfolio')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('portfolio', 'symbol', 'date')},
+            },
+        ),
+    ]
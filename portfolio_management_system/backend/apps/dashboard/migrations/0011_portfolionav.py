@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_positionledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioNAV',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('market_value', models.FloatField(default=0)),
+                ('cash', models.FloatField(default=0)),
+                ('deposits', models.FloatField(default=0)),
+                ('net_flows', models.FloatField(default=0)),
+                ('portfolio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nav', to='dashboard.portfolio')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('portfolio', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import F
+
+# Frozen copy of apps.dashboard.services.ledger.replay_ledger as of this
+# migration, the only place the ledger is backfilled (0010 creates the table)
+LEDGER_TYPES = ["Buy", "Sell", "Dividend Reinvestment", "Dividend Deposit"]
+LEDGER_FIELDS = ("symbol", "date_transaction", "transaction_type", "Quantity", "Buy_Price", "Commission", "Total")
+
+
+def replay_ledger(rows):
+    """(date, quantity, cost_basis, cash) entries per (portfolio_id, symbol), one per date."""
+    by_key = defaultdict(list)
+    for row in rows:
+        by_key[(row["portfolio_id"], row["symbol"])].append(row)
+
+    entries = {}
+    for key, txns in by_key.items():
+        qty = cost = cash = 0.0
+        out = []
+        for t in sorted(txns, key=lambda t: (t["date_transaction"], t["id"])):
+            q = float(t["Quantity"] or 0)
+            p = float(t["Buy_Price"] or 0)
+            c = float(t["Commission"] or 0)
+            kind = t["transaction_type"]
+
+            if kind == "Buy":
+                qty += q
+                cost += q * p + c
+                cash -= q * p + c
+            elif kind == "Dividend Reinvestment":
+                qty += q
+                cost += q * p + c
+            elif kind == "Sell":
+                avg = cost / qty if qty > 0 else 0.0
+                qty -= q
+                cost = max(cost - avg * q, 0.0)
+                cash += q * p - c
+            elif kind == "Dividend Deposit":
+                cash += float(t["Total"] or 0)
+            if qty <= 0:
+                cost = 0.0
+
+            state = (t["date_transaction"], qty, cost, cash)
+            if out and out[-1][0] == state[0]:
+                out[-1] = state
+            else:
+                out.append(state)
+        entries[key] = out
+    return entries
+
+
+def replay_ledger_rows(apps, schema_editor):
+    """Backfill the ledger from the transaction history."""
+    Transaction = apps.get_model("dashboard", "transaction")
+    PositionLedger = apps.get_model("dashboard", "PositionLedger")
+    rows = Transaction.objects.filter(transaction_type__in=LEDGER_TYPES).values(
+        *LEDGER_FIELDS, "id", portfolio_id=F("Holding__portfolio_id")
+    )
+    PositionLedger.objects.all().delete()
+    PositionLedger.objects.bulk_create(
+        [
+            PositionLedger(
+                portfolio_id=portfolio_id, symbol=symbol,
+                date=day, quantity=qty, cost_basis=cost, cash=cash,
+            )
+            for (portfolio_id, symbol), states in replay_ledger(rows).items()
+            for day, qty, cost, cash in states
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_portfolionav'),
+    ]
+
+    operations = [
+        migrations.RunPython(replay_ledger_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def clear_nav(apps, schema_editor):
+    """
+    Drop NAV rows written before Dividend Deposits counted as cash. load_nav
+    computes missing days in memory until the post-close append job (or
+    `backfill_portfolio_nav`) writes them again from each portfolio's first
+    activity.
+    """
+    apps.get_model("dashboard", "PortfolioNAV").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0012_replay_position_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_nav, migrations.RunPython.noop),
+    ]
@@ -56,6 +56,8 @@ class StockHolding(models.Model):
   Realized_PnL = models.FloatField(default=0)
   UnRealized_PnL = models.FloatField(default=0)
   LTP = models.FloatField(default=0)
+  # number_of_shares * LTP; kept current by services.valuation after each price refresh
+  market_value = models.FloatField(default=0)
 
   def __str__(self):
     return str(self.portfolio.name) + " -> " + self.company_symbol + " " + str(self.number_of_shares)
@@ -79,6 +81,15 @@ class transaction(models.Model):
   Total = models.FloatField(default=0)
   transaction_type =  models.CharField(max_length=50, choices=transaction_types)
   Commission = models.FloatField(default=0)
+  # FIFO results maintained by services.pnl.recompute_realized_pnl
+  realized_pnl = models.FloatField(null=True, blank=True, editable=False)
+  dividends_paid = models.FloatField(null=True, blank=True, editable=False)
+
+  class Meta:
+    indexes = [
+      # Keyset pagination of the transactions endpoint
+      models.Index(fields=["date_transaction", "id"], name="txn_date_id_idx"),
+    ]
 
   #def save(self, *args, **kwargs):
 
@@ -86,6 +97,39 @@ class transaction(models.Model):
   def __str__(self):
     return "Transaction : " + self.symbol + " | " + self.transaction_type + " | "+ str(self.Quantity) +" | "+ str(self.Buy_Price) + " | " + str(self.date_transaction) 
 
+class PositionLedger(models.Model):
+  """Position of one symbol in one portfolio after each day it changed; see services.ledger."""
+  portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name='ledger')
+  symbol = models.CharField(max_length=25)
+  date = models.DateField()
+  # Running totals at the end of `date`
+  quantity = models.FloatField(default=0)
+  cost_basis = models.FloatField(default=0)
+  cash = models.FloatField(default=0)
+
+  class Meta:
+      unique_together = ('portfolio', 'symbol', 'date')
+      ordering = ['date']
+  def __str__(self):
+        return f"{self.portfolio_id} - {self.symbol} - {self.date}: {self.quantity}"
+
+class PortfolioNAV(models.Model):
+  """End-of-day valuation of one portfolio per trading day; see services.nav."""
+  portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name='nav')
+  date = models.DateField()
+  market_value = models.FloatField(default=0)
+  # Deposits plus trade proceeds less trade costs, to date
+  cash = models.FloatField(default=0)
+  deposits = models.FloatField(default=0)
+  # Deposits booked since the previous trading day
+  net_flows = models.FloatField(default=0)
+
+  class Meta:
+      unique_together = ('portfolio', 'date')
+      ordering = ['date']
+  def __str__(self):
+        return f"{self.portfolio_id} - {self.date}: {self.market_value + self.cash:.2f}"
+
 class Ticker(models.Model):
     exchanges = {
       "ASX" : "ASX",
@@ -97,6 +141,8 @@ class Ticker(models.Model):
     first_txn = models.DateField(null=True, blank=True)
     last_txn = models.DateField(null=True, blank=True)
     exchange = models.CharField(max_length=5, choices=exchanges, default="ASX")
+    # Bumped whenever TickerData rows are written; used to invalidate cached price panels.
+    data_version = models.PositiveIntegerField(default=0, editable=False)
 
     def save(self,*args,**kwargs):
       if self.ticker:
@@ -133,6 +179,57 @@ class TickerData(models.Model):
   def __str__(self):
         return f"{self.ticker.symbol} - {self.date}"
 
+class TickerRollup(models.Model):
+  """Weekly / monthly OHLCV bars pre-aggregated from TickerData during sync."""
+  periods = {
+    "1wk": "1wk",
+    "1mo": "1mo",
+  }
+
+  ticker = models.ForeignKey(Ticker, on_delete=models.CASCADE, related_name='rollups')
+  period = models.CharField(max_length=4, choices=periods)
+  # Period label, matching pandas resample: week ending Sunday / last day of month
+  date = models.DateField()
+  close = models.FloatField(null=True, blank=True)
+  open = models.FloatField(null=True, blank=True)
+  high = models.FloatField(null=True, blank=True)
+  low = models.FloatField(null=True, blank=True)
+  volume = models.FloatField(null=True, blank=True)
+
+  class Meta:
+      unique_together = ('ticker', 'period', 'date')
+      ordering = ['date']
+  def __str__(self):
+        return f"{self.ticker.symbol} - {self.period} - {self.date}"
+
+class LatestQuote(models.Model):
+  """Last / previous close per ticker, maintained by ticker_sync on every refresh."""
+  ticker = models.OneToOneField(Ticker, on_delete=models.CASCADE, related_name='latest_quote')
+  last_date = models.DateField(null=True, blank=True)
+  last_close = models.FloatField(null=True, blank=True)
+  prev_date = models.DateField(null=True, blank=True)
+  prev_close = models.FloatField(null=True, blank=True)
+  change = models.FloatField(null=True, blank=True)
+  change_pct = models.FloatField(null=True, blank=True)
+  as_of = models.DateTimeField(null=True, blank=True)
+
+  def __str__(self):
+        return f"{self.ticker.symbol} - {self.last_close} ({self.last_date})"
+
+class TickerMetadata(models.Model):
+  """Company profile per provider symbol, filled by the background enrichment task."""
+  symbol = models.CharField(max_length=25, unique=True)
+  long_name = models.CharField(max_length=200, blank=True, default='')
+  sector = models.CharField(max_length=50, blank=True, default='')
+  industry = models.CharField(max_length=100, blank=True, default='')
+  currency = models.CharField(max_length=10, blank=True, default='')
+  # Last provider lookup; set even when the provider had nothing for the symbol
+  fetched_at = models.DateTimeField(null=True, blank=True)
+  error = models.CharField(max_length=250, blank=True, default='')
+
+  def __str__(self):
+        return f"{self.symbol} - {self.long_name or '?'} ({self.sector or '?'})"
+
 class deposit(models.Model):
   # user = models.OneToOneField(User, on_delete=models.CASCADE)
 
@@ -0,0 +1,195 @@
+# dashboard/services/backfill.py
+
+"""Detect and repair holes in stored TickerData series.
+
+The regular sync only fetches forward from each ticker's last stored bar, so
+bars missing in the middle of a series (failed runs, old weekday-only window
+trimming) are never re-requested. `find_gaps` compares every ticker's stored
+dates with its exchange's trading calendar in one vectorized pass: dates are
+mapped to trading-day indices, and a jump of more than one index between
+consecutive stored bars is a gap. Gaps separated by at most
+BACKFILL_MERGE_GAP_DAYS trading days are merged, so a handful of stray
+missing days costs one provider request rather than one each.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from apps.dashboard.models import Ticker, TickerData
+from apps.dashboard.services.ticker_sync import (
+    _split_download,
+    _store_history,
+    build_fetch_jobs,
+    fetch_concurrently,
+)
+from apps.dashboard.services.trading_calendar import get_calendar
+
+
+@dataclass
+class GapReport:
+    ticker_id: int
+    symbol: str
+    missing: int = 0
+    windows: List[Tuple[date, date]] = field(default_factory=list)
+
+
+def _merge_within() -> int:
+    return int(getattr(settings, "BACKFILL_MERGE_GAP_DAYS", 5))
+
+
+def find_gaps(
+    ticker_ids: Optional[Iterable[int]] = None,
+    merge_within: Optional[int] = None,
+) -> Dict[int, GapReport]:
+    """
+    Missing trading days per ticker between its first transaction (or first
+    stored bar, if earlier) and its last stored bar, plus the merged fetch
+    windows that cover them. Tickers without any stored bars are left to the
+    regular forward sync and are not reported.
+    """
+    merge_within = _merge_within() if merge_within is None else merge_within
+
+    tickers = Ticker.objects.all()
+    bars = TickerData.objects.all()
+    if ticker_ids is not None:
+        ticker_ids = list(ticker_ids)
+        tickers = tickers.filter(id__in=ticker_ids)
+        bars = bars.filter(ticker_id__in=ticker_ids)
+
+    meta = {
+        ticker_id: (symbol, exchange, first_txn)
+        for ticker_id, symbol, exchange, first_txn in tickers.values_list("id", "symbol", "exchange", "first_txn")
+    }
+    rows = list(bars.order_by("ticker_id", "date").values_list("ticker_id", "date"))
+    if not rows:
+        return {}
+
+    bar_ticker = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    bar_date = np.array([r[1] for r in rows], dtype="datetime64[D]")
+
+    reports: Dict[int, GapReport] = {}
+    exchanges: Dict[str, List[int]] = {}
+    for ticker_id in np.unique(bar_ticker).tolist():
+        if ticker_id in meta:
+            exchanges.setdefault(meta[ticker_id][1], []).append(ticker_id)
+
+    for exchange, ids in exchanges.items():
+        reports.update(_exchange_gaps(exchange, np.array(ids), bar_ticker, bar_date, meta, merge_within))
+    return reports
+
+
+def _exchange_gaps(exchange, ids, bar_ticker, bar_date, meta, merge_within) -> Dict[int, GapReport]:
+    mask = np.isin(bar_ticker, ids)
+    tick, dates = bar_ticker[mask], bar_date[mask]
+
+    # Per-ticker [first, last] bounds: the earlier of first_txn / first bar, to the last bar
+    order = np.searchsorted(ids, tick)
+    first_bar = np.full(len(ids), np.datetime64("9999-12-31"), dtype="datetime64[D]")
+    last_bar = np.full(len(ids), np.datetime64("0001-01-01"), dtype="datetime64[D]")
+    np.minimum.at(first_bar, order, dates)
+    np.maximum.at(last_bar, order, dates)
+    first_txn = np.array(
+        [meta[t][2] or date.max for t in ids.tolist()], dtype="datetime64[D]"
+    )
+    first = np.minimum(first_bar, first_txn)
+
+    calendar = get_calendar(exchange)
+    days = calendar.trading_days(first.min().astype(date), last_bar.max().astype(date))
+    if not len(days):
+        return {}
+
+    # Trading-day index of every bar (bars on non-trading days are ignored)
+    pos = np.searchsorted(days, dates)
+    on_calendar = (pos < len(days)) & (days[np.minimum(pos, len(days) - 1)] == dates)
+    lo = np.searchsorted(days, first, side="left")
+    hi = np.searchsorted(days, last_bar, side="right") - 1
+
+    # Sentinels one slot outside [lo, hi] turn leading gaps into ordinary jumps
+    seq_ticker = np.concatenate([order[on_calendar], np.arange(len(ids)), np.arange(len(ids))])
+    seq_pos = np.concatenate([pos[on_calendar], lo - 1, hi + 1])
+    sort = np.lexsort((seq_pos, seq_ticker))
+    seq_ticker, seq_pos = seq_ticker[sort], seq_pos[sort]
+
+    same = seq_ticker[1:] == seq_ticker[:-1]
+    step = np.diff(seq_pos)
+    is_gap = same & (step > 1)
+
+    gap_ticker = seq_ticker[:-1][is_gap]
+    gap_start = seq_pos[:-1][is_gap] + 1
+    gap_end = seq_pos[1:][is_gap] - 1
+    # The trailing sentinel sits past the last bar and never opens a gap
+    gap_end = np.minimum(gap_end, hi[gap_ticker])
+    keep = gap_start <= gap_end
+    gap_ticker, gap_start, gap_end = gap_ticker[keep], gap_start[keep], gap_end[keep]
+
+    missing = np.bincount(gap_ticker, weights=gap_end - gap_start + 1, minlength=len(ids)).astype(np.int64)
+
+    # Merge gaps of the same ticker separated by <= merge_within trading days
+    if len(gap_ticker):
+        new_group = np.ones(len(gap_ticker), dtype=bool)
+        new_group[1:] = (gap_ticker[1:] != gap_ticker[:-1]) | (gap_start[1:] - gap_end[:-1] - 1 > merge_within)
+        starts = np.flatnonzero(new_group)
+        win_ticker = gap_ticker[starts]
+        win_start = gap_start[starts]
+        win_end = np.maximum.reduceat(gap_end, starts)
+    else:
+        win_ticker = win_start = win_end = np.empty(0, dtype=np.int64)
+
+    reports = {
+        ticker_id: GapReport(ticker_id=ticker_id, symbol=meta[ticker_id][0], missing=int(missing[k]))
+        for k, ticker_id in enumerate(ids.tolist())
+    }
+    for k, s, e in zip(win_ticker.tolist(), win_start.tolist(), win_end.tolist()):
+        reports[int(ids[k])].windows.append((days[s].astype(date), days[e].astype(date)))
+    return reports
+
+
+def backfill_gaps(
+    ticker_ids: Optional[Iterable[int]] = None,
+    fetcher: Optional[Callable] = None,
+    merge_within: Optional[int] = None,
+) -> dict:
+    """
+    Fetch every merged gap window and report missing bars per ticker before
+    and after. Tickers sharing an identical window share a provider request.
+    """
+    before = find_gaps(ticker_ids, merge_within)
+    gapped = [t for t, report in before.items() if report.windows]
+    objs = Ticker.objects.in_bulk(gapped)
+
+    windows: dict = {}
+    for ticker_id in gapped:
+        for window in before[ticker_id].windows:
+            windows.setdefault(window, []).append((objs[ticker_id].symbol, objs[ticker_id]))
+
+    jobs = build_fetch_jobs(windows)
+    errors: List[str] = []
+    written = 0
+    for job, df, error in fetch_concurrently(jobs, fetcher=fetcher):
+        if error is not None:
+            errors.extend(f"{symbol} {job.start}..{job.end}: {error}" for symbol, _ in job.members)
+            continue
+        frames = _split_download(df, job.download_symbols)
+        for (symbol, ticker_obj), download_symbol in zip(job.members, job.download_symbols):
+            sym_df = frames.get(download_symbol)
+            if sym_df is None or sym_df.empty:
+                errors.append(f"{symbol} {job.start}..{job.end}: no data returned")
+                continue
+            created, _ = _store_history(ticker_obj, sym_df)
+            written += created
+
+    after = find_gaps(gapped, merge_within) if gapped else {}
+    return {
+        "requests": len(jobs),
+        "windows": sum(len(before[t].windows) for t in gapped),
+        "rows_written": written,
+        "missing_before": {r.symbol: r.missing for r in before.values() if r.missing},
+        "missing_after": {after[t].symbol: after[t].missing for t in gapped if t in after and after[t].missing},
+        "errors": errors,
+    }
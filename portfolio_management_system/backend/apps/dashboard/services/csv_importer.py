@@ -2,6 +2,7 @@ import csv
 from datetime import datetime
 from apps.dashboard.models import Portfolio, StockHolding, transaction, deposit
 from apps.dashboard.services.holdings import update_holdings
+from apps.dashboard.services.pnl import on_transactions_changed
 
 def process_csv_rows(file_obj, pf_id):
     """
@@ -14,6 +15,9 @@ def process_csv_rows(file_obj, pf_id):
 
     responses = []
     errors = []
+    touched_symbols = set()
+    earliest = None
+    wrote_deposits = False
     for index, row in file_obj.iterrows():
         try:
             symbol = row.get("Holding")
@@ -47,6 +51,8 @@ def process_csv_rows(file_obj, pf_id):
                 )
                 #print(f"{symbol} | {txn_type} | {date_txn} | {qty} | {portfolio.total_amount}")
                 portfolio.save()
+                wrote_deposits = True
+                earliest = date_txn if earliest is None else min(earliest, date_txn)
             else:
                 holding, created = StockHolding.objects.get_or_create(
                     portfolio=portfolio,
@@ -80,6 +86,8 @@ def process_csv_rows(file_obj, pf_id):
                     transaction_type=txn_type,
                     Commission=commission,
                 )
+                touched_symbols.add(symbol)
+                earliest = date_txn if earliest is None else min(earliest, date_txn)
 
             responses.append(f"{symbol}-{date_txn} OK")
 
@@ -87,4 +95,7 @@ def process_csv_rows(file_obj, pf_id):
             #print(row.get("Holding"), str(e))
             errors.append(str(e))
             break
+
+    if touched_symbols or wrote_deposits:
+        on_transactions_changed([pf_id], touched_symbols, since=earliest)
     return responses, errors
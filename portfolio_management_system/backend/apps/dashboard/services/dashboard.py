@@ -0,0 +1,319 @@
+# dashboard/services/dashboard.py
+
+"""Payloads behind the dashboard holdings and performance endpoints.
+
+Kept apart from the views so the post-refresh warm-up task
+(`apps.dashboard.tasks.dashboard_tasks`) builds exactly what a request would.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from django.db.models import Min
+
+from apps.dashboard.constants import Index_Symbol
+from apps.dashboard.models import Portfolio, transaction
+from apps.dashboard.services.holdings_snapshot import PortfolioNotFound, load_holdings_snapshot
+from apps.dashboard.services.market_data import get_prices
+from apps.dashboard.services.nav import last_closed_session, load_nav
+from apps.dashboard.services.returns import cumulative_twr, xirr_from_nav
+
+DEFAULT_TIMEFRAME = "3m"
+
+
+class DashboardDataError(Exception):
+    """A request that cannot produce a payload; `body`/`status` become the response."""
+
+    def __init__(self, body: dict, status: int):
+        super().__init__(body)
+        self.body = body
+        self.status = status
+
+
+def json_safe_float(v, default=0.0):
+    try:
+        v = float(v)
+        return v if math.isfinite(v) else default
+    except Exception:
+        return default
+
+
+def finite_or_zero(x):
+    try:
+        x = float(x)
+        return x if math.isfinite(x) else 0.0
+    except Exception:
+        return 0.0
+
+
+def calculate_dashboard_holdings(user, selected_portfolio_id=None) -> dict:
+    """
+    Holdings table, totals and allocation charts for `user` ("all" or one
+    portfolio), built from a constant-query HoldingsSnapshot. Read-only:
+    stored valuations are maintained by services.valuation after refreshes.
+    Transactions are served separately (TransactionListAPI).
+    """
+    try:
+        snapshot = load_holdings_snapshot(user, selected_portfolio_id)
+    except PortfolioNotFound:
+        raise DashboardDataError({"detail": "Portfolio not found."}, status=404)
+    if snapshot is None:
+        raise DashboardDataError({"detail": "No Portfolio Exist for this user"}, status=404)
+
+    latest_prices = snapshot.latest_prices
+    yesterday_prices = snapshot.yesterday_prices
+
+    # --- Initialize aggregates (same vars as original view) ---
+    holdings = []
+    sectors = [[], []]
+    sector_wise_investment = {}
+    stocks = [[], []]
+
+    uPnL = 0
+    current_value = 0
+    sum_investment_amount = 0
+    sum_value = 0
+    y_unadjusted_PnL = 0
+    unadjusted_PnL = 0
+    Sum_Dividends = 0
+    sum_final_total = 0
+
+    # --- Portfolio-wise totals ---
+    total_investment = snapshot.total_investment
+    total_cash = snapshot.total_cash
+
+    for c in snapshot.positions:
+        company_symbol = c['company_symbol']
+        company_name = c['company_name']
+        exchange = c['Exchange']
+        number_shares = c['total_shares'] or 0
+        investment_amount = c['total_investment'] or 0
+        total_cost = c['total_cost_sum'] or 0
+        average_cost = c['weighted_avg_buy_price'] or 0
+
+        market_price = finite_or_zero(latest_prices.get(company_symbol, 0) or latest_prices.get(company_symbol+"."+exchange, 0) or 0)
+        prev_market_price = finite_or_zero(yesterday_prices.get(company_symbol, 0) or yesterday_prices.get(company_symbol+"."+exchange, 0) or 0)
+
+        current_value += market_price * number_shares
+        uPnL += c['total_realized_pnl'] or 0
+
+        if number_shares > 0:
+            c['total_unrealized_pnl'] = ((market_price * number_shares) - total_cost) + (c['total_realized_pnl'] or 0)
+
+            # Unadjusted PnL excludes commissions from investment_amount
+            unadjusted_PnL += ((market_price * number_shares) - investment_amount)
+
+            y_unadjusted_PnL += ((prev_market_price * number_shares) - investment_amount)
+
+            PnL = c['total_unrealized_pnl']
+        else:
+            PnL = c['total_realized_pnl'] or 0
+
+        Total_dividends = snapshot.dividends.get(company_symbol, 0.0)
+
+        # Use base symbol (before dot) in response as original
+        symbol_key = company_symbol.split('.')[0]
+
+        holdings.append({
+            'CompanySymbol': symbol_key,
+            'CompanyName': company_name,
+            'exchange': exchange,
+            'LTP': market_price,
+            'NumberShares': number_shares,
+            "Dividends_total": Total_dividends,
+            'InvestmentAmount': total_cost,
+            'Total': Total_dividends + PnL,
+            'Value': market_price * number_shares,
+            "uPnL": ((market_price * number_shares) - total_cost),
+            'PnL': PnL,
+            'AverageCost': average_cost,
+        })
+
+        sum_investment_amount += investment_amount
+        sum_value += market_price * number_shares
+        sum_final_total += Total_dividends + PnL
+        Sum_Dividends += Total_dividends
+
+        # Stock allocation (percentages)
+        if investment_amount > 0 and total_investment:
+            stocks[0].append(round((investment_amount / total_investment) * 100, 2))
+            stocks[1].append(company_symbol)
+
+        # Sector-wise investment
+        sector = c['sector']
+        sector_wise_investment[sector] = sector_wise_investment.get(sector, 0) + investment_amount
+
+    # --- Sector data (percentages + labels) ---
+    for sec, invest in sector_wise_investment.items():
+        if invest > 0 and total_investment:
+            sectors[0].append(round((invest / total_investment) * 100, 2))
+            sectors[1].append(sec)
+
+    # --- Cash deposits aggregation ---
+    total_initial_investment = snapshot.initial_investment
+
+    # --- Final metrics (mirror original context keys) ---
+
+    context = {
+        'holdings': holdings,
+        'Total_Value': sum_value,
+        'total_cash': total_cash,
+        'unadjusted_PnL': unadjusted_PnL,
+        'current_growth': (unadjusted_PnL / sum_investment_amount) * 100 if sum_investment_amount else 0.0,
+        'yesterday_PnL': unadjusted_PnL - y_unadjusted_PnL,
+        'y_current_growth': ((unadjusted_PnL - y_unadjusted_PnL) / sum_investment_amount) * 100 if sum_investment_amount else 0.0,
+        'realizedPnl': uPnL,
+        'Total_dividends': Sum_Dividends,
+        'Dividend_per': (Sum_Dividends / sum_investment_amount) * 100 if sum_investment_amount else 0.0,
+        'Total_Returns': sum_final_total,
+        'Total_Pnl_per': (sum_final_total / total_initial_investment * 100) if total_initial_investment else 0.0,
+        'initial_investment': total_initial_investment,
+        'overall_growth': (
+            ((current_value + total_cash) - total_initial_investment) / total_initial_investment * 100
+            if total_initial_investment else 0.0
+        ),
+        'overall_value': current_value + total_cash,
+        'stocks': stocks,
+        'sectors': sectors,
+        'user_portfolios': snapshot.user_portfolios,
+        'selected_portfolio_id': selected_portfolio_id or "all",
+    }
+
+    context["yesterday_PnL"] = json_safe_float(context["yesterday_PnL"])
+    context["y_current_growth"] = json_safe_float(context["y_current_growth"])
+    return context
+
+
+def calculate_portfolio_performance(user, selected_portfolio_id=None, timeframe: str = DEFAULT_TIMEFRAME) -> dict:
+    """
+    Portfolio performance time-series vs index, sliced from the daily NAV
+    table (services.nav; "all" sums the portfolios' rows).
+
+    timeframe: one of ['1m', '3m', '6m', '1y', '5y', 'max'];
+    selected_portfolio_id: portfolio id or 'all'.
+    """
+    loc_Index_Symbol = Index_Symbol
+
+    # --- Portfolios (same logic as original view) ---
+    user_portfolios = Portfolio.objects.filter(user=user)
+
+    if selected_portfolio_id and selected_portfolio_id != "all":
+        portfolios = user_portfolios.filter(id=selected_portfolio_id)
+    else:
+        portfolios = user_portfolios
+    portfolio_ids = list(portfolios.values_list("id", flat=True))
+
+    PF_initial_date = transaction.objects.filter(
+        Holding__portfolio_id__in=portfolio_ids
+    ).aggregate(first=Min("date_transaction"))["first"]
+    if PF_initial_date is None:
+        raise DashboardDataError({"error": "No transactions found"}, status=400)
+
+    today = date.today()
+    through = last_closed_session()
+
+    # --- Timeframe handling: window start and sampling frequency ---
+    if timeframe == "1m":
+        start_date = today - timedelta(days=30)
+        freq = "B"
+    elif timeframe == "3m":
+        start_date = today - timedelta(days=90)
+        freq = "B"
+    elif timeframe == "6m":
+        start_date = today - timedelta(days=180)
+        freq = "W"
+    elif timeframe == "1y":
+        start_date = today - timedelta(days=365)
+        freq = "ME"
+    elif timeframe == "5y":
+        start_date = today - timedelta(days=1825)
+        freq = "ME"
+    else:  # 'max'
+        start_date = PF_initial_date - timedelta(days=21)
+        freq = "W"
+
+    nav = load_nav(portfolio_ids, start_date, through)
+
+    # --- Index benchmark (^AXJO), daily from the portfolio's first trade ---
+    idx_df = get_prices(
+        loc_Index_Symbol,
+        start=min(start_date, PF_initial_date),
+        end=through + timedelta(days=1),
+        interval="1d",
+    )
+    if idx_df is None or idx_df.empty or nav.empty:
+        raise DashboardDataError({"error": "No market data available"}, status=400)
+    # Initial index value near PF_initial_date: its open on the first bar from
+    # then, or the last close before it when no bar has been loaded since
+    from_initial = idx_df.loc[idx_df.index >= pd.Timestamp(PF_initial_date), "Open"].dropna()
+    if not from_initial.empty:
+        Index_init_value = from_initial.iloc[0]
+    else:
+        before_initial = idx_df.loc[idx_df.index < pd.Timestamp(PF_initial_date), "Close"].dropna()
+        if before_initial.empty:
+            raise DashboardDataError({"error": "No market data available"}, status=400)
+        Index_init_value = before_initial.iloc[-1]
+    index_close = idx_df["Close"].reindex(idx_df.index.union(nav.index)).ffill().reindex(nav.index)
+
+    nav_value = (nav["market_value"] + nav["cash"]).to_numpy()
+    flows = nav["net_flows"].to_numpy()
+    day_offsets = (nav.index - nav.index[0]).days.to_numpy()
+    money_weighted = xirr_from_nav(nav_value, flows, day_offsets)[0]
+
+    portfolio_value = pd.DataFrame(
+        {
+            "CashValue": nav_value,
+            "CashDeposits": nav["deposits"],
+            "Index_value": index_close,
+            # Daily compounding has to happen before any weekly/monthly sampling
+            "TWR": cumulative_twr(nav_value, flows)[0] * 100,
+        },
+        index=nav.index,
+    )
+    if freq != "B":
+        # Weekly / monthly points: the last trading day of each period
+        portfolio_value = portfolio_value.resample(freq).last().dropna(how="all")
+
+    portfolio_value["CashValue"] = portfolio_value["CashValue"].round(2)
+    # --- Portfolio % performance ---
+    portfolio_value["Portfolio"] = (
+        portfolio_value["CashValue"] / portfolio_value["CashDeposits"] * 100 - 100
+    ).fillna(0).round(2)
+
+    portfolio_value["pnl"] = (
+        portfolio_value["CashValue"] - portfolio_value["CashDeposits"]
+    ).diff().fillna(0).round(2)
+
+    PF_initial_date_ts = pd.Timestamp(PF_initial_date)
+
+    portfolio_value["Index_%"] = np.where(
+        portfolio_value.index >= PF_initial_date_ts,
+        ((portfolio_value["Index_value"] / Index_init_value) * 100 - 100).round(2),
+        0,
+    )
+
+    portfolio_value.ffill(inplace=True)
+    portfolio_value["pnl_index"] = (
+        portfolio_value["Index_value"]
+    ).diff().fillna(0).round(2)
+
+    portfolio_value.index.name = "Date"
+    portfolio_value = portfolio_value.reset_index()
+    portfolio_value["Date"] = portfolio_value["Date"].astype(str)
+    return {
+        "dates": portfolio_value["Date"].tolist(),
+        "portfolio": portfolio_value["Portfolio"].tolist(),
+        "pnl_index": portfolio_value["Date"].tolist(),
+        "portfolio_value": portfolio_value["CashValue"].tolist(),
+        "pnl": portfolio_value["pnl"].tolist(),
+        "index": portfolio_value["Index_%"].tolist(),
+        # Returns net of deposit timing: time-weighted (cumulative %) and
+        # money-weighted (annualised XIRR %, None when it has no solution)
+        "twr": portfolio_value["TWR"].round(2).tolist(),
+        "twr_total": round(float(portfolio_value["TWR"].iloc[-1]), 2),
+        "irr": None if np.isnan(money_weighted) else round(float(money_weighted) * 100, 2),
+    }
@@ -0,0 +1,116 @@
+# dashboard/services/dashboard_cache.py
+
+"""Shared-cache layer for the dashboard holdings and performance payloads.
+
+Entries live under
+
+    dashboard:<kind>:<user id>:<params>
+
+and hold the payload together with the versions it was built against: the
+market and user counters of services.dashboard_versions, and the date
+(performance series end at today). A lookup reads the entry and both
+counters in one `cache.get_many` and issues no database query; the payload
+is rebuilt when any version moved. Entries age out after
+DASHBOARD_CACHE_TTL.
+
+The counters are bumped by the writers: `on_transactions_changed` (every
+transaction writer and the CSV import), NAV writes (`services.nav`), deposit
+and portfolio edits, and on the market side `finalize_market_snapshot`,
+`_store_history` (backfills and single-ticker refreshes) and metadata
+fetches.
+
+`warm_user_dashboards` fills the default entries ("all" portfolios, default
+timeframe) for one user; it runs for every recently active user after a
+market snapshot (`apps.dashboard.tasks.dashboard_tasks`).
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.dashboard.services.dashboard import (
+    DEFAULT_TIMEFRAME,
+    DashboardDataError,
+    calculate_dashboard_holdings,
+    calculate_portfolio_performance,
+)
+from apps.dashboard.services.dashboard_versions import MARKET_VERSION_KEY, read_versions, user_version_key
+
+KEY_PREFIX = "dashboard"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "DASHBOARD_CACHE_TTL", 6 * 60 * 60))
+
+
+def payload_key(kind: str, user_id: int, params: str) -> str:
+    return f"{KEY_PREFIX}:{kind}:{user_id}:{params}"
+
+
+def get_or_build(kind: str, user, params: str, builder: Callable[[], dict]) -> dict:
+    """
+    Cached payload, built and stored on a miss. A DashboardDataError from
+    `builder` propagates and is not cached.
+    """
+    key = payload_key(kind, user.id, params)
+    version_keys = [MARKET_VERSION_KEY, user_version_key(user.id)]
+    found = cache.get_many([key, *version_keys])
+
+    # Versions first: data written while building moves them past this entry
+    versions = (*read_versions(version_keys, found), date.today().isoformat())
+    entry = found.get(key)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+
+    payload = builder()
+    cache.set(key, (versions, payload), timeout=_ttl())
+    return payload
+
+
+def dashboard_holdings(user, portfolio_id=None) -> dict:
+    return get_or_build(
+        "holdings", user, str(portfolio_id or "all"),
+        lambda: calculate_dashboard_holdings(user, portfolio_id),
+    )
+
+
+def portfolio_performance(user, portfolio_id=None, timeframe: str = DEFAULT_TIMEFRAME) -> dict:
+    return get_or_build(
+        "performance", user, f"{portfolio_id or 'all'}:{timeframe}",
+        lambda: calculate_portfolio_performance(user, portfolio_id, timeframe),
+    )
+
+
+def active_user_ids(days: Optional[int] = None) -> List[int]:
+    """Users with a portfolio who logged in within the last `days` (DASHBOARD_WARMUP_ACTIVE_DAYS)."""
+    days = int(getattr(settings, "DASHBOARD_WARMUP_ACTIVE_DAYS", 7)) if days is None else days
+    since = timezone.now() - timedelta(days=days)
+    return list(
+        get_user_model().objects
+        .filter(is_active=True, last_login__gte=since, portfolio__isnull=False)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .distinct()
+    )
+
+
+def warm_user_dashboards(user_id: int) -> dict:
+    """Build (or confirm cached) the default dashboard payloads of one user."""
+    user = get_user_model().objects.filter(id=user_id).first()
+    if user is None:
+        return {"user": user_id, "warmed": [], "skipped": ["missing user"]}
+
+    warmed, skipped = [], []
+    for kind, build in (("holdings", dashboard_holdings), ("performance", portfolio_performance)):
+        try:
+            build(user)
+            warmed.append(kind)
+        except DashboardDataError as exc:
+            skipped.append(f"{kind}: {exc.body}")
+    return {"user": user_id, "warmed": warmed, "skipped": skipped}
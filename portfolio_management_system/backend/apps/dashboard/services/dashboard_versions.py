@@ -0,0 +1,81 @@
+# dashboard/services/dashboard_versions.py
+
+"""Version counters for the cached dashboard payloads (services.dashboard_cache).
+
+Two counters live in the shared cache, without expiry:
+
+    dashboard:version:market       bumped after price writes, market snapshots
+                                   and metadata fetches
+    dashboard:version:user:<id>    bumped after any write to one user's
+                                   portfolios, holdings, transactions,
+                                   deposits or NAV rows
+
+A cached payload stores the counters it was built against and is rebuilt
+once either one moves, so a cache hit needs no database query. Writers bump
+after their data is committed; a payload built from older data is then
+tagged with the old counters and never served again.
+
+This module imports no dashboard services, so any writer can use it.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+from apps.dashboard.models import Portfolio
+
+MARKET_VERSION_KEY = "dashboard:version:market"
+
+
+def user_version_key(user_id: int) -> str:
+    return f"dashboard:version:user:{user_id}"
+
+
+def _initial() -> int:
+    # Not 0: a counter evicted and recreated must not match payloads built before
+    return time.time_ns()
+
+
+def read_versions(keys: List[str], found: Dict[str, int]) -> tuple:
+    """Counters for `keys` from a `cache.get_many` result, creating missing ones."""
+    versions = []
+    for key in keys:
+        value = found.get(key)
+        if value is None:
+            cache.add(key, _initial(), timeout=None)
+            value = cache.get(key)
+        versions.append(value)
+    return tuple(versions)
+
+
+def _bump(keys: Iterable[str]) -> None:
+    keys = list(keys)
+
+    def bump():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, _initial(), timeout=None)
+
+    db_transaction.on_commit(bump)
+
+
+def bump_market_version() -> None:
+    """Invalidate every user's cached payloads (prices or metadata changed)."""
+    _bump([MARKET_VERSION_KEY])
+
+
+def bump_user_versions(user_ids: Iterable[int]) -> None:
+    _bump([user_version_key(user_id) for user_id in set(user_ids)])
+
+
+def bump_portfolio_versions(portfolio_ids: Iterable[int]) -> None:
+    """Invalidate the cached payloads of the owners of `portfolio_ids`."""
+    portfolio_ids = list(portfolio_ids)
+    if portfolio_ids:
+        bump_user_versions(Portfolio.objects.filter(id__in=portfolio_ids).values_list("user_id", flat=True))
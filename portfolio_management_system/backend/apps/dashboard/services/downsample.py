@@ -0,0 +1,87 @@
+# dashboard/services/downsample.py
+
+"""Shape-preserving downsampling of chart series (Largest-Triangle-Three-Buckets).
+
+LTTB keeps the first and last points and, from each of `max_points - 2`
+equal buckets in between, the point forming the largest triangle with the
+point kept before it and the average of the next bucket. Peaks and troughs
+survive, which plain striding would drop. The work per bucket is one NumPy
+expression, so cost is bounded by the series length and the payload by
+`max_points`.
+
+Charts with several series on one x axis (`downsample_payload`) keep the
+union of each series' points, with the budget split between them.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+# Below this LTTB has no interior buckets to choose from
+MIN_POINTS = 3
+
+
+def lttb_indices(y: Sequence[float], max_points: int, x: Optional[Sequence[float]] = None) -> np.ndarray:
+    """Sorted indices of at most `max_points` points of `y` to keep."""
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(y)
+    if n <= max_points or max_points < MIN_POINTS:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # Bucket boundaries over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = np.empty(max_points, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def union_indices(series: Iterable[Sequence[float]], max_points: int) -> np.ndarray:
+    """Points to keep so each series keeps its shape, at most `max_points` in total."""
+    series = [s for s in series if len(s)]
+    if not series:
+        return np.arange(0)
+    budget = max(max_points // len(series), MIN_POINTS)
+    return np.unique(np.concatenate([lttb_indices(s, budget) for s in series]))
+
+
+def downsample_payload(
+    payload: dict,
+    max_points: int,
+    shape_keys: Sequence[str],
+    select_keys: Sequence[str] = (),
+    additive_keys: Sequence[str] = (),
+) -> dict:
+    """
+    Copy of `payload` with its parallel lists reduced to at most `max_points`.
+
+    The points are chosen on `shape_keys` and then applied to `shape_keys`
+    and `select_keys`. `additive_keys` hold per-point changes. Each kept
+    point gets the sum of the changes since the previous kept point, so
+    the totals still add up. Other keys are left unchanged.
+    """
+    length = len(payload[shape_keys[0]])
+    if length <= max_points:
+        return payload
+
+    keep = union_indices([payload[key] for key in shape_keys], max_points)
+    out = dict(payload)
+    for key in (*shape_keys, *select_keys):
+        values = payload[key]
+        out[key] = [values[i] for i in keep]
+    for key in additive_keys:
+        totals = np.cumsum(np.nan_to_num(np.asarray(payload[key], dtype=float)))[keep]
+        out[key] = np.round(np.diff(totals, prepend=0.0), 2).tolist()
+    return out
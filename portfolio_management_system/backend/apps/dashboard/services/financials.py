@@ -1,4 +1,4 @@
-import yfinance as yf
+from apps.dashboard.services.providers import get_provider
 
 def fetch_company_financials(symbol):
     """
@@ -6,24 +6,7 @@ def fetch_company_financials(symbol):
     Returns standardized financial metrics for API.
     """
     try:
-        ticker = yf.Ticker(symbol)
-
-        info = ticker.info or {}
-
-        return {
-            "symbol": symbol,
-            "company_name": info.get("longName") or symbol,
-            "sector": info.get("sector") or "",
-            "market_cap": info.get("marketCap"),
-            "pe_ratio": info.get("trailingPE"),
-            "pb_ratio": info.get("priceToBook"),
-            "eps": info.get("trailingEps"),
-            "dividend_yield": info.get("dividendYield"),
-            "revenue": info.get("totalRevenue"),
-            "net_income": info.get("netIncome"),
-            "debt_to_equity": info.get("debtToEquity"),
-            "roe": info.get("returnOnEquity"),
-        }
+        return get_provider().fundamentals(symbol)
 
     except Exception:
         return None
@@ -1,7 +1,7 @@
 # dashboard/services/holdings.py
 
-import yfinance as yf
 from apps.dashboard.models import Portfolio, StockHolding
+from apps.dashboard.services.metadata import lookup_metadata, provider_symbol, schedule_enrichment
 from django.db import transaction
 
 def buy_holding(holding, portfolio_id, price, quantity, commission):
@@ -19,6 +19,8 @@ def buy_holding(holding, portfolio_id, price, quantity, commission):
     holding.investment_amount = new_cost
     holding.average_buy_price = new_avg
     holding.LTP = price
+    holding.market_value = new_qty * price
+    holding.UnRealized_PnL = holding.market_value - new_cost
     holding.save()
 
     cash = Portfolio.objects.get(id=portfolio_id, currency="AUD", platform="STAKE")
@@ -56,6 +58,8 @@ def sell_holding(holding, portfolio_id, price, quantity, commission):
     holding.investment_amount = holding.total_cost
 
     holding.Realized_PnL = float(getattr(holding, "Realized_PnL", 0) or 0) + realized
+    holding.market_value = max(new_qty, 0) * price
+    holding.UnRealized_PnL = holding.market_value - holding.total_cost
 
     if new_qty <= 0:
         holding.average_buy_price = 0
@@ -109,18 +113,15 @@ def update_holdings(holding, holding_data):
             },
         )
 
-        # Only enrich metadata if missing (never overwrite with "")
+        # Only enrich metadata if missing (never overwrite with ""). Local
+        # lookup only: unknown symbols are fetched in the background after commit
         if not holding_obj.sector or not holding_obj.company_name or holding_obj.company_name == symbol:
-            try:
-                if exchange=="ASX":
-                    info = yf.Ticker(symbol+".AX").info or {}
-                else:
-                    info = yf.Ticker(symbol).info or {}
-                holding_obj.sector = info.get("sector") or holding_obj.sector or "N/A"
-                holding_obj.company_name = info.get("longName") or holding_obj.company_name or symbol
-            except Exception:
-                holding_obj.sector = holding_obj.sector or "N/A"
-                holding_obj.company_name = holding_obj.company_name or symbol
+            meta_symbol = provider_symbol(symbol, exchange)
+            meta = lookup_metadata(meta_symbol)
+            if meta is None or meta.error:
+                schedule_enrichment(meta_symbol)
+            holding_obj.sector = (meta and meta.sector) or holding_obj.sector or "N/A"
+            holding_obj.company_name = (meta and meta.long_name) or holding_obj.company_name or symbol
 
         # Keep cash selection consistent with your buy/sell functions
         cash = Portfolio.objects.select_for_update().get(
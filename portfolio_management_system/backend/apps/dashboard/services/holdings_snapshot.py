@@ -0,0 +1,116 @@
+# dashboard/services/holdings_snapshot.py
+
+"""Everything the dashboard holdings payload reads, in a fixed number of queries.
+
+`load_holdings_snapshot` issues one query each for the user's portfolios,
+the per-symbol holding aggregates, the latest/previous closes, the
+per-symbol dividend totals and the deposit total, however many positions
+the portfolios hold. Allocation, sector weights and PnL are computed from
+the snapshot in memory
+(`apps.dashboard.services.dashboard.calculate_dashboard_holdings`), which
+writes nothing.
+
+SNAPSHOT_QUERY_BUDGET is the total for a dashboard build. The tests in
+apps/dashboard/tests.py assert it for few and many holdings, and
+`check_dashboard_query_budget` checks it against real users' data.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db.models import Avg, ExpressionWrapper, FloatField, Sum
+from django.db.models.functions import NullIf
+
+from apps.dashboard.models import Portfolio, StockHolding, deposit, transaction
+from apps.dashboard.services.quotes import close_maps
+
+DIVIDEND_TYPES = ["Dividend Deposit", "Dividend Reinvestment"]
+
+SNAPSHOT_QUERY_BUDGET = 5
+
+
+class PortfolioNotFound(Exception):
+    pass
+
+
+@dataclass
+class HoldingsSnapshot:
+    user_portfolios: List[dict]
+    portfolio_ids: List[int]
+    positions: List[dict]
+    latest_prices: Dict[str, float] = field(default_factory=dict)
+    yesterday_prices: Dict[str, float] = field(default_factory=dict)
+    dividends: Dict[str, float] = field(default_factory=dict)
+    total_investment: float = 0.0
+    total_cash: float = 0.0
+    initial_investment: float = 0.0
+
+
+def load_holdings_snapshot(user, selected_portfolio_id: Optional[str] = None) -> Optional[HoldingsSnapshot]:
+    """
+    Snapshot of `user`'s holdings ("all" portfolios or one). Returns None when
+    the user has no portfolio; raises PortfolioNotFound for an unknown id.
+    """
+    user_portfolios = list(
+        Portfolio.objects.filter(user=user)
+        .order_by("id")
+        .values("id", "name", "total_investment", "total_amount")
+    )
+    if not user_portfolios:
+        return None
+
+    if selected_portfolio_id and selected_portfolio_id != "all":
+        selected = [p for p in user_portfolios if str(p["id"]) == str(selected_portfolio_id)]
+        if not selected:
+            raise PortfolioNotFound(selected_portfolio_id)
+    else:
+        selected = user_portfolios
+    portfolio_ids = [p["id"] for p in selected]
+
+    positions = list(
+        StockHolding.objects
+        .filter(portfolio_id__in=portfolio_ids)
+        .values('company_symbol', 'company_name', 'Exchange', 'sector')
+        .annotate(
+            total_shares=Sum('number_of_shares'),
+            total_investment=Sum('investment_amount'),
+            total_cost_sum=Sum('total_cost'),
+            total_realized_pnl=Sum('Realized_PnL'),
+            total_unrealized_pnl=Sum('UnRealized_PnL'),
+            avg_ltp=Avg('LTP'),
+            weighted_avg_buy_price=ExpressionWrapper(
+                Sum('total_cost') / NullIf(Sum('number_of_shares'), 0.0),
+                output_field=FloatField()
+            ),
+        )
+    )
+
+    snapshot = HoldingsSnapshot(
+        user_portfolios=[{"id": p["id"], "name": p["name"]} for p in user_portfolios],
+        portfolio_ids=portfolio_ids,
+        positions=positions,
+        total_investment=sum(p["total_investment"] or 0 for p in selected),
+        total_cash=sum(p["total_amount"] or 0 for p in selected),
+    )
+
+    symbols = list({c['company_symbol'] for c in positions if c['total_shares'] > 0})
+    if symbols:
+        snapshot.latest_prices, snapshot.yesterday_prices = close_maps(symbols)
+
+    snapshot.dividends = {
+        symbol: total or 0.0
+        for symbol, total in transaction.objects
+        .filter(Holding__portfolio_id__in=portfolio_ids, transaction_type__in=DIVIDEND_TYPES)
+        .values("symbol")
+        .annotate(total=Sum("Total"))
+        .values_list("symbol", "total")
+    }
+
+    snapshot.initial_investment = deposit.objects.filter(
+        portfolio_id__in=portfolio_ids
+    ).aggregate(total=Sum('total_amount'))['total'] or 0
+
+    return snapshot
+
@@ -0,0 +1,165 @@
+# dashboard/services/ledger.py
+
+"""Persisted position ledger.
+
+`PositionLedger` holds, per portfolio and symbol, the running quantity,
+average cost basis and cash effect at the end of every date on which a
+transaction changed them. The position on any date D is the last row dated
+on or before D, so "what did the portfolio hold on D" is one indexed lookup
+(`positions_as_of`) instead of a replay of the transaction history.
+
+Running totals follow the cost-basis bookkeeping in services.holdings and
+the cash rules of services.performance.replay_positions, which PortfolioNAV
+is built from, so ledger cash and NAV cash agree:
+  - Buy:                    +quantity, cost +(quantity * price + commission),
+                            cash -(quantity * price + commission)
+  - Dividend Reinvestment:  +quantity, cost +(quantity * price + commission),
+                            no cash movement (the dividend paid for it)
+  - Sell:                   -quantity, cost -(quantity * average cost),
+                            cash +(quantity * price - commission)
+  - Dividend Deposit:       cash +Total (the amount received)
+A position that goes flat has its cost basis reset to 0.
+
+Writers call `apps.dashboard.services.pnl.on_transactions_changed`, which
+replays only the affected symbols from the earliest changed date, starting
+from the row before it (`update_position_ledger`). The
+`rebuild_position_ledger` command replays whole portfolios to fix drift.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction as db_transaction
+from django.db.models import F, OuterRef, Subquery
+
+from apps.dashboard.models import PositionLedger, transaction
+
+LEDGER_TYPES = ["Buy", "Sell", "Dividend Reinvestment", "Dividend Deposit"]
+
+# Fields replay_ledger reads, as loaded from transaction
+LEDGER_FIELDS = ("symbol", "date_transaction", "transaction_type", "Quantity", "Buy_Price", "Commission", "Total")
+
+Key = Tuple[int, str]
+# (quantity, cost_basis, cash)
+State = Tuple[float, float, float]
+
+
+def replay_ledger(rows: Iterable[dict], starts: Optional[Dict[Key, State]] = None) -> Dict[Key, List[tuple]]:
+    """
+    Ledger entries `(date, quantity, cost_basis, cash)` per (portfolio_id, symbol)
+    for transaction rows carrying LEDGER_FIELDS and `portfolio_id`, continuing
+    from `starts` where given. One entry per date with activity.
+    """
+    starts = starts or {}
+    by_key = defaultdict(list)
+    for row in rows:
+        by_key[(row["portfolio_id"], row["symbol"])].append(row)
+
+    entries = {}
+    for key, txns in by_key.items():
+        qty, cost, cash = starts.get(key, (0.0, 0.0, 0.0))
+        out = []
+        for t in sorted(txns, key=lambda t: (t["date_transaction"], t.get("id") or 0)):
+            q = float(t["Quantity"] or 0)
+            p = float(t["Buy_Price"] or 0)
+            c = float(t["Commission"] or 0)
+            kind = t["transaction_type"]
+
+            if kind == "Buy":
+                qty += q
+                cost += q * p + c
+                cash -= q * p + c
+            elif kind == "Dividend Reinvestment":
+                qty += q
+                cost += q * p + c
+            elif kind == "Sell":
+                avg = cost / qty if qty > 0 else 0.0
+                qty -= q
+                cost = max(cost - avg * q, 0.0)
+                cash += q * p - c
+            elif kind == "Dividend Deposit":
+                cash += float(t["Total"] or 0)
+            if qty <= 0:
+                cost = 0.0
+
+            state = (t["date_transaction"], qty, cost, cash)
+            if out and out[-1][0] == state[0]:
+                out[-1] = state
+            else:
+                out.append(state)
+        entries[key] = out
+    return entries
+
+
+def _scope(model_qs, portfolio_field: str, portfolio_ids, symbols):
+    qs = model_qs.filter(**{f"{portfolio_field}__in": list(portfolio_ids)})
+    if symbols is not None:
+        qs = qs.filter(symbol__in=list(symbols))
+    return qs
+
+
+def _latest_rows(portfolio_ids, symbols, before: Optional[date] = None, on_or_before: Optional[date] = None):
+    """Last ledger row per (portfolio, symbol) strictly before / on or before a date."""
+    rows = _scope(PositionLedger.objects, "portfolio_id", portfolio_ids, symbols)
+    bound = {"date__lt": before} if before is not None else {"date__lte": on_or_before}
+    latest = (
+        PositionLedger.objects
+        .filter(portfolio_id=OuterRef("portfolio_id"), symbol=OuterRef("symbol"), **bound)
+        .order_by("-date")
+        .values("date")[:1]
+    )
+    return rows.filter(**bound).filter(date=Subquery(latest))
+
+
+def positions_as_of(portfolio_ids: Iterable[int], on_date: date, symbols: Optional[Iterable[str]] = None) -> Dict[Key, PositionLedger]:
+    """Ledger row in force on `on_date` per (portfolio_id, symbol); absent keys held nothing."""
+    return {
+        (row.portfolio_id, row.symbol): row
+        for row in _latest_rows(portfolio_ids, symbols, on_or_before=on_date)
+    }
+
+
+def update_position_ledger(
+    portfolio_ids: Iterable[int],
+    symbols: Optional[Iterable[str]] = None,
+    since: Optional[date] = None,
+) -> int:
+    """
+    Replay the ledger of `portfolio_ids` (optionally only `symbols`) from
+    `since` onwards (everything when None). Returns rows written.
+    """
+    portfolio_ids = list(portfolio_ids)
+    symbols = None if symbols is None else list(symbols)
+
+    txns = _scope(transaction.objects, "Holding__portfolio_id", portfolio_ids, symbols).filter(
+        transaction_type__in=LEDGER_TYPES
+    )
+    stale = _scope(PositionLedger.objects, "portfolio_id", portfolio_ids, symbols)
+    starts = {}
+    if since is not None:
+        txns = txns.filter(date_transaction__gte=since)
+        stale = stale.filter(date__gte=since)
+        starts = {
+            (row.portfolio_id, row.symbol): (row.quantity, row.cost_basis, row.cash)
+            for row in _latest_rows(portfolio_ids, symbols, before=since)
+        }
+
+    rows = txns.values(*LEDGER_FIELDS, "id", portfolio_id=F("Holding__portfolio_id"))
+    entries = replay_ledger(rows, starts)
+
+    new_rows = [
+        PositionLedger(
+            portfolio_id=portfolio_id, symbol=symbol,
+            date=day, quantity=qty, cost_basis=cost, cash=cash,
+        )
+        for (portfolio_id, symbol), states in entries.items()
+        for day, qty, cost, cash in states
+    ]
+    with db_transaction.atomic():
+        stale.delete()
+        PositionLedger.objects.bulk_create(new_rows, batch_size=500)
+    return len(new_rows)
+
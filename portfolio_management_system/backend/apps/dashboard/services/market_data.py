@@ -1,16 +1,25 @@
 # dashboard/services/market_data.py
 
 from datetime import date
-from typing import Iterable, List, Union, Optional
+from typing import Dict, Iterable, List, Sequence, Tuple, Union, Optional
 
+import numpy as np
 import pandas as pd
 
-from ..models import Ticker, TickerData
+from ..models import Ticker, TickerData, TickerRollup
 from apps.dashboard.constants import Index_Symbol
+from apps.dashboard.services.price_cache import cache_enabled, make_key, price_cache
+from apps.dashboard.services.price_store import file_backend_enabled, load_store_columns
+from apps.dashboard.services.rollups import ROLLUP_INTERVALS, aggregate_bars, period_labels
 
 
 SymbolLike = Union[str, Iterable[str]]
 
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Columns pulled from TickerData by the columnar read path, in order.
+BAR_COLUMNS = ("ticker_id", "date", "open", "high", "low", "close", "volume")
+
 def normalize_symbols(symbols: SymbolLike) -> List[str]:
     """
     Ensure we always work with a clean list of symbols.
@@ -37,6 +46,185 @@ def get_symbols_with_Exchange(symbols: SymbolLike) -> List[str]:
         .values_list("symbol", flat=True)
     )
 
+def _empty_prices_frame(symbols_list: List[str]) -> pd.DataFrame:
+    if len(symbols_list) == 1:
+        return pd.DataFrame(columns=PRICE_FIELDS)
+    return pd.DataFrame(
+        columns=pd.MultiIndex.from_product([symbols_list, PRICE_FIELDS])
+    )
+
+
+def _rows_to_columns(rows: List[tuple], id_to_symbol: Dict[int, str]) -> Dict[str, np.ndarray]:
+    """Transpose (ticker_id, date, open, high, low, close, volume) tuples into arrays."""
+    if not rows:
+        return {
+            "ticker_id": np.empty(0, dtype=np.int64),
+            "symbol": np.empty(0, dtype=object),
+            "date": np.empty(0, dtype="datetime64[D]"),
+            **{f: np.empty(0, dtype=np.float64) for f in BAR_COLUMNS[2:]},
+        }
+
+    ticker_ids, dates, *values = zip(*rows)
+
+    ids = np.fromiter(ticker_ids, dtype=np.int64, count=len(rows))
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    symbols = np.array([id_to_symbol[i] for i in unique_ids.tolist()], dtype=object)
+
+    columns = {
+        "ticker_id": ids,
+        "symbol": symbols[inverse],
+        "date": np.array(dates, dtype="datetime64[D]"),
+    }
+    for field, col in zip(BAR_COLUMNS[2:], values):
+        columns[field] = np.array(col, dtype=np.float64)
+    return columns
+
+
+def load_price_columns(
+    tickers: Sequence[Tuple[int, str]],
+    start: date,
+    end: date,
+) -> Dict[str, np.ndarray]:
+    """
+    Read daily bars for `tickers` ((id, symbol) pairs) in a single query.
+
+    Rows come back as plain tuples (no model instances, no per-row ticker
+    lookups) and are transposed straight into NumPy arrays:
+
+        ticker_id -> int64
+        symbol    -> object array, joined from the id -> symbol map
+        date      -> datetime64[D]
+        open/high/low/close/volume -> float64 (NULL -> NaN)
+
+    Rows are ordered by (ticker_id, date).
+    """
+    id_to_symbol = dict(tickers)
+
+    rows = list(
+        TickerData.objects.filter(
+            ticker_id__in=list(id_to_symbol),
+            date__gte=start,
+            date__lte=end,
+        )
+        .order_by("ticker_id", "date")
+        .values_list(*BAR_COLUMNS)
+    )
+    return _rows_to_columns(rows, id_to_symbol)
+
+
+def load_rollup_columns(
+    tickers: Sequence[Tuple[int, str]],
+    interval: str,
+    start: date,
+    end: date,
+) -> Dict[str, np.ndarray]:
+    """
+    Read pre-aggregated weekly/monthly bars from TickerRollup.
+
+    Returns the same columnar layout as `load_price_columns`, one row per
+    period label between the periods containing `start` and `end`. Tickers
+    that have daily bars but no rollups yet (never synced since rollups were
+    introduced) are aggregated on the fly from their daily bars.
+    """
+    if interval not in ROLLUP_INTERVALS:
+        raise ValueError(
+            f"Unsupported interval '{interval}'. "
+            "Use: '1d', '1wk', '1mo'."
+        )
+
+    id_to_symbol = dict(tickers)
+    first_label, last_label = period_labels(
+        np.array([start, end], dtype="datetime64[D]"), interval
+    ).tolist()
+
+    rows = list(
+        TickerRollup.objects.filter(
+            ticker_id__in=list(id_to_symbol),
+            period=interval,
+            date__gte=first_label,
+            date__lte=last_label,
+        )
+        .order_by("ticker_id", "date")
+        .values_list(*BAR_COLUMNS)
+    )
+    bars = _rows_to_columns(rows, id_to_symbol)
+
+    missing = set(id_to_symbol) - set(np.unique(bars["ticker_id"]).tolist())
+    if missing:
+        missing = missing - set(
+            TickerRollup.objects.filter(ticker_id__in=missing, period=interval)
+            .values_list("ticker_id", flat=True)
+            .distinct()
+        )
+    if missing:
+        daily = load_price_columns(
+            [(ticker_id, id_to_symbol[ticker_id]) for ticker_id in missing], start, end
+        )
+        if len(daily["date"]):
+            bars = _merge_columns(bars, aggregate_bars(daily, interval))
+    return bars
+
+
+def _merge_columns(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Concatenate two columnar bar sets, keeping (ticker_id, date) order."""
+    if not len(b["date"]):
+        return a
+    if not len(a["date"]):
+        return b
+    merged = {k: np.concatenate([a[k], b[k]]) for k in a}
+    order = np.lexsort((merged["date"], merged["ticker_id"]))
+    return {k: v[order] for k, v in merged.items()}
+
+
+def _load_from_store(
+    tickers: Sequence[Tuple[int, str]],
+    interval: str,
+    start: date,
+    end: date,
+    versions: Dict[int, int],
+) -> Dict[str, np.ndarray]:
+    """
+    Read bars from the memory-mapped file store, falling back to the DB per
+    ticker with no file at its current `data_version` (`versions`).
+    """
+    if interval == "1d":
+        first, last = start, end
+    elif interval in ROLLUP_INTERVALS:
+        first, last = period_labels(
+            np.array([start, end], dtype="datetime64[D]"), interval
+        ).tolist()
+    else:
+        raise ValueError(
+            f"Unsupported interval '{interval}'. "
+            "Use: '1d', '1wk', '1mo'."
+        )
+
+    bars, missing = load_store_columns(tickers, interval, first, last, versions)
+    if missing:
+        if interval == "1d":
+            fallback = load_price_columns(missing, start, end)
+        else:
+            fallback = load_rollup_columns(missing, interval, start, end)
+        bars = _merge_columns(bars, fallback)
+    return bars
+
+
+def bars_to_frame(bars: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Build the long (symbol, OHLCV) frame indexed by Date from columnar bars."""
+    index = pd.DatetimeIndex(bars["date"].astype("datetime64[ns]"), name="Date")
+    return pd.DataFrame(
+        {
+            "symbol": bars["symbol"],
+            "Open": bars["open"],
+            "High": bars["high"],
+            "Low": bars["low"],
+            "Close": bars["close"],
+            "Volume": bars["volume"],
+        },
+        index=index,
+    )
+
+
 def get_prices(
     symbols: SymbolLike,
     start: Optional[date] = None,
@@ -55,9 +243,9 @@ def get_prices(
             End date (datetime.date). Defaults to today if not provided.
         interval:
             Price interval. Currently supports:
-                - "1d"  → daily (no resampling)
-                - "1wk" → weekly resample
-                - "1mo" → monthly resample
+                - "1d"  → daily bars
+                - "1wk" → weekly bars (pre-aggregated in TickerRollup)
+                - "1mo" → monthly bars (pre-aggregated in TickerRollup)
 
     Returns:
         pandas.DataFrame structured like `yfinance.download` output:
@@ -78,101 +266,64 @@ def get_prices(
     if start is None:
         # default start 2000-01-01
         start = date(2000, 1, 1)
+    # Bars are daily: callers passing datetimes (with a time of day) must
+    # share cache entries with date callers for the same days
+    start = pd.Timestamp(start).date()
+    end = pd.Timestamp(end).date()
     
-    # Fetch tickers for the requested symbols
-    tickers = Ticker.objects.filter(ticker__in=symbols_list)
-    if not tickers.exists():
+    # Fetch tickers for the requested symbols (id -> symbol map, one query).
+    # data_version comes along so cached panels are validated for free.
+    ticker_rows = list(
+        Ticker.objects
+        .filter(ticker__in=symbols_list)
+        .values_list("id", "symbol", "data_version")
+    )
+    if not ticker_rows:
         # No tickers in DB yet → return empty in the expected shape
-        if len(symbols_list) == 1:
-            return pd.DataFrame(
-                columns=["Open", "High", "Low", "Close", "Volume"]
-            )
-        else:
-            return pd.DataFrame(
-                columns=pd.MultiIndex.from_product(
-                    [symbols_list, ["Open", "High", "Low", "Close", "Volume"]]
-                )
-            )
+        return _empty_prices_frame(symbols_list)
 
-    # Query historical data
-    data_qs = (
-        TickerData.objects.filter(
-            ticker__in=tickers,
-            date__gte=start,
-            date__lte=end,
-        )
-        .order_by("ticker", "date")
-    )
+    tickers = [(ticker_id, symbol) for ticker_id, symbol, _ in ticker_rows]
+    data_versions = {ticker_id: version for ticker_id, _, version in ticker_rows}
+
+    use_cache = cache_enabled()
+    if use_cache:
+        key = make_key(symbols_list, start, end, interval)
+        versions = tuple(sorted((ticker_id, version) for ticker_id, _, version in ticker_rows))
+        cached = price_cache.get(key, versions)
+        if cached is not None:
+            return cached
+
+    out = _build_prices_frame(symbols_list, tickers, start, end, interval, data_versions)
+
+    if use_cache and not out.empty:
+        price_cache.put(key, versions, out)
+    return out
 
-    # Convert queryset to DataFrame
-    records = []
-    for d in data_qs:
-        records.append(
-            {
-                "symbol": d.ticker.symbol,
-                "Date": d.date,
-                "Open": d.open,
-                "High": d.high,
-                "Low": d.low,
-                "Close": d.close,
-                "Volume": d.volume,
-            }
-        )
 
-    df = pd.DataFrame(records)
+def _build_prices_frame(
+    symbols_list: List[str],
+    tickers: List[Tuple[int, str]],
+    start: date,
+    end: date,
+    interval: str,
+    versions: Dict[int, int],
+) -> pd.DataFrame:
+    # Query historical data straight into columnar arrays. Weekly / monthly
+    # bars are read pre-aggregated from TickerRollup, so no resampling here.
+    # The memory-mapped file store returns identical columns when enabled.
+    if file_backend_enabled():
+        bars = _load_from_store(tickers, interval, start, end, versions)
+    elif interval == "1d":
+        bars = load_price_columns(tickers, start, end)
+    else:
+        bars = load_rollup_columns(tickers, interval, start, end)
+    df = bars_to_frame(bars)
 
     # -----------------------------
     # No data returned → empty DF
     # -----------------------------
     if df.empty:
-        if len(symbols_list) == 1:
-            # Return empty DataFrame for single symbol
-            return pd.DataFrame(
-                columns=["Open", "High", "Low", "Close", "Volume"]
-            )
-        else:
-            # Return empty multi-index
-            return pd.DataFrame(
-                columns=pd.MultiIndex.from_product(
-                    [symbols_list, ["Open", "High", "Low", "Close", "Volume"]]
-                )
-            )
-
-    # -----------------------------
-    # Interval Resampling
-    # -----------------------------
-    df["Date"] = pd.to_datetime(df["Date"])
-    df = df.set_index("Date")
-
-    # Only apply resampling if interval != daily
-    if interval != "1d":
-        # Map your interval values to pandas rules
-        rule = {"1wk": "W", "1mo": "M"}.get(interval)
-        if rule is None:
-            raise ValueError(
-                f"Unsupported interval '{interval}'. "
-                "Use: '1d', '1wk', '1mo'."
-            )
-
-        def resample_group(g: pd.DataFrame) -> pd.DataFrame:
-            return g.resample(rule).agg(
-                {
-                    "Open": "first",
-                    "High": "max",
-                    "Low": "min",
-                    "Close": "last",
-                    "Volume": "sum",
-                }
-            )
-
-        df = (
-            df.groupby("symbol", group_keys=True)[
-                ["Open", "High", "Low", "Close", "Volume"]
-            ]
-            .apply(resample_group)
-            .reset_index()
-        )
-        df = df.set_index("Date")
+        return _empty_prices_frame(symbols_list)
 
     # -----------------------------
     # Format Output (yfinance style)
@@ -185,17 +336,21 @@ def get_prices(
 
         # Defensive: handle case where symbol has no rows in df
         sym_df = df[df["symbol"] == symbol] if "symbol" in df.columns else df
-        out = sym_df[["Open", "High", "Low", "Close", "Volume"]]
+        out = sym_df[PRICE_FIELDS]
         return out.sort_index()
 
     else:
         # Multiple symbols → MultiIndex columns (symbol, field)
         frames = []
-        updated_symbols = get_symbols_with_Exchange(symbols_list)
+        updated_symbols = [symbol for _, symbol in tickers]
+        by_symbol = (
+            {s: g for s, g in df.groupby("symbol", sort=False)}
+            if "symbol" in df.columns else {}
+        )
         for s in updated_symbols:
 
             if "symbol" in df.columns:
-                sub = df[df["symbol"] == s]
+                sub = by_symbol.get(s, df.iloc[0:0])
             else:
                 # If symbol col was lost somehow, just use df as-is
                 sub = df
@@ -204,12 +359,12 @@ def get_prices(
             if sub.empty:
                 empty = pd.DataFrame(
                     index=df.index.unique(),
-                    columns=["Open", "High", "Low", "Close", "Volume"],
+                    columns=PRICE_FIELDS,
                 )
                 frames.append(empty)
             else:
                 frames.append(
-                    sub[["Open", "High", "Low", "Close", "Volume"]]
+                    sub[PRICE_FIELDS]
                 )
 
         multi_df = pd.concat(frames, axis=1, keys=[s.split(".", 1)[0] for s in updated_symbols])
@@ -5,45 +5,45 @@ cleanly after downtime.
 """
 from __future__ import annotations
 
-from datetime import datetime, time, timedelta
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import Optional
 from zoneinfo import ZoneInfo
 
+import redis
 from django.conf import settings
 
+from django.core.cache import cache
 from django.utils import timezone
-from django.db import transaction
 from apps.dashboard.models import MarketRefreshState
+from apps.dashboard.services.refresh_state import get_refresh_state, write_audit
+from apps.dashboard.services.trading_calendar import get_calendar
 
 MARKET_TZ = ZoneInfo(settings.TIME_ZONE)
-MARKET_OPEN = time(hour=10, minute=0)
-MARKET_CLOSE = time(hour=16, minute=10)
+ASX_CALENDAR = get_calendar("ASX")
+MARKET_OPEN = ASX_CALENDAR.sessions.open
+MARKET_CLOSE = ASX_CALENDAR.sessions.close
 
 REFRESH_LOCK_SECS = 60*10
 DEFAULT_MAX_AGE_MINUTES = 15
 
+# Shared marker: at most one enqueued snapshot per debounce window
+REFRESH_DEBOUNCE_KEY = "market-refresh:enqueued"
+
+# Per-process: skip scheduling checks entirely until this monotonic time
+_local_quiet_until = 0.0
+_local_lock = threading.Lock()
+
 
 def market_now() -> datetime:
     """Return the current time in the configured market timezone."""
     return timezone.now().astimezone(MARKET_TZ)
 
 
-def _get_refresh_state(*, for_update: bool = False) -> MarketRefreshState:
-    with transaction.atomic():
-        query = MarketRefreshState.objects
-        if for_update:
-            query = query.select_for_update()
-
-        state, _ = query.get_or_create(pk=1)
-        return state
-
-
 def last_trading_day(reference: datetime) -> datetime.date:
-    """Return the most recent weekday (Mon-Fri) for the given timestamp."""
-    day = reference.date()
-    while day.weekday() >= 5:  # 5=Saturday, 6=Sunday
-        day -= timedelta(days=1)
-    return day
+    """Return the most recent ASX trading day on or before the given timestamp."""
+    return ASX_CALENDAR.previous_trading_day(reference.date(), inclusive=True)
 
 
 def market_open_dt(reference: datetime) -> datetime:
@@ -56,9 +56,11 @@ def market_open_dt(reference: datetime) -> datetime:
 
 
 def market_close_dt(reference: datetime) -> datetime:
+    # Half-days (Christmas Eve / New Year's Eve) close early
+    close = ASX_CALENDAR.session_close(reference.date()).timetz()
     return reference.replace(
-        hour=MARKET_CLOSE.hour,
-        minute=MARKET_CLOSE.minute,
+        hour=close.hour,
+        minute=close.minute,
         second=0,
         microsecond=0,
     )
@@ -66,7 +68,7 @@ def market_close_dt(reference: datetime) -> datetime:
 
 def is_trading_day(moment: Optional[datetime] = None) -> bool:
     moment = moment or market_now()
-    return moment.weekday() < 5
+    return ASX_CALENDAR.is_trading_day(moment.date())
 
 
 def is_market_open(moment: Optional[datetime] = None) -> bool:
@@ -78,57 +80,44 @@ def is_market_open(moment: Optional[datetime] = None) -> bool:
 
 
 def get_last_refresh() -> Optional[datetime]:
-    last_refresh = _get_refresh_state().last_refresh
+    try:
+        last_refresh = get_refresh_state().last_refresh()
+    except redis.RedisError:
+        # Fall back to the audit row if Redis is unreachable
+        last_refresh = MarketRefreshState.objects.filter(pk=1).values_list("last_refresh", flat=True).first()
     return last_refresh.astimezone(MARKET_TZ) if last_refresh else None
 
 
-def record_last_refresh(moment: Optional[datetime] = None) -> None:
+def record_last_refresh(moment: Optional[datetime] = None, token: Optional[int] = None) -> bool:
+    """
+    Store the last successful refresh. With a fencing `token` the write is
+    rejected (returns False) if a later lock holder has already recorded one.
+    """
     moment = moment or market_now()
-    
-    state = _get_refresh_state(for_update=True)
-    state.last_refresh = moment
-    state.save(update_fields=["last_refresh"])
 
-
-def acquire_refresh_lock(*, trigger_reason: str, timeout_seconds: int) -> bool:
-    now = market_now()
-    expires_at = now + timedelta(seconds=timeout_seconds)
-
-    with transaction.atomic():
-        state = _get_refresh_state(for_update=True)
-
-        if state.refresh_lock_expires_at and state.refresh_lock_expires_at > now:
-            #print(f"Expires at - {expires_at}")
-            return False
-
-        state.refresh_lock_reason = trigger_reason
-        state.refresh_lock_acquired_at = now
-        state.refresh_lock_expires_at = expires_at
-        state.save(
-            update_fields=[
-                "refresh_lock_reason",
-                "refresh_lock_acquired_at",
-                "refresh_lock_expires_at",
-            ]
+    recorded = get_refresh_state().record(moment, token)
+    if recorded:
+        write_audit(last_refresh=moment)
+    return recorded
+
+
+def acquire_refresh_lock(*, trigger_reason: str, timeout_seconds: int) -> Optional[int]:
+    """Return a fencing token if the refresh lock was acquired, else None."""
+    token = get_refresh_state().acquire(trigger_reason, timeout_seconds)
+    if token is not None:
+        now = market_now()
+        write_audit(
+            refresh_lock_reason=trigger_reason,
+            refresh_lock_acquired_at=now,
+            refresh_lock_expires_at=now + timedelta(seconds=timeout_seconds),
         )
-
-    return True
+    return token
 
 
-def release_refresh_lock() -> None:
-    with transaction.atomic():
-        state = _get_refresh_state(for_update=True)
-
-        state.refresh_lock_reason = None
-        state.refresh_lock_acquired_at = None
-        #state.refresh_lock_expires_at = None
-        state.save(
-            update_fields=[
-                "refresh_lock_reason",
-                "refresh_lock_acquired_at",
-                #"refresh_lock_expires_at",
-            ]
-        )
+def release_refresh_lock(token: Optional[int] = None) -> None:
+    """Release the lock if `token` still holds it (no-op once it expired and moved on)."""
+    if get_refresh_state().release(token):
+        write_audit(refresh_lock_reason=None, refresh_lock_acquired_at=None)
 
 
 def should_refresh_market_data(
@@ -142,33 +131,33 @@ def should_refresh_market_data(
 
     - During open hours: refresh if stale or never run.
     - Outside open hours: optionally catch up if the last refresh was
-      before the most recent trading close (covers server downtime).
+      before the close of the most recent trading session (covers the
+      post-close refresh and server downtime). Weekends and exchange
+      holidays have no session, so nothing is refreshed on them.
     """
     now = now or market_now()
     last_refresh = last_refresh.astimezone(MARKET_TZ) if last_refresh else None
 
-    if allow_closed_catch_up:
-        most_recent_trading_day = last_trading_day(now)
-        #print(f"most_recent_trading_day {most_recent_trading_day}")
-
-        if last_refresh is None or last_refresh.date() < most_recent_trading_day:
-            #print("Last Refresh is None")
+    if is_market_open(now):
+        if last_refresh is None:
             return True
+        return (now - last_refresh) >= timedelta(minutes=max_age_minutes)
+
+    if not allow_closed_catch_up:
+        return False
+
+    last_session = ASX_CALENDAR.last_session_started(now)
+    return last_refresh is None or last_refresh < ASX_CALENDAR.session_close(last_session)
+
+
+def _debounce_secs() -> int:
+    return int(getattr(settings, "MARKET_REFRESH_DEBOUNCE_SECS", DEFAULT_MAX_AGE_MINUTES * 60))
 
-        if (
-            last_refresh.date() == most_recent_trading_day
-            and now >= market_open_dt(now)
-            and last_refresh < market_close_dt(now)
-        ):
-            #print("Market Open yet")
-            return True
-    #print("Nothing Yet")
-    if not is_market_open(now):
-        return True
-    if last_refresh is None:
-        return True
-    #print((now - last_refresh))
-    return (now - last_refresh) >= timedelta(minutes=max_age_minutes)
+
+def _hold_local(seconds: float) -> None:
+    global _local_quiet_until
+    with _local_lock:
+        _local_quiet_until = max(_local_quiet_until, time.monotonic() + seconds)
 
 
 def schedule_market_refresh_if_needed(
@@ -180,29 +169,46 @@ def schedule_market_refresh_if_needed(
     """
     Queue a background market refresh if conditions require it.
 
-    Uses a short-lived database-backed lock to avoid flooding Celery when
-    multiple requests arrive simultaneously.
+    Calls are coalesced so that at most one snapshot is enqueued per
+    debounce window (MARKET_REFRESH_DEBOUNCE_SECS) across all processes:
+
+    1. A per-process monotonic deadline short-circuits repeat calls with no
+       I/O at all while the last answer is still valid.
+    2. Otherwise freshness is checked; fresh data silences this process
+       until it would become stale.
+    3. Stale data enqueues only for the caller that wins an atomic
+       `cache.add` marker shared by every web worker.
     """
+    if time.monotonic() < _local_quiet_until:
+        return None
+
+    window = _debounce_secs()
     now = market_now()
     last_refresh = get_last_refresh()
 
-    # if not should_refresh_market_data(
-    #     last_refresh,
-    #     now=now,
-    #     max_age_minutes=max_age_minutes,
-    #     allow_closed_catch_up=allow_closed_catch_up,
-    # ):  
-    #     print("Market Refresh False")
-    #     return None
-    # if acquire_refresh_lock(
-    #     trigger_reason=trigger_reason, timeout_seconds=REFRESH_LOCK_SECS
-    # ):
-    #     return None
+    if not should_refresh_market_data(
+        last_refresh,
+        now=now,
+        max_age_minutes=max_age_minutes,
+        allow_closed_catch_up=allow_closed_catch_up,
+    ):
+        if last_refresh is not None and is_market_open(now):
+            fresh_for = (last_refresh + timedelta(minutes=max_age_minutes) - now).total_seconds()
+            _hold_local(max(min(fresh_for, window), 1))
+        else:
+            _hold_local(window)
+        return None
+
+    if not cache.add(REFRESH_DEBOUNCE_KEY, trigger_reason, timeout=window):
+        # Another worker enqueued a refresh for this window
+        _hold_local(window)
+        return None
+
+    _hold_local(window)
+
     # Avoid import cycles by importing the task lazily
     from apps.dashboard.tasks.market_tasks import capture_asx_market_snapshot
-    
-    result = capture_asx_market_snapshot.apply_async(
-        trigger_reason= trigger_reason
-    )
 
-    return result
\ No newline at end of file
+    return capture_asx_market_snapshot.apply_async(
+        kwargs={"trigger_reason": trigger_reason}
+    )
@@ -0,0 +1,115 @@
+# dashboard/services/metadata.py
+
+"""Ticker metadata (company name, sector, industry, currency).
+
+Trades and imports only read the local TickerMetadata table. Symbols without
+a row are queued for `enrich_ticker_metadata_task` once the surrounding
+database transaction commits, so provider calls never run while holding and
+portfolio rows are locked.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.dashboard.models import StockHolding, TickerMetadata
+from apps.dashboard.services.dashboard_versions import bump_market_version
+from apps.dashboard.services.providers import get_provider
+
+# Suppresses duplicate enqueues while an enrichment is pending
+PENDING_KEY = "ticker-metadata:pending:{symbol}"
+PENDING_TTL_SECS = 10 * 60
+
+
+def provider_symbol(symbol: str, exchange) -> str:
+    """Symbol as quoted by the provider ("BHP" on ASX -> "BHP.AX")."""
+    if exchange == "ASX" and not symbol.upper().endswith(".AX"):
+        return symbol + ".AX"
+    return symbol
+
+
+def lookup_metadata(symbol: str) -> Optional[TickerMetadata]:
+    """Local lookup only; never calls the provider."""
+    return TickerMetadata.objects.filter(symbol=symbol).first()
+
+
+def schedule_enrichment(symbol: str) -> None:
+    """Enqueue enrichment for `symbol` after the current transaction commits."""
+    if not cache.add(PENDING_KEY.format(symbol=symbol), True, timeout=PENDING_TTL_SECS):
+        return
+
+    def enqueue():
+        from apps.dashboard.tasks.metadata_tasks import enrich_ticker_metadata_task
+
+        enrich_ticker_metadata_task.delay([symbol])
+
+    transaction.on_commit(enqueue)
+
+
+def fetch_metadata(symbol: str) -> TickerMetadata:
+    """Query the provider for `symbol` and store the result (errors are recorded)."""
+    values = {"fetched_at": timezone.now(), "error": ""}
+    try:
+        info = get_provider().info(symbol) or {}
+        values.update(
+            long_name=(info.get("longName") or info.get("shortName") or "")[:200],
+            sector=(info.get("sector") or "")[:50],
+            industry=(info.get("industry") or "")[:100],
+            currency=(info.get("currency") or "")[:10],
+        )
+    except Exception as exc:
+        values["error"] = (str(exc) or exc.__class__.__name__)[:250]
+
+    meta, _ = TickerMetadata.objects.update_or_create(symbol=symbol, defaults=values)
+    return meta
+
+
+def apply_metadata_to_holdings(meta: TickerMetadata) -> int:
+    """Fill holdings of `meta.symbol` whose name or sector is still a placeholder."""
+    if meta.symbol.upper().endswith(".AX"):
+        holdings = StockHolding.objects.filter(
+            Q(company_symbol=meta.symbol) | Q(company_symbol=meta.symbol[:-3], Exchange="ASX")
+        )
+    else:
+        holdings = StockHolding.objects.filter(company_symbol=meta.symbol)
+
+    updated = 0
+    if meta.sector:
+        updated += holdings.filter(Q(sector="") | Q(sector="N/A")).update(sector=meta.sector)
+    if meta.long_name:
+        updated += holdings.filter(
+            Q(company_name="") | Q(company_name=meta.symbol) | Q(company_name=meta.symbol.split(".")[0])
+        ).update(company_name=meta.long_name)
+    return updated
+
+
+def missing_metadata_symbols() -> List[str]:
+    """Provider symbols of held stocks not yet enriched (or whose last lookup failed)."""
+    held = {
+        provider_symbol(symbol, exchange)
+        for symbol, exchange in StockHolding.objects.values_list("company_symbol", "Exchange").distinct()
+        if symbol
+    }
+    known = set(
+        TickerMetadata.objects.filter(symbol__in=held, fetched_at__isnull=False, error="")
+        .values_list("symbol", flat=True)
+    )
+    return sorted(held - known)
+
+
+def enrich_metadata(symbols: Iterable[str]) -> List[TickerMetadata]:
+    """Fetch, store and apply metadata for `symbols` (runs outside any trade transaction)."""
+    results = []
+    for symbol in symbols:
+        meta = fetch_metadata(symbol)
+        apply_metadata_to_holdings(meta)
+        cache.delete(PENDING_KEY.format(symbol=symbol))
+        results.append(meta)
+    if results:
+        bump_market_version()
+    return results
@@ -0,0 +1,209 @@
+# dashboard/services/nav.py
+
+"""Daily portfolio NAV table.
+
+`PortfolioNAV` holds one row per portfolio per ASX trading day from the
+portfolio's first transaction or deposit: market value (positions at that
+day's close, last known close when a symbol did not trade), cash (deposits
+plus trade proceeds less trade costs, as in services.performance), cumulative
+deposits and the deposits booked since the previous trading day.
+
+Rows are written by:
+  - `append_portfolio_nav`: the post-close beat job; extends every portfolio
+    to the last closed session, so missed days are caught up on the next run.
+  - `recompute_portfolio_nav`: rewrites rows from a back-dated change onwards
+    (queued by `apps.dashboard.services.pnl.on_transactions_changed`) and
+    backs the `backfill_portfolio_nav` command.
+
+`load_nav` reads the summed series of one or many portfolios and computes
+in memory (without writing) any days the table does not have yet, so the
+performance chart never waits on the beat job.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+from django.db import transaction as db_transaction
+from django.db.models import F, Max, Min, Sum
+from django.utils import timezone
+
+from apps.dashboard.constants import Index_Symbol
+from apps.dashboard.models import PortfolioNAV, deposit, transaction
+from apps.dashboard.services.dashboard_versions import bump_portfolio_versions
+from apps.dashboard.services.market_data import get_prices
+from apps.dashboard.services.performance import DEPOSIT_FIELDS, TXN_FIELDS, replay_positions
+from apps.dashboard.services.trading_calendar import get_calendar
+
+NAV_COLUMNS = ["market_value", "cash", "deposits", "net_flows"]
+
+# Days of closes loaded before a range so the first day has a last known price
+PRICE_LOOKBACK_DAYS = 14
+
+CALENDAR = get_calendar("ASX")
+
+
+def last_closed_session(now=None) -> date:
+    """Most recent ASX trading day whose session has closed."""
+    now = (now or timezone.now()).astimezone(CALENDAR.tz)
+    day = CALENDAR.previous_trading_day(now.date(), inclusive=True)
+    if now < CALENDAR.session_close(day):
+        day = CALENDAR.previous_trading_day(day)
+    return day
+
+
+def _first_activity(portfolio_ids: Iterable[int]) -> Dict[int, date]:
+    firsts = {}
+    for rows in (
+        transaction.objects.filter(Holding__portfolio_id__in=portfolio_ids)
+        .values(pid=F("Holding__portfolio_id")).annotate(first=Min("date_transaction")),
+        deposit.objects.filter(portfolio_id__in=portfolio_ids)
+        .values(pid=F("portfolio_id")).annotate(first=Min("date_transaction")),
+    ):
+        for row in rows:
+            firsts[row["pid"]] = min(row["first"], firsts.get(row["pid"], row["first"]))
+    return firsts
+
+
+def compute_nav(starts: Dict[int, date], through: date) -> Dict[int, pd.DataFrame]:
+    """
+    NAV frames (NAV_COLUMNS, indexed by trading day) per portfolio from its
+    entry in `starts` to `through`, with one price load for all of them.
+    """
+    starts = {pid: start for pid, start in starts.items() if start <= through}
+    if not starts:
+        return {}
+    first = min(starts.values())
+    # One extra trading day in front, so the first row's net flow is a difference too
+    days = pd.DatetimeIndex(CALENDAR.trading_days(CALENDAR.previous_trading_day(first), through), name="Date")
+
+    txns, deposits = {pid: [] for pid in starts}, {pid: [] for pid in starts}
+    for row in (
+        transaction.objects.filter(Holding__portfolio_id__in=list(starts))
+        .values_list("Holding__portfolio_id", *TXN_FIELDS)
+    ):
+        txns[row[0]].append(row[1:])
+    for row in deposit.objects.filter(portfolio_id__in=list(starts)).values_list("portfolio_id", *DEPOSIT_FIELDS):
+        deposits[row[0]].append(row[1:])
+
+    symbols = sorted({t[0] for rows in txns.values() for t in rows})
+    prices = pd.DataFrame(index=days)
+    if symbols:
+        data = get_prices(
+            symbols + [Index_Symbol],
+            start=days[0].date() - timedelta(days=PRICE_LOOKBACK_DAYS),
+            end=through + timedelta(days=1),
+            interval="1d",
+        )
+        if data is not None and not data.empty:
+            closes = data.xs("Close", level=1, axis=1)
+            prices = closes.reindex(closes.index.union(days)).ffill().reindex(days)
+            prices = prices.infer_objects(copy=False)
+
+    frames = {}
+    for pid, start in starts.items():
+        replayed = replay_positions(days, txns[pid], deposits[pid], prices, exclude=[Index_Symbol])
+        frame = pd.DataFrame(
+            {
+                "market_value": replayed["Value"],
+                "cash": replayed["CashValue"] - replayed["Value"],
+                "deposits": replayed["CashDeposits"],
+                "net_flows": replayed["CashDeposits"].diff().fillna(0),
+            },
+            index=days,
+        )
+        frames[pid] = frame[frame.index >= pd.Timestamp(start)]
+    return frames
+
+
+def _write(frames: Dict[int, pd.DataFrame]) -> int:
+    rows = [
+        PortfolioNAV(portfolio_id=pid, date=day.date(), **values)
+        for pid, frame in frames.items()
+        for day, values in zip(frame.index, frame[NAV_COLUMNS].to_dict("records"))
+    ]
+    with db_transaction.atomic():
+        for pid, frame in frames.items():
+            if not frame.empty:
+                PortfolioNAV.objects.filter(
+                    portfolio_id=pid, date__gte=frame.index[0].date(), date__lte=frame.index[-1].date()
+                ).delete()
+        PortfolioNAV.objects.bulk_create(rows, batch_size=500)
+        bump_portfolio_versions([pid for pid, frame in frames.items() if not frame.empty])
+    return len(rows)
+
+
+def append_portfolio_nav(through: Optional[date] = None) -> int:
+    """Extend every portfolio's NAV to `through` (last closed session). Returns rows written."""
+    through = through or last_closed_session()
+    firsts = _first_activity(
+        list(transaction.objects.values_list("Holding__portfolio_id", flat=True).distinct())
+        + list(deposit.objects.values_list("portfolio_id", flat=True).distinct())
+    )
+    lasts = dict(PortfolioNAV.objects.values_list("portfolio_id").annotate(last=Max("date")))
+    starts = {
+        pid: lasts[pid] + timedelta(days=1) if pid in lasts else first
+        for pid, first in firsts.items()
+    }
+    return _write(compute_nav(starts, through))
+
+
+def recompute_portfolio_nav(
+    portfolio_ids: Iterable[int],
+    since: Optional[date] = None,
+    through: Optional[date] = None,
+) -> int:
+    """
+    Rewrite the NAV of `portfolio_ids` from `since` (their first activity when
+    None, or when the portfolio has no rows yet) to `through`.
+    """
+    through = through or last_closed_session()
+    portfolio_ids = list(portfolio_ids)
+    firsts = _first_activity(portfolio_ids)
+    has_rows = set(
+        PortfolioNAV.objects.filter(portfolio_id__in=portfolio_ids).values_list("portfolio_id", flat=True).distinct()
+    )
+    starts = {
+        pid: max(since, first) if since is not None and pid in has_rows else first
+        for pid, first in firsts.items()
+    }
+    # Portfolios whose history was deleted entirely
+    if PortfolioNAV.objects.filter(portfolio_id__in=set(portfolio_ids) - set(firsts)).delete()[0]:
+        bump_portfolio_versions(set(portfolio_ids) - set(firsts))
+    return _write(compute_nav(starts, through))
+
+
+def load_nav(portfolio_ids: Iterable[int], start: date, through: Optional[date] = None) -> pd.DataFrame:
+    """
+    NAV_COLUMNS summed over `portfolio_ids` for each trading day in
+    [start, through]; days before any activity are zero.
+    """
+    through = through or last_closed_session()
+    portfolio_ids = list(portfolio_ids)
+    days = pd.DatetimeIndex(CALENDAR.trading_days(start, through), name="Date")
+
+    stored = list(
+        PortfolioNAV.objects.filter(portfolio_id__in=portfolio_ids, date__gte=start, date__lte=through)
+        .values("date")
+        .annotate(**{col: Sum(col) for col in NAV_COLUMNS})
+        .order_by("date")
+    )
+    nav = pd.DataFrame(stored, columns=["date", *NAV_COLUMNS])
+    nav.index = pd.DatetimeIndex(pd.to_datetime(nav.pop("date")), name="Date")
+    nav = nav.reindex(days, fill_value=0.0).astype(float)
+
+    # Days not written yet (before the post-close job or a recompute ran)
+    lasts = dict(
+        PortfolioNAV.objects.filter(portfolio_id__in=portfolio_ids)
+        .values_list("portfolio_id").annotate(last=Max("date"))
+    )
+    firsts = _first_activity([pid for pid in portfolio_ids if lasts.get(pid, date.min) < through])
+    missing = {
+        pid: max(lasts[pid] + timedelta(days=1) if pid in lasts else first, start)
+        for pid, first in firsts.items()
+    }
+    for frame in compute_nav(missing, through).values():
+        nav = nav.add(frame.reindex(days, fill_value=0.0), fill_value=0.0)
+    return nav
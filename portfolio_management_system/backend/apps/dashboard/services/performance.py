@@ -0,0 +1,116 @@
+# dashboard/services/performance.py
+
+"""Vectorized position replay for the portfolio performance series.
+
+Transactions and deposits are loaded once and scattered into per-date delta
+matrices: each event lands on the first valuation date on or after it, so
+a cumulative sum down the date axis yields the positions, cash flows and
+deposits held on every date. Valuation is then one row-wise product of the
+position matrix with the price panel. This replaces re-filtering and
+replaying the whole history (plus two aggregates) for every point.
+
+Replay rules (shared with the position ledger, services.ledger):
+  - Buy:                    +quantity, cash -(quantity * price + commission)
+  - Sell:                   -quantity, cash +(quantity * price - commission)
+  - Dividend Reinvestment:  +quantity, no cash movement (paid in shares)
+  - Dividend Deposit:       cash +Total (paid in cash)
+  - anything else:          ignored
+  - deposits:               +amount to both cash and CashDeposits
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# (symbol, date_transaction, transaction_type, Quantity, Buy_Price, Commission, Total)
+TxnRow = Tuple[str, object, str, float, float, float, float]
+# (date_transaction, total_amount)
+DepositRow = Tuple[object, float]
+
+TXN_FIELDS = ("symbol", "date_transaction", "transaction_type", "Quantity", "Buy_Price", "Commission", "Total")
+DEPOSIT_FIELDS = ("date_transaction", "total_amount")
+
+
+def _date_slots(dates: pd.DatetimeIndex, events: Sequence) -> np.ndarray:
+    """Index of the first valuation date on/after each event (len(dates) if none)."""
+    days = dates.values.astype("datetime64[D]")
+    return np.searchsorted(days, np.array(events, dtype="datetime64[D]"), side="left")
+
+
+def replay_positions(
+    dates: pd.DatetimeIndex,
+    txns: Iterable[TxnRow],
+    deposits: Iterable[DepositRow],
+    prices: pd.DataFrame,
+    exclude: Iterable[str] = (),
+) -> pd.DataFrame:
+    """
+    Daily Value, CashValue and CashDeposits on `dates` (sorted).
+
+    `prices` is the Close panel indexed by `dates`; symbols missing from it,
+    or listed in `exclude` (the benchmark index), contribute no value.
+    """
+    txns = list(txns)
+    deposits = list(deposits)
+    n = len(dates)
+
+    symbols = sorted({t[0] for t in txns})
+    col = {s: i for i, s in enumerate(symbols)}
+
+    qty_delta = np.zeros((n + 1, len(symbols)))
+    cash_delta = np.zeros(n + 1)
+    deposit_delta = np.zeros(n + 1)
+
+    if txns:
+        slot = _date_slots(dates, [t[1] for t in txns])
+        sym = np.fromiter((col[t[0]] for t in txns), dtype=np.int64, count=len(txns))
+        kind = np.array([t[2] for t in txns], dtype=object)
+        qty = np.array([t[3] or 0 for t in txns], dtype=float)
+        price = np.array([t[4] or 0 for t in txns], dtype=float)
+        commission = np.array([t[5] or 0 for t in txns], dtype=float)
+        total = np.array([t[6] or 0 for t in txns], dtype=float)
+
+        buy = kind == "Buy"
+        sell = kind == "Sell"
+        drip = kind == "Dividend Reinvestment"
+        dividend = kind == "Dividend Deposit"
+
+        sign = np.where(buy | drip, 1.0, np.where(sell, -1.0, 0.0))
+        np.add.at(qty_delta, (slot, sym), sign * qty)
+
+        cash = np.select(
+            [buy, sell, dividend],
+            [-(qty * price + commission), qty * price - commission, total],
+            0.0,
+        )
+        np.add.at(cash_delta, slot, cash)
+
+    if deposits:
+        slot = _date_slots(dates, [d[0] for d in deposits])
+        amount = np.array([d[1] or 0 for d in deposits], dtype=float)
+        np.add.at(deposit_delta, slot, amount)
+
+    positions = np.cumsum(qty_delta, axis=0)[:n]
+    cash_flow = np.cumsum(cash_delta)[:n]
+    cash_deposits = np.cumsum(deposit_delta)[:n]
+
+    exclude = set(exclude)
+    valued = [s for s in symbols if s in prices.columns and s not in exclude]
+    if valued:
+        panel = prices[valued].to_numpy(dtype=float, na_value=np.nan)
+        panel = np.nan_to_num(panel, nan=0.0)
+        value = np.einsum("ij,ij->i", positions[:, [col[s] for s in valued]], panel)
+    else:
+        value = np.zeros(n)
+
+    return pd.DataFrame(
+        {
+            "Value": value,
+            "CashValue": value + cash_deposits + cash_flow,
+            "CashDeposits": cash_deposits,
+        },
+        index=dates,
+    )
@@ -1,40 +1,46 @@
 # dashboard/services/pnl.py
 
 from collections import defaultdict
+from datetime import date
 from decimal import Decimal
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
+from django.db import transaction as db_transaction
 
-def annotate_realized_pnl(txns: Iterable) -> List:
+from apps.dashboard.models import transaction
+from apps.dashboard.services.dashboard_versions import bump_portfolio_versions
+from apps.dashboard.services.ledger import update_position_ledger
+from apps.dashboard.tasks.nav_tasks import recompute_nav
+
+# Fields annotate_realized_pnl reads, as loaded for persistence
+PNL_FIELDS = ("id", "symbol", "date_transaction", "Quantity", "Buy_Price", "Commission", "transaction_type", "Total")
+
+
+def annotate_realized_pnl(txns: Iterable[dict]) -> List[dict]:
     """
-    Adds `realized_pnl` and `dividends_paid` attributes to each transaction
-    in a queryset or list, using FIFO matching of buys to sells.
+    Sets the `realized_pnl` and `dividends_paid` keys on each transaction
+    dict (rows from `.values(*PNL_FIELDS)`), using FIFO matching of buys to
+    sells.
 
     Behaviour (same as original in dashboard.views):
       - For Buy transactions:
-            t.realized_pnl = None
-            t.dividends_paid = None
+            t["realized_pnl"] = None
+            t["dividends_paid"] = None
       - For Sell transactions:
-            t.realized_pnl = FIFO realized PnL (Decimal, rounded to 2 dp)
-            t.dividends_paid = None
+            t["realized_pnl"] = FIFO realized PnL (Decimal, rounded to 2 dp)
+            t["dividends_paid"] = None
       - For Dividend Deposit / Dividend Reinvestment:
-            t.realized_pnl = None
-            t.dividends_paid = Total (rounded to 2 dp)
+            t["realized_pnl"] = None
+            t["dividends_paid"] = Total (Decimal, rounded to 2 dp)
       - Else:
             both set to None
 
-    The function mutates the transaction objects and also returns them
-    as a list sorted by (date_transaction, id).
-
-    Expected transaction fields:
-        t.symbol
-        t.date_transaction
-        t.id
-        t.Quantity
-        t.Buy_Price
-        t.Commission
-        t.transaction_type
-        t.Total (for dividend transactions)
+    The function mutates the dicts in place and also returns them as a list
+    sorted by (date_transaction, id).
+
+    Expected keys (PNL_FIELDS):
+        symbol, date_transaction, id, Quantity, Buy_Price, Commission,
+        transaction_type, Total (for dividend transactions)
     """
     # Sort by symbol + date to ensure FIFO order
     txns = sorted(txns, key=lambda t: (t["symbol"], t["date_transaction"], t["id"]))
@@ -100,3 +106,62 @@ def annotate_realized_pnl(txns: Iterable) -> List:
     # Sort back into date order for reporting
     txns = sorted(txns, key=lambda t: (t["date_transaction"], t["id"]))
     return txns
+
+
+def _as_float(value):
+    return None if value is None else float(value)
+
+
+def recompute_realized_pnl(portfolio_ids: Iterable[int], symbols: Optional[Iterable[str]] = None) -> int:
+    """
+    Persist `realized_pnl` / `dividends_paid` on the transactions of
+    `portfolio_ids` (optionally only `symbols`). FIFO runs per portfolio and
+    symbol, so a symbol's values only depend on its own history in that
+    portfolio and a partial recompute is exact. Returns rows written.
+    """
+    txns = transaction.objects.filter(Holding__portfolio_id__in=list(portfolio_ids))
+    if symbols is not None:
+        txns = txns.filter(symbol__in=list(symbols))
+
+    by_portfolio = defaultdict(list)
+    for row in txns.values(*PNL_FIELDS, "Holding__portfolio_id"):
+        by_portfolio[row.pop("Holding__portfolio_id")].append(row)
+
+    updates = []
+    for rows in by_portfolio.values():
+        for t in annotate_realized_pnl(rows):
+            updates.append(
+                transaction(
+                    id=t["id"],
+                    realized_pnl=_as_float(t["realized_pnl"]),
+                    dividends_paid=_as_float(t["dividends_paid"]),
+                )
+            )
+    transaction.objects.bulk_update(updates, ["realized_pnl", "dividends_paid"], batch_size=500)
+    return len(updates)
+
+
+def on_transactions_changed(
+    portfolio_ids: Iterable[int],
+    symbols: Optional[Iterable[str]] = None,
+    since: Optional[date] = None,
+) -> None:
+    """
+    Call after transactions were added, edited or removed; once the
+    surrounding database transaction commits, recomputes the stored realized
+    PnL, replays the position ledger from `since` (the earliest changed
+    date; None replays the whole history of `symbols`), invalidates the
+    owners' cached dashboards and queues a rewrite of the portfolios' NAV
+    rows from that date.
+    """
+    portfolio_ids = set(portfolio_ids)
+    symbols = None if symbols is None else set(symbols)
+    since = None if since is None else date.fromisoformat(str(since))
+
+    def refresh():
+        recompute_realized_pnl(portfolio_ids, symbols)
+        update_position_ledger(portfolio_ids, symbols, since)
+        bump_portfolio_versions(portfolio_ids)
+        recompute_nav.delay(list(portfolio_ids), since.isoformat() if since else None)
+
+    db_transaction.on_commit(refresh)
@@ -0,0 +1,149 @@
+# dashboard/services/price_cache.py
+
+"""In-process LRU cache for `get_prices` panels.
+
+Entries are keyed on (normalized symbol set, start, end, interval) and tagged
+with the `Ticker.data_version` of every ticker they were built from. The
+versions are re-read from the database on each lookup (the same Ticker query
+`get_prices` already needs), so an entry written before a refresh can never be
+served after it, even when the refresh ran in another process (Celery).
+
+`_store_history` additionally calls `invalidate_tickers` so that the process
+performing the write drops its stale entries immediately.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import pandas as pd
+from django.conf import settings
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+CacheKey = Tuple[Tuple[str, ...], date, date, str]
+Versions = Tuple[Tuple[int, int], ...]
+
+
+@dataclass
+class _Entry:
+    versions: Versions
+    ticker_ids: FrozenSet[int]
+    frame: pd.DataFrame
+    nbytes: int
+
+
+def make_key(symbols: Iterable[str], start: date, end: date, interval: str) -> CacheKey:
+    return tuple(sorted(symbols)), start, end, interval
+
+
+def _frame_nbytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class PriceCache:
+    """Thread-safe LRU of price panels bounded by an approximate memory cap."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._by_ticker: Dict[int, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: CacheKey, versions: Versions) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.versions != versions:
+                # Data was refreshed since this panel was built
+                self._drop(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            frame = entry.frame
+        return frame.copy()
+
+    def put(self, key: CacheKey, versions: Versions, frame: pd.DataFrame) -> None:
+        nbytes = _frame_nbytes(frame)
+        if nbytes > self.max_bytes:
+            return
+
+        ticker_ids = frozenset(ticker_id for ticker_id, _ in versions)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(versions, ticker_ids, frame.copy(), nbytes)
+            self._bytes += nbytes
+            for ticker_id in ticker_ids:
+                self._by_ticker.setdefault(ticker_id, set()).add(key)
+
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate_tickers(self, ticker_ids: Iterable[int]) -> int:
+        """Drop every cached panel that includes one of `ticker_ids`."""
+        dropped = 0
+        with self._lock:
+            for ticker_id in ticker_ids:
+                for key in list(self._by_ticker.get(ticker_id, ())):
+                    self._drop(key)
+                    dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_ticker.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _drop(self, key: CacheKey) -> None:
+        # Caller must hold the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.nbytes
+        for ticker_id in entry.ticker_ids:
+            keys = self._by_ticker.get(ticker_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_ticker[ticker_id]
+
+
+price_cache = PriceCache(
+    max_bytes=getattr(settings, "PRICE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+)
+
+
+def cache_enabled() -> bool:
+    return getattr(settings, "PRICE_CACHE_ENABLED", True)
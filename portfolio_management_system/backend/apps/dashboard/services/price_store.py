@@ -0,0 +1,228 @@
+# dashboard/services/price_store.py
+
+"""Memory-mapped on-disk price store (alternate get_prices backend).
+
+Each ticker gets one `.npy` file per interval under PRICE_STORE_DIR, named
+after the `Ticker.data_version` it was exported at:
+
+    <PRICE_STORE_DIR>/<symbol>/1d.v<version>.npy
+    <PRICE_STORE_DIR>/<symbol>/1wk.v<version>.npy
+    <PRICE_STORE_DIR>/<symbol>/1mo.v<version>.npy
+
+A file holds a float64 matrix of shape (6, n) in C order, so each row is one
+contiguous column: date (days since epoch), open, high, low, close, volume.
+Files are opened with `mmap_mode="r"` and sliced by date with a binary search,
+so a date-range read touches only the pages it needs and copies nothing.
+
+Readers ask for the version they just read from the database; a ticker whose
+file for that version does not exist (not exported yet, or written since by a
+path that did not export) is read from the database instead, so the store
+never serves bars older than TickerData.
+
+Files are written by `ticker_sync` after each refresh (when the file backend
+is enabled) and can be rebuilt from TickerData with `rebuild_price_store`.
+An incremental export reads only the new bars from the database and appends
+them to the previous version's file. The columns are contiguous, so the
+result is still a new file: it is written to a temp file that is atomically
+renamed into place, and older versions are removed (readers that already
+mapped one keep their pages).
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from apps.dashboard.models import Ticker, TickerData, TickerRollup
+from apps.dashboard.services.rollups import period_labels
+
+STORE_INTERVALS = ("1d", "1wk", "1mo")
+
+# Row order inside each stored matrix
+STORE_FIELDS = ("date", "open", "high", "low", "close", "volume")
+
+
+def backend_name() -> str:
+    return getattr(settings, "PRICE_STORE_BACKEND", "db")
+
+
+def file_backend_enabled() -> bool:
+    return backend_name() == "file"
+
+
+class FilePriceStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, symbol: str, interval: str, version: int) -> Path:
+        return self.root / symbol / f"{interval}.v{version}.npy"
+
+    def stored_versions(self, symbol: str, interval: str) -> List[Tuple[int, Path]]:
+        """(version, path) of the files stored for `symbol` / `interval`, newest first."""
+        found = []
+        for path in (self.root / symbol).glob(f"{interval}.v*.npy"):
+            version = path.name[len(interval) + 2:-len(".npy")]
+            if version.isdigit():
+                found.append((int(version), path))
+        return sorted(found, reverse=True)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def write(
+        self,
+        symbol: str,
+        interval: str,
+        version: int,
+        rows: Sequence[tuple],
+        head: Optional[np.ndarray] = None,
+    ) -> int:
+        """
+        Store `rows` of (date, open, high, low, close, volume) as `version`,
+        after the columns in `head` when given, and remove other versions.
+        """
+        matrix = np.empty((len(STORE_FIELDS), len(rows)), dtype=np.float64)
+        if rows:
+            dates, *values = zip(*rows)
+            matrix[0] = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+            for i, col in enumerate(values, start=1):
+                matrix[i] = np.array(col, dtype=np.float64)
+        if head is not None:
+            matrix = np.concatenate([head, matrix], axis=1)
+
+        path = self.path_for(symbol, interval, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.save(fh, np.ascontiguousarray(matrix))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+        for stored, old in self.stored_versions(symbol, interval):
+            if stored != version:
+                old.unlink(missing_ok=True)
+        return len(rows)
+
+    def export_tickers(self, ticker_ids: Iterable[int], since: Optional[date] = None) -> int:
+        """
+        Write the daily and rollup files for `ticker_ids` at their current
+        `data_version`. With `since`, bars from then on (the periods containing
+        it, for rollups) are read from the database and appended to the file
+        of the previous version; without it, or when that file is missing,
+        the whole history is exported. Returns bars read from the database.
+        """
+        written = 0
+        tickers = Ticker.objects.filter(id__in=list(ticker_ids)).values_list("id", "symbol", "data_version")
+        for ticker_id, symbol, version in tickers:
+            for interval in STORE_INTERVALS:
+                head, bound = None, None
+                stored = self.stored_versions(symbol, interval)
+                # Appending is only safe on top of the export just before this version
+                if since is not None and stored and stored[0][0] == version - 1:
+                    bound = _first_label(since, interval)
+                    previous = np.load(stored[0][1], mmap_mode="r")
+                    cut = np.searchsorted(previous[0], np.datetime64(bound, "D").astype(np.int64), side="left")
+                    head = previous[:, :cut]
+
+                if interval == "1d":
+                    rows = TickerData.objects.filter(ticker_id=ticker_id)
+                else:
+                    rows = TickerRollup.objects.filter(ticker_id=ticker_id, period=interval)
+                if bound is not None:
+                    rows = rows.filter(date__gte=bound)
+                written += self.write(
+                    symbol, interval, version, list(rows.order_by("date").values_list(*STORE_FIELDS)), head
+                )
+        return written
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def open(self, symbol: str, interval: str, version: int) -> Optional[np.ndarray]:
+        try:
+            return np.load(self.path_for(symbol, interval, version), mmap_mode="r")
+        except FileNotFoundError:
+            return None
+
+    def slice(self, symbol: str, interval: str, version: int, first: date, last: date) -> Optional[np.ndarray]:
+        """Zero-copy view of the columns with first <= date <= last (None if not stored at `version`)."""
+        matrix = self.open(symbol, interval, version)
+        if matrix is None:
+            return None
+        lo_hi = np.array([first, last], dtype="datetime64[D]").astype(np.int64)
+        lo = np.searchsorted(matrix[0], lo_hi[0], side="left")
+        hi = np.searchsorted(matrix[0], lo_hi[1], side="right")
+        return matrix[:, lo:hi]
+
+
+def _first_label(day: date, interval: str) -> date:
+    """First stored date affected by a change on `day`."""
+    if interval == "1d":
+        return day
+    return period_labels(np.array([day], dtype="datetime64[D]"), interval)[0].item()
+
+
+def get_store() -> FilePriceStore:
+    return FilePriceStore(
+        getattr(settings, "PRICE_STORE_DIR", Path(settings.BASE_DIR) / "price_store")
+    )
+
+
+def load_store_columns(
+    tickers: Sequence[Tuple[int, str]],
+    interval: str,
+    first: date,
+    last: date,
+    versions: Dict[int, int],
+) -> Tuple[Dict[str, np.ndarray], List[Tuple[int, str]]]:
+    """
+    Read the columnar layout used by `market_data.load_price_columns` from the
+    file store. `first`/`last` are inclusive bounds on the stored date (period
+    labels for rollups); `versions` maps ticker id to its current
+    `data_version`. Returns (bars, tickers_without_files) so the caller can
+    fall back to the database for tickers with no file at that version.
+    """
+    store = get_store()
+    parts: List[Tuple[int, str, np.ndarray]] = []
+    missing: List[Tuple[int, str]] = []
+
+    for ticker_id, symbol in sorted(tickers):
+        view = store.slice(symbol, interval, versions.get(ticker_id, -1), first, last)
+        if view is None:
+            missing.append((ticker_id, symbol))
+        elif view.shape[1]:
+            parts.append((ticker_id, symbol, view))
+
+    if not parts:
+        return _empty_columns(), missing
+
+    lengths = [view.shape[1] for _, _, view in parts]
+    columns = {
+        "ticker_id": np.repeat([t for t, _, _ in parts], lengths).astype(np.int64),
+        "symbol": np.repeat(np.array([s for _, s, _ in parts], dtype=object), lengths),
+        "date": np.concatenate([view[0] for _, _, view in parts]).astype(np.int64).astype("datetime64[D]"),
+    }
+    for i, field in enumerate(STORE_FIELDS[1:], start=1):
+        columns[field] = np.concatenate([view[i] for _, _, view in parts])
+    return columns, missing
+
+
+def _empty_columns() -> Dict[str, np.ndarray]:
+    return {
+        "ticker_id": np.empty(0, dtype=np.int64),
+        "symbol": np.empty(0, dtype=object),
+        "date": np.empty(0, dtype="datetime64[D]"),
+        **{f: np.empty(0, dtype=np.float64) for f in STORE_FIELDS[1:]},
+    }
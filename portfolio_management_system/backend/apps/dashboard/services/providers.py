@@ -0,0 +1,294 @@
+# dashboard/services/providers.py
+
+"""Market-data provider interface.
+
+Everything that talks to an external market-data source goes through the
+provider selected by MARKET_DATA_PROVIDER:
+
+    "yfinance"  live Yahoo Finance data (default)
+    "replay"    deterministic offline data: recorded fixtures from
+                MARKET_DATA_FIXTURES_DIR when present, otherwise synthetic
+                series generated per symbol
+
+Frames follow `yf.download` conventions so callers do not care which provider
+is active: history is indexed by a "Date" DatetimeIndex with (Price, Ticker)
+MultiIndex columns, and `end` is exclusive.
+"""
+
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+PRICE_COLUMNS = ["Close", "High", "Low", "Open", "Volume"]
+
+Symbols = Union[str, Iterable[str]]
+
+
+def _as_list(symbols: Symbols) -> List[str]:
+    return [symbols] if isinstance(symbols, str) else list(symbols)
+
+
+def financial_metrics(symbol: str, info: dict) -> dict:
+    """Standardized metrics served by the financials API, from a provider info dict."""
+    return {
+        "symbol": symbol,
+        "company_name": info.get("longName") or symbol,
+        "sector": info.get("sector") or "",
+        "market_cap": info.get("marketCap"),
+        "pe_ratio": info.get("trailingPE"),
+        "pb_ratio": info.get("priceToBook"),
+        "eps": info.get("trailingEps"),
+        "dividend_yield": info.get("dividendYield"),
+        "revenue": info.get("totalRevenue"),
+        "net_income": info.get("netIncome"),
+        "debt_to_equity": info.get("debtToEquity"),
+        "roe": info.get("returnOnEquity"),
+    }
+
+
+class MarketDataProvider(ABC):
+    """Base class for market-data sources."""
+
+    name = "base"
+
+    @abstractmethod
+    def history(self, symbols: Symbols, start: date, end: date, timeout: Optional[float] = None) -> pd.DataFrame:
+        """Daily OHLCV bars for start <= date < end, shaped like `yf.download`."""
+
+    @abstractmethod
+    def dividends(self, symbols: Symbols, start: date, end: date) -> pd.DataFrame:
+        """Dividend per share by ex-date: one column per symbol, zero/NaN when none."""
+
+    @abstractmethod
+    def info(self, symbol: str) -> dict:
+        """Company profile using yfinance `Ticker.info` keys (longName, sector, ...)."""
+
+    def fundamentals(self, symbol: str) -> dict:
+        return financial_metrics(symbol, self.info(symbol) or {})
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def history(self, symbols, start, end, timeout=None):
+        import yfinance as yf
+
+        return yf.download(
+            symbols,
+            start=start,
+            end=end,
+            progress=False,
+            auto_adjust=True,
+            timeout=timeout or 10,
+        )
+
+    def dividends(self, symbols, start, end):
+        import yfinance as yf
+
+        return yf.download(_as_list(symbols), start=start, end=end, actions=True, progress=False)["Dividends"]
+
+    def info(self, symbol):
+        import yfinance as yf
+
+        return yf.Ticker(symbol).info or {}
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Offline provider for benchmarks and load tests.
+
+    For each symbol it reads `<fixtures_dir>/<symbol>.csv` (Date, Open, High,
+    Low, Close, Volume[, Dividends]) and `<symbol>.json` (info) when they
+    exist, as written by the `record_market_fixtures` command. Symbols without
+    fixtures get a synthetic geometric Brownian motion seeded from the symbol,
+    generated from a fixed origin so a given (symbol, date) always has the same
+    bar whatever window is requested. Bars never extend past today.
+
+    `latency` seconds are slept per call to mimic a network round trip.
+    """
+
+    name = "replay"
+
+    ORIGIN = date(2000, 1, 3)
+    SECTORS = (
+        "Financial Services",
+        "Basic Materials",
+        "Energy",
+        "Healthcare",
+        "Technology",
+        "Consumer Defensive",
+        "Industrials",
+        "Real Estate",
+    )
+
+    def __init__(self, fixtures_dir: Optional[Path] = None, latency: float = 0.0):
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.latency = latency
+        self._fixtures: Dict[str, Optional[pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Interface
+    # ------------------------------------------------------------------
+
+    def history(self, symbols, start, end, timeout=None):
+        self._wait()
+        frames = {sym: self._bars(sym, start, end)[["Open", "High", "Low", "Close", "Volume"]] for sym in _as_list(symbols)}
+        return _to_download_frame(frames, PRICE_COLUMNS)
+
+    def dividends(self, symbols, start, end):
+        self._wait()
+        columns = {sym: self._bars(sym, start, end)["Dividends"] for sym in _as_list(symbols)}
+        frame = pd.DataFrame(columns)
+        frame.index.name = "Date"
+        return frame.fillna(0.0)
+
+    def info(self, symbol):
+        self._wait()
+        path = self._fixture_path(symbol, "json")
+        if path is not None and path.exists():
+            return json.loads(path.read_text())
+
+        rng = np.random.default_rng(self._seed(symbol))
+        base = symbol.split(".")[0].lstrip("^")
+        return {
+            "symbol": symbol,
+            "longName": f"{base} Holdings Ltd",
+            "sector": self.SECTORS[self._seed(symbol) % len(self.SECTORS)],
+            "marketCap": int(rng.uniform(1e8, 2e11)),
+            "trailingPE": round(float(rng.uniform(6, 40)), 2),
+            "priceToBook": round(float(rng.uniform(0.5, 8)), 2),
+            "trailingEps": round(float(rng.uniform(0.05, 6)), 2),
+            "dividendYield": round(float(rng.uniform(0, 7)), 2),
+            "totalRevenue": int(rng.uniform(1e7, 5e10)),
+            "netIncome": int(rng.uniform(-1e8, 8e9)),
+            "debtToEquity": round(float(rng.uniform(0, 250)), 2),
+            "returnOnEquity": round(float(rng.uniform(-0.1, 0.35)), 4),
+        }
+
+    # ------------------------------------------------------------------
+    # Data sources
+    # ------------------------------------------------------------------
+
+    def _bars(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        end = min(end, date.today() + timedelta(days=1))
+        bars = self._load_fixture(symbol)
+        if bars is None:
+            bars = self._synthesize(symbol, end)
+        return bars.loc[(bars.index >= pd.Timestamp(start)) & (bars.index < pd.Timestamp(end))]
+
+    def _fixture_path(self, symbol: str, ext: str) -> Optional[Path]:
+        if self.fixtures_dir is None:
+            return None
+        return self.fixtures_dir / f"{symbol}.{ext}"
+
+    def _load_fixture(self, symbol: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            if symbol in self._fixtures:
+                return self._fixtures[symbol]
+
+        frame = None
+        path = self._fixture_path(symbol, "csv")
+        if path is not None and path.exists():
+            frame = pd.read_csv(path, parse_dates=["Date"], index_col="Date").sort_index()
+            if "Dividends" not in frame:
+                frame["Dividends"] = 0.0
+
+        with self._lock:
+            self._fixtures[symbol] = frame
+        return frame
+
+    @staticmethod
+    def _seed(symbol: str) -> int:
+        return zlib.crc32(symbol.encode("utf-8"))
+
+    def _synthesize(self, symbol: str, end: date) -> pd.DataFrame:
+        days = pd.bdate_range(self.ORIGIN, max(end, self.ORIGIN), inclusive="left", name="Date")
+        n = len(days)
+        seed = self._seed(symbol)
+
+        # One generator per field so the first k draws do not depend on n
+        def draws(stream: int):
+            return np.random.default_rng([seed, stream])
+
+        params = draws(0)
+        start_price = params.uniform(2, 120)
+        drift = params.uniform(-0.02, 0.12)
+        vol = params.uniform(0.15, 0.45)
+
+        log_returns = draws(1).normal((drift - 0.5 * vol ** 2) / 252, vol / np.sqrt(252), n)
+        close = start_price * np.exp(np.cumsum(log_returns))
+        prev_close = np.concatenate(([start_price], close[:-1]))
+        open_ = prev_close * (1 + draws(2).normal(0, vol / np.sqrt(252) / 3, n))
+        high = np.maximum(open_, close) * (1 + np.abs(draws(3).normal(0, 0.006, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(draws(4).normal(0, 0.006, n)))
+        volume = np.floor(draws(5).lognormal(13, 0.6, n))
+
+        # Semi-annual dividends on the first trading day of March and September
+        first_of_month = ~days.to_period("M").duplicated()
+        payers = first_of_month & days.month.isin([3, 9])
+        dividends = np.where(payers, np.round(close * params.uniform(0.005, 0.03), 4), 0.0)
+
+        return pd.DataFrame(
+            {
+                "Open": open_,
+                "High": high,
+                "Low": low,
+                "Close": close,
+                "Volume": volume,
+                "Dividends": dividends,
+            },
+            index=days,
+        )
+
+    def _wait(self) -> None:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+
+def _to_download_frame(frames: Dict[str, pd.DataFrame], fields: List[str]) -> pd.DataFrame:
+    """Combine per-symbol frames into the (Price, Ticker) layout of `yf.download`."""
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, axis=1, names=["Ticker", "Price"])
+    combined = combined.swaplevel(0, 1, axis=1)
+    combined = combined.reindex(
+        columns=pd.MultiIndex.from_product([fields, list(frames)], names=["Price", "Ticker"])
+    )
+    combined.index.name = "Date"
+    return combined.dropna(how="all")
+
+
+_providers: Dict[str, MarketDataProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def build_provider(name: str) -> MarketDataProvider:
+    if name == "yfinance":
+        return YFinanceProvider()
+    if name == "replay":
+        return ReplayProvider(
+            fixtures_dir=getattr(settings, "MARKET_DATA_FIXTURES_DIR", None),
+            latency=float(getattr(settings, "MARKET_DATA_REPLAY_LATENCY", 0.0)),
+        )
+    raise ValueError(f"Unknown market data provider '{name}'")
+
+
+def get_provider() -> MarketDataProvider:
+    """The provider configured by MARKET_DATA_PROVIDER (one instance per process)."""
+    name = getattr(settings, "MARKET_DATA_PROVIDER", "yfinance")
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = build_provider(name)
+        return _providers[name]
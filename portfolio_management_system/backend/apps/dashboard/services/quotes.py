@@ -0,0 +1,129 @@
+# dashboard/services/quotes.py
+
+"""LatestQuote maintenance and lookups.
+
+One row per ticker holding the last and previous close, so "today vs
+yesterday" is a single indexed read instead of a range scan over TickerData.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from apps.dashboard.models import LatestQuote, TickerData
+
+
+def refresh_latest_quotes(ticker_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute LatestQuote from the two most recent closes of each ticker.
+
+    Runs one windowed query for all requested tickers (all tickers if None).
+    """
+    bars = TickerData.objects.filter(close__isnull=False)
+    if ticker_ids is not None:
+        ticker_ids = list(ticker_ids)
+        if not ticker_ids:
+            return 0
+        bars = bars.filter(ticker_id__in=ticker_ids)
+
+    rows = (
+        bars.annotate(
+            rn=Window(
+                RowNumber(),
+                partition_by=[F("ticker_id")],
+                order_by=F("date").desc(),
+            )
+        )
+        .filter(rn__lte=2)
+        .order_by("ticker_id", "-date")
+        .values_list("ticker_id", "date", "close")
+    )
+
+    latest: Dict[int, list] = {}
+    for ticker_id, day, close in rows:
+        latest.setdefault(ticker_id, []).append((day, close))
+
+    now = timezone.now()
+    quotes = []
+    for ticker_id, closes in latest.items():
+        last_date, last_close = closes[0]
+        prev_date, prev_close = closes[1] if len(closes) > 1 else (None, None)
+
+        change = change_pct = None
+        if prev_close is not None:
+            change = last_close - prev_close
+            change_pct = (change / prev_close) * 100 if prev_close else None
+
+        quotes.append(
+            LatestQuote(
+                ticker_id=ticker_id,
+                last_date=last_date,
+                last_close=last_close,
+                prev_date=prev_date,
+                prev_close=prev_close,
+                change=change,
+                change_pct=change_pct,
+                as_of=now,
+            )
+        )
+
+    LatestQuote.objects.bulk_create(
+        quotes,
+        update_conflicts=True,
+        unique_fields=["ticker"],
+        update_fields=[
+            "last_date",
+            "last_close",
+            "prev_date",
+            "prev_close",
+            "change",
+            "change_pct",
+            "as_of",
+        ],
+    )
+    return len(quotes)
+
+
+def get_latest_quotes(symbols: Iterable[str]) -> List[dict]:
+    """
+    Quotes for `symbols`, which may be base tickers ("BHP") or fully
+    qualified symbols ("BHP.AX"). Single query.
+    """
+    symbols = [s for s in symbols if s]
+    if not symbols:
+        return []
+
+    return list(
+        LatestQuote.objects
+        .filter(Q(ticker__ticker__in=symbols) | Q(ticker__symbol__in=symbols))
+        .annotate(ticker_code=F("ticker__ticker"), symbol=F("ticker__symbol"))
+        .values(
+            "ticker_code",
+            "symbol",
+            "last_date",
+            "last_close",
+            "prev_date",
+            "prev_close",
+            "change",
+            "change_pct",
+            "as_of",
+        )
+    )
+
+
+def close_maps(symbols: Iterable[str]):
+    """
+    Return ({symbol: last_close}, {symbol: prev_close}) keyed by both the base
+    ticker and the fully qualified symbol, for drop-in use by the dashboard.
+    """
+    latest: Dict[str, float] = {}
+    previous: Dict[str, float] = {}
+    for quote in get_latest_quotes(symbols):
+        for key in (quote["ticker_code"], quote["symbol"]):
+            latest[key] = quote["last_close"]
+            previous[key] = quote["prev_close"]
+    return latest, previous
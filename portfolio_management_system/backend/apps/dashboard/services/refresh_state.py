@@ -0,0 +1,169 @@
+# dashboard/services/refresh_state.py
+
+"""Market-refresh lock and freshness state.
+
+With MARKET_REFRESH_STATE_BACKEND = "redis" (default) the refresh lock and the
+last-refresh timestamp live in Redis (the Celery broker instance unless
+MARKET_REFRESH_REDIS_URL says otherwise):
+
+    <prefix>:lock    "<token>:<reason>", SET NX PX (expires on its own)
+    <prefix>:fence   INCR counter issuing monotonically increasing tokens
+    <prefix>:state   hash {last_refresh, token} written with a fencing check
+
+Each acquisition gets a fencing token. Release only deletes the lock if the
+caller still owns it, and a last-refresh write carrying a token older than
+one already recorded is rejected, so a holder whose lock expired mid-run can
+neither free nor overwrite the state of its successor.
+
+The "db" backend keeps the original behaviour of a `select_for_update` on the
+single MarketRefreshState row; it is used where no Redis is available.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.dashboard.models import MarketRefreshState
+
+RELEASE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value and string.match(value, '^(%d+):') == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+RECORD_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'token') or '0')
+local token = tonumber(ARGV[2])
+if token > 0 and token < current then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'last_refresh', ARGV[1])
+if token > current then
+    redis.call('HSET', KEYS[1], 'token', token)
+end
+return 1
+"""
+
+
+class RedisRefreshState:
+    def __init__(self, client, prefix: str):
+        self.client = client
+        self.lock_key = f"{prefix}:lock"
+        self.fence_key = f"{prefix}:fence"
+        self.state_key = f"{prefix}:state"
+        self._release = client.register_script(RELEASE_SCRIPT)
+        self._record = client.register_script(RECORD_SCRIPT)
+
+    def acquire(self, reason: str, ttl_seconds: float) -> Optional[int]:
+        """Fencing token if the lock was free, else None."""
+        token = int(self.client.incr(self.fence_key))
+        ok = self.client.set(self.lock_key, f"{token}:{reason}", nx=True, px=int(ttl_seconds * 1000))
+        return token if ok else None
+
+    def release(self, token: int) -> bool:
+        return bool(self._release(keys=[self.lock_key], args=[str(token)]))
+
+    def record(self, moment: datetime, token: Optional[int] = None) -> bool:
+        """Store `moment` as the last refresh unless a newer holder already did."""
+        return bool(self._record(keys=[self.state_key], args=[moment.isoformat(), int(token or 0)]))
+
+    def last_refresh(self) -> Optional[datetime]:
+        value = self.client.hget(self.state_key, "last_refresh")
+        if not value:
+            return None
+        return datetime.fromisoformat(value.decode() if isinstance(value, bytes) else value)
+
+    def holder(self) -> Optional[str]:
+        value = self.client.get(self.lock_key)
+        return value.decode() if isinstance(value, bytes) else value
+
+
+class DatabaseRefreshState:
+    """Row-locked state on MarketRefreshState(pk=1)."""
+
+    def _row(self, *, for_update: bool = False) -> MarketRefreshState:
+        query = MarketRefreshState.objects
+        if for_update:
+            query = query.select_for_update()
+        state, _ = query.get_or_create(pk=1)
+        return state
+
+    def acquire(self, reason: str, ttl_seconds: float) -> Optional[int]:
+        now = timezone.now()
+        with transaction.atomic():
+            state = self._row(for_update=True)
+            if state.refresh_lock_expires_at and state.refresh_lock_expires_at > now:
+                return None
+            state.refresh_lock_reason = reason
+            state.refresh_lock_acquired_at = now
+            state.refresh_lock_expires_at = now + timedelta(seconds=ttl_seconds)
+            state.save(
+                update_fields=[
+                    "refresh_lock_reason",
+                    "refresh_lock_acquired_at",
+                    "refresh_lock_expires_at",
+                ]
+            )
+        # Acquisition time doubles as a (coarse) increasing token
+        return int(now.timestamp() * 1_000_000)
+
+    def release(self, token: int) -> bool:
+        with transaction.atomic():
+            state = self._row(for_update=True)
+            state.refresh_lock_reason = None
+            state.refresh_lock_acquired_at = None
+            state.save(update_fields=["refresh_lock_reason", "refresh_lock_acquired_at"])
+        return True
+
+    def record(self, moment: datetime, token: Optional[int] = None) -> bool:
+        with transaction.atomic():
+            state = self._row(for_update=True)
+            state.last_refresh = moment
+            state.save(update_fields=["last_refresh"])
+        return True
+
+    def last_refresh(self) -> Optional[datetime]:
+        return self._row().last_refresh
+
+    def holder(self) -> Optional[str]:
+        return self._row().refresh_lock_reason
+
+
+def backend_name() -> str:
+    return getattr(settings, "MARKET_REFRESH_STATE_BACKEND", "redis")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_refresh_state():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if backend_name() == "redis":
+                client = redis.Redis.from_url(
+                    getattr(settings, "MARKET_REFRESH_REDIS_URL", settings.REDIS_URL),
+                    socket_timeout=2,
+                )
+                _backend = RedisRefreshState(client, getattr(settings, "MARKET_REFRESH_REDIS_PREFIX", "pms:market-refresh"))
+            else:
+                _backend = DatabaseRefreshState()
+        return _backend
+
+
+def write_audit(**fields) -> None:
+    """Mirror lock/refresh events onto MarketRefreshState (write-only, no row lock)."""
+    if backend_name() != "redis":
+        return
+    if not MarketRefreshState.objects.filter(pk=1).update(**fields):
+        MarketRefreshState.objects.get_or_create(pk=1, defaults=fields)
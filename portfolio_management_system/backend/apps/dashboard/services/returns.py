@@ -0,0 +1,146 @@
+# dashboard/services/returns.py
+
+"""Time-weighted and money-weighted returns from NAV and external flows.
+
+Both work on 2-D arrays (one row per portfolio), so a batch of portfolios is
+solved in the same NumPy pass as a single one.
+
+Time-weighted return: flows are taken at the start of the day they land, so
+the daily return is `nav_t / (nav_{t-1} + flow_t) - 1` (0 while nothing is
+invested), and the cumulative TWR is the running product of `1 + r`.
+
+Money-weighted return (XIRR): the annual rate `r` with
+`sum(cf_i * (1 + r) ** -t_i) == 0`, `t_i` in years from the first flow and
+`cf_i` from the investor's side (deposits negative, final NAV positive).
+Newton's method runs on every row at once, with a vectorized bisection for
+rows it cannot solve; rows without a root (no sign change in their flows,
+say) come back NaN.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+XIRR_TOLERANCE = 1e-9
+XIRR_MAX_ITERATIONS = 100
+# Guess and search range for the rate; (1 + r) must stay positive
+XIRR_GUESS = 0.1
+XIRR_FLOOR = -0.9999
+XIRR_CEILING = 1e4
+XIRR_BISECTIONS = 200
+
+
+def daily_twr(nav: np.ndarray, flows: np.ndarray) -> np.ndarray:
+    """
+    Daily time-weighted returns for `nav` / `flows` of shape (days,) or
+    (portfolios, days); the first day of each row is 0.
+    """
+    nav = np.atleast_2d(np.asarray(nav, dtype=float))
+    flows = np.atleast_2d(np.asarray(flows, dtype=float))
+
+    base = np.zeros_like(nav)
+    base[:, 1:] = nav[:, :-1] + flows[:, 1:]
+    returns = np.zeros_like(nav)
+    np.divide(nav, base, out=returns, where=base > 0)
+    returns = np.where(base > 0, returns - 1.0, 0.0)
+    returns[:, 0] = 0.0
+    return returns
+
+
+def cumulative_twr(nav: np.ndarray, flows: np.ndarray) -> np.ndarray:
+    """Cumulative TWR (as a fraction) at each day, same shape rules as `daily_twr`."""
+    return np.cumprod(1.0 + daily_twr(nav, flows), axis=1) - 1.0
+
+
+def _future_value(amounts, horizon, rate):
+    """Flows compounded to each row's last flow, and the derivative in `rate`."""
+    growth = (1.0 + rate)[:, None] ** horizon
+    value = np.sum(amounts * growth, axis=1)
+    slope = np.sum(horizon * amounts * growth / (1.0 + rate)[:, None], axis=1)
+    return value, slope
+
+
+def xirr(
+    amounts: np.ndarray,
+    years: np.ndarray,
+    guess: float = XIRR_GUESS,
+    tol: float = XIRR_TOLERANCE,
+    max_iterations: int = XIRR_MAX_ITERATIONS,
+) -> np.ndarray:
+    """
+    Annual money-weighted rate per row of `amounts` (portfolios, flows) at
+    times `years` (same shape, years since each row's first flow). Pad
+    unused slots with amount 0.
+
+    Solves the future-value form `sum(cf_i * (1 + r) ** (T - t_i)) == 0`
+    (same roots, no overflow for long histories) by Newton's method; rows
+    where Newton leaves the search range or stalls fall back to bisection
+    over [XIRR_FLOOR, XIRR_CEILING].
+    """
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    years = np.atleast_2d(np.asarray(years, dtype=float))
+    horizon = np.where(amounts != 0, years.max(axis=1, keepdims=True) - years, 0.0)
+    rows = amounts.shape[0]
+
+    rate = np.full(rows, guess)
+    done = np.zeros(rows, dtype=bool)
+    for _ in range(max_iterations):
+        value, slope = _future_value(amounts, horizon, rate)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = np.where(slope != 0, value / slope, np.nan)
+        active = ~done & np.isfinite(step)
+        rate = np.where(active, rate - step, rate)
+        done |= active & (np.abs(step) < tol)
+        # Out of range: leave it to the bisection
+        rate = np.clip(rate, XIRR_FLOOR, XIRR_CEILING)
+        if done.all():
+            break
+
+    pending = ~done
+    if pending.any():
+        lo = np.full(rows, XIRR_FLOOR)
+        hi = np.full(rows, XIRR_CEILING)
+        with np.errstate(over="ignore", invalid="ignore"):
+            f_lo, _ = _future_value(amounts, horizon, lo)
+            f_hi, _ = _future_value(amounts, horizon, hi)
+            bracketed = pending & (np.sign(f_lo) * np.sign(f_hi) < 0)
+            for _ in range(XIRR_BISECTIONS):
+                mid = (lo + hi) / 2
+                f_mid, _ = _future_value(amounts, horizon, mid)
+                left = np.sign(f_mid) == np.sign(f_lo)
+                lo = np.where(left, mid, lo)
+                f_lo = np.where(left, f_mid, f_lo)
+                hi = np.where(left, hi, mid)
+                if np.all(~bracketed | (hi - lo < tol)):
+                    break
+        rate = np.where(bracketed, (lo + hi) / 2, rate)
+        done |= bracketed
+
+    return np.where(done, rate, np.nan)
+
+
+def xirr_from_nav(
+    nav: np.ndarray,
+    flows: np.ndarray,
+    day_offsets: np.ndarray,
+) -> np.ndarray:
+    """
+    XIRR per row of a daily NAV / flow matrix over its whole span: the
+    opening NAV and every flow are invested, the closing NAV is withdrawn.
+    `day_offsets` are calendar days since the first column.
+    """
+    nav = np.atleast_2d(np.asarray(nav, dtype=float))
+    flows = np.atleast_2d(np.asarray(flows, dtype=float))
+
+    amounts = -flows.copy()
+    # Opening value stands in for everything deposited before the window
+    amounts[:, 0] = -(nav[:, 0])
+    amounts[:, -1] += nav[:, -1]
+    years = np.broadcast_to(np.asarray(day_offsets, dtype=float) / 365.0, amounts.shape)
+
+    # Start each row at its first non-zero flow
+    first = np.argmax(amounts != 0, axis=1)
+    years = years - years[np.arange(len(first)), first][:, None]
+    amounts = np.where(years >= 0, amounts, 0.0)
+    return xirr(amounts, np.maximum(years, 0.0))
+
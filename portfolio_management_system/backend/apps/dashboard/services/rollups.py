@@ -0,0 +1,160 @@
+# dashboard/services/rollups.py
+
+"""Weekly / monthly OHLCV rollups maintained alongside TickerData.
+
+Bars are bucketed exactly like the pandas resample rules `get_prices` used to
+apply per request ("W" = week ending Sunday, "M" = calendar month end) and
+stored in TickerRollup, so long-range charts read one row per period instead
+of every daily bar.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from apps.dashboard.models import Ticker, TickerRollup
+
+ROLLUP_INTERVALS = ("1wk", "1mo")
+
+ROLLUP_FIELDS = ["open", "high", "low", "close", "volume"]
+
+# Number of tickers aggregated per batch when rebuilding from scratch
+REBUILD_BATCH = 50
+
+
+def period_labels(dates: np.ndarray, interval: str) -> np.ndarray:
+    """Map datetime64[D] dates to their period label (week-ending Sunday / month end)."""
+    dates = dates.astype("datetime64[D]")
+    if interval == "1wk":
+        # 1970-01-01 was a Thursday → (days + 3) % 7 gives Monday=0 .. Sunday=6
+        weekday = (dates.astype(np.int64) + 3) % 7
+        return dates + (6 - weekday).astype("timedelta64[D]")
+    if interval == "1mo":
+        return (dates.astype("datetime64[M]") + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+    raise ValueError(f"Unsupported rollup interval '{interval}'")
+
+
+def period_start(day: date, interval: str) -> date:
+    """First calendar day of the period containing `day`."""
+    if interval == "1wk":
+        return day - timedelta(days=day.weekday())
+    if interval == "1mo":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported rollup interval '{interval}'")
+
+
+def aggregate_bars(bars: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """
+    Aggregate columnar daily bars (see `market_data.load_price_columns`) into
+    period bars. Input must be ordered by (ticker_id, date); output keeps the
+    same layout with one row per (ticker_id, period label).
+    """
+    frame = pd.DataFrame(
+        {
+            "ticker_id": bars["ticker_id"],
+            "date": period_labels(bars["date"], interval),
+            "symbol": bars["symbol"],
+            **{field: bars[field] for field in ROLLUP_FIELDS},
+        }
+    )
+    out = (
+        frame.groupby(["ticker_id", "date"], sort=True)
+        .agg(
+            symbol=("symbol", "first"),
+            open=("open", "first"),
+            high=("high", "max"),
+            low=("low", "min"),
+            close=("close", "last"),
+            volume=("volume", "sum"),
+        )
+        .reset_index()
+    )
+    columns = {
+        "ticker_id": out["ticker_id"].to_numpy(dtype=np.int64),
+        "symbol": out["symbol"].to_numpy(dtype=object),
+        "date": out["date"].to_numpy().astype("datetime64[D]"),
+    }
+    for field in ROLLUP_FIELDS:
+        columns[field] = out[field].to_numpy(dtype=np.float64)
+    return columns
+
+
+def _upsert_rollups(bars: Dict[str, np.ndarray], interval: str) -> int:
+    objs = [
+        TickerRollup(
+            ticker_id=ticker_id,
+            period=interval,
+            date=day,
+            open=o,
+            high=h,
+            low=l,
+            close=c,
+            volume=v,
+        )
+        for ticker_id, day, o, h, l, c, v in zip(
+            bars["ticker_id"].tolist(),
+            bars["date"].tolist(),
+            *(np.where(np.isnan(bars[f]), None, bars[f]).tolist() for f in ROLLUP_FIELDS),
+        )
+    ]
+    TickerRollup.objects.bulk_create(
+        objs,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["ticker", "period", "date"],
+        update_fields=ROLLUP_FIELDS,
+    )
+    return len(objs)
+
+
+def update_rollups(ticker_ids: Iterable[int], since: date) -> int:
+    """
+    Recompute the rollup periods touched by daily bars on or after `since`.
+
+    Only the periods containing `since` and later are re-aggregated, so an
+    incremental sync re-reads at most one month of daily bars per ticker.
+    """
+    # Imported lazily: market_data reads rollups through this module
+    from apps.dashboard.services.market_data import load_price_columns
+
+    ticker_ids = list(ticker_ids)
+    if not ticker_ids:
+        return 0
+
+    load_from = min(period_start(since, interval) for interval in ROLLUP_INTERVALS)
+    daily = load_price_columns([(t, str(t)) for t in ticker_ids], load_from, date.max)
+    if not len(daily["date"]):
+        return 0
+
+    written = 0
+    for interval in ROLLUP_INTERVALS:
+        bars = aggregate_bars(daily, interval)
+        first_label = period_labels(np.array([since], dtype="datetime64[D]"), interval)[0]
+        keep = bars["date"] >= first_label
+        written += _upsert_rollups({k: v[keep] for k, v in bars.items()}, interval)
+    return written
+
+
+def rebuild_rollups(ticker_ids: Optional[Iterable[int]] = None) -> int:
+    """Drop and recompute rollups from the full TickerData history."""
+    from apps.dashboard.services.market_data import load_price_columns
+
+    if ticker_ids is None:
+        ticker_ids = Ticker.objects.values_list("id", flat=True)
+    ticker_ids = list(ticker_ids)
+
+    written = 0
+    for i in range(0, len(ticker_ids), REBUILD_BATCH):
+        batch = ticker_ids[i:i + REBUILD_BATCH]
+        TickerRollup.objects.filter(ticker_id__in=batch).delete()
+
+        daily = load_price_columns([(t, str(t)) for t in batch], date.min, date.max)
+        if not len(daily["date"]):
+            continue
+        for interval in ROLLUP_INTERVALS:
+            written += _upsert_rollups(aggregate_bars(daily, interval), interval)
+    return written
@@ -6,18 +6,28 @@ and keep them refreshed with the latest market data.
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import Iterable, List, Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 import datetime
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
+from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Max, Min, Sum
+from django.db.models import F, Max, Min, Sum
 from django.utils import timezone
 from apps.dashboard.constants import Index_Symbol
 from apps.dashboard.models import StockHolding, Ticker, TickerData, transaction as StockTransaction
+from apps.dashboard.services.price_cache import price_cache
+from apps.dashboard.services.dashboard_versions import bump_market_version
+from apps.dashboard.services.price_store import file_backend_enabled, get_store
+from apps.dashboard.services.providers import get_provider
+from apps.dashboard.services.quotes import refresh_latest_quotes
+from apps.dashboard.services.rate_limit import TokenBucket
+from apps.dashboard.services.rollups import update_rollups
+from apps.dashboard.services.trading_calendar import get_calendar
 
 
 @dataclass
@@ -27,6 +37,7 @@ class SyncResult:
     start: Optional[date]
     end: Optional[date]
     rows_written: int = 0
+    rows_updated: int = 0
     error: Optional[str] = None
 
 
@@ -93,84 +104,171 @@ def _normalize_date(value):
 # Ticker lifecycle
 # ---------------------------------------------------------------------------
 
-def ensure_ticker(symbol: str) -> Optional[Ticker]:
-    """
-    Create or update a Ticker record for the provided symbol.
+@dataclass
+class RefreshPlan:
+    """Refresh decision for one requested symbol (see `plan_ticker_refresh`)."""
+    symbol: str
+    ticker: Optional[Ticker]
+    start: Optional[date]
+    end: Optional[date]
 
-    Also stores the earliest and latest transaction dates for the symbol if
-    transactions exist.
-    """
 
-    ticker_code, exchange, normalized_symbol = _derive_symbol_parts(symbol)
+def _is_index(symbol: str) -> bool:
+    return symbol in (Index_Symbol, f"{Index_Symbol}.AX")
 
-    if not ticker_code:
-        return None
 
-    ticker_obj, _ = Ticker.objects.get_or_create(
-        symbol=normalized_symbol,
-        defaults={
-            "ticker": ticker_code,
-            "exchange": exchange,
-        },
-    )
+def plan_ticker_refresh(symbols: Iterable[str], today: Optional[date] = None) -> List[RefreshPlan]:
+    """
+    Create or update Ticker rows for `symbols` and work out each refresh window.
 
-    # Update missing ticker/exchange metadata
-    ticker_obj.ticker = ticker_obj.ticker or ticker_code
-    ticker_obj.exchange = ticker_obj.exchange or exchange
+    Transaction bounds, open quantities and the last stored bar are computed
+    for every symbol at once with GROUP BY queries, and Ticker rows are
+    upserted in one statement, so the query count does not grow with the
+    number of symbols. Returns one plan per distinct input symbol, in order.
+    """
+    today = today or date.today()
 
-    # Derive transaction boundaries for this symbol
-    if symbol==Index_Symbol:
-        txn_bounds = StockTransaction.objects.aggregate(
-        first=Min("date_transaction"),
-        last=Max("date_transaction"),
-        )
-        open_qty = 1000
-    else:
-        txn_bounds = StockTransaction.objects.filter(symbol__in=[symbol, normalized_symbol]).aggregate(
+    order: List[str] = []
+    parts: dict = {}
+    for symbol in symbols:
+        if symbol in parts:
+            continue
+        order.append(symbol)
+        parts[symbol] = _derive_symbol_parts(symbol)
+
+    valid = [s for s in order if parts[s][0]]
+    normalized = {parts[s][2] for s in valid}
+
+    # Transaction/holding symbols may be stored either bare ("BHP") or
+    # qualified ("BHP.AX"); map both spellings back to the qualified symbol
+    alias_to_symbol = {}
+    for s in valid:
+        alias_to_symbol[s] = parts[s][2]
+        alias_to_symbol[parts[s][2]] = parts[s][2]
+
+    first_txn: dict = {}
+    last_txn: dict = {}
+    txn_rows = (
+        StockTransaction.objects.filter(symbol__in=list(alias_to_symbol))
+        .values("symbol")
+        .annotate(first=Min("date_transaction"), last=Max("date_transaction"))
+    )
+    for row in txn_rows:
+        key = alias_to_symbol[row["symbol"]]
+        if row["first"] and (key not in first_txn or row["first"] < first_txn[key]):
+            first_txn[key] = row["first"]
+        if row["last"] and (key not in last_txn or row["last"] > last_txn[key]):
+            last_txn[key] = row["last"]
+
+    open_qty: dict = {}
+    holding_rows = (
+        StockHolding.objects.filter(company_symbol__in=list(alias_to_symbol))
+        .values("company_symbol")
+        .annotate(total_qty=Sum("number_of_shares"))
+    )
+    for row in holding_rows:
+        key = alias_to_symbol[row["company_symbol"]]
+        open_qty[key] = open_qty.get(key, 0) + (row["total_qty"] or 0)
+
+    # The index spans the whole transaction history and is always "held"
+    index_symbols = {parts[s][2] for s in valid if _is_index(s)}
+    if index_symbols:
+        bounds = StockTransaction.objects.aggregate(
             first=Min("date_transaction"),
             last=Max("date_transaction"),
         )
+        for key in index_symbols:
+            first_txn.pop(key, None)
+            last_txn.pop(key, None)
+            if bounds["first"]:
+                first_txn[key] = bounds["first"]
+            if bounds["last"]:
+                last_txn[key] = bounds["last"]
+            open_qty[key] = 1000
+
+    existing = Ticker.objects.in_bulk(list(normalized), field_name="symbol")
+
+    last_bar = dict(
+        TickerData.objects.filter(ticker__symbol__in=list(normalized))
+        .values("ticker__symbol")
+        .annotate(last=Max("date"))
+        .values_list("ticker__symbol", "last")
+    )
 
-        open_qty = StockHolding.objects.filter(company_symbol__in=[symbol, normalized_symbol]).aggregate(
-                                total_qty=Sum("number_of_shares")   # change "quantity" to your actual shares field name if different
-                            )["total_qty"] or 0
+    tickers = {}
+    for s in valid:
+        ticker_code, exchange, normalized_symbol = parts[s]
+        if normalized_symbol in tickers:
+            continue
+        ticker_obj = existing.get(normalized_symbol) or Ticker(
+            symbol=normalized_symbol, ticker=ticker_code, exchange=exchange
+        )
+        # Fill missing ticker/exchange metadata
+        ticker_obj.ticker = ticker_obj.ticker or ticker_code
+        ticker_obj.exchange = ticker_obj.exchange or exchange
+
+        if normalized_symbol in first_txn:
+            ticker_obj.first_txn = first_txn[normalized_symbol]
+        if open_qty.get(normalized_symbol, 0) > 0:
+            ticker_obj.last_txn = today
+        elif normalized_symbol in last_txn:
+            ticker_obj.last_txn = last_txn[normalized_symbol]
+        tickers[normalized_symbol] = ticker_obj
+
+    if tickers:
+        Ticker.objects.bulk_create(
+            list(tickers.values()),
+            update_conflicts=True,
+            unique_fields=["symbol"],
+            update_fields=["ticker", "exchange", "first_txn", "last_txn"],
+        )
+        if any(t.pk is None for t in tickers.values()):
+            # Backends that cannot return ids from an upsert
+            tickers = Ticker.objects.in_bulk(list(tickers), field_name="symbol")
+
+    plans = []
+    for s in order:
+        if not parts[s][0]:
+            plans.append(RefreshPlan(symbol=s, ticker=None, start=None, end=None))
+            continue
+        ticker_obj = tickers[parts[s][2]]
+        start, end = _refresh_window(
+            ticker_obj.first_txn, ticker_obj.last_txn, last_bar.get(ticker_obj.symbol), today, ticker_obj.exchange
+        )
+        plans.append(RefreshPlan(symbol=s, ticker=ticker_obj, start=start, end=end))
+    return plans
 
-    if txn_bounds["first"]:
-        ticker_obj.first_txn = txn_bounds["first"]
-    if open_qty > 0:
-        ticker_obj.last_txn = date.today()
-    elif txn_bounds["last"]:
-        ticker_obj.last_txn = txn_bounds["last"]
 
-    ticker_obj.save()
-    return ticker_obj
+def ensure_ticker(symbol: str) -> Optional[Ticker]:
+    """
+    Create or update a Ticker record for the provided symbol.
 
-def _is_market_open_day(d: date) -> bool:
-    # Simple weekday rule (Mon-Fri). Replace with your exchange calendar if needed.
-    return d.weekday() < 5
+    Also stores the earliest and latest transaction dates for the symbol if
+    transactions exist.
+    """
+    return plan_ticker_refresh([symbol])[0].ticker
 
-def _window_for_refresh(ticker_obj: "Ticker", today: date) -> Tuple[Optional[date], Optional[date]]:
-    # Refresh txn bounds from DB (avoid stale instance)
-    tkr = type(ticker_obj).objects.get(symbol=ticker_obj.symbol)
 
-    expected_start = tkr.first_txn
-    expected_end = tkr.last_txn
+def _is_market_open_day(d: date, exchange: str = "ASX") -> bool:
+    return get_calendar(exchange).is_trading_day(d)
 
-    # If bounds unknown or invalid, do nothing (or set defaults if you prefer)
+
+def _refresh_window(
+    expected_start: Optional[date],
+    expected_end: Optional[date],
+    last_date: Optional[date],
+    today: date,
+    exchange: str = "ASX",
+) -> Tuple[Optional[date], Optional[date]]:
+    """Window to download given the transaction bounds and the last stored bar."""
+    # If bounds unknown or invalid, do nothing
     if not expected_start or not expected_end:
-        
         return None, None
     if expected_end < expected_start:
-        
         return None, None
 
-    qs = tkr.historical_data.all()
-
-    last_date = qs.aggregate(last=Max("date"))["last"]
-
     # 1) No historical rows -> fetch full expected historical range
     if not last_date:
-        
         return expected_start, min(expected_end, today)
 
     # 2) Only fetch forward from the day after last stored date
@@ -184,135 +282,343 @@ def _window_for_refresh(ticker_obj: "Ticker", today: date) -> Tuple[Optional[dat
     end = min(expected_end, today)
     if start > end:
         # 3) Optional: same-day refresh window (intraday updates)
-        if expected_end == today and _is_market_open_day(today):
-            
+        if expected_end == today and _is_market_open_day(today, exchange):
             return today, today
-        
         return None, None
 
-    # If you only want to fetch when there's at least one market-open day in [start, end],
-    # advance start forward to the next market-open day and trim end back similarly.
-    while start <= end and not _is_market_open_day(start):
-        start += timedelta(days=1)
-
-    while end >= start and not _is_market_open_day(end):
-        end -= timedelta(days=1)
+    # Only fetch when there's at least one trading day in [start, end]:
+    # advance start to the next trading day and trim end back similarly.
+    calendar = get_calendar(exchange)
+    start = calendar.next_trading_day(start, inclusive=True)
+    end = calendar.previous_trading_day(end, inclusive=True)
 
     if start > end:
-        
         return None, None
-    
+
     return start, end
 
 
+def _window_for_refresh(ticker_obj: "Ticker", today: date) -> Tuple[Optional[date], Optional[date]]:
+    # Refresh txn bounds from DB (avoid stale instance)
+    tkr = type(ticker_obj).objects.get(symbol=ticker_obj.symbol)
+    last_date = tkr.historical_data.aggregate(last=Max("date"))["last"]
+    return _refresh_window(tkr.first_txn, tkr.last_txn, last_date, today, tkr.exchange)
+
+
 # ---------------------------------------------------------------------------
 # Historical data sync
 # ---------------------------------------------------------------------------
 
-def _store_history(ticker_obj: Ticker, df: pd.DataFrame) -> int:
-    """Persist yfinance DataFrame rows into TickerData."""
+HISTORY_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+# Rows per INSERT ... ON CONFLICT statement
+STORE_CHUNK_SIZE = 1000
+
+
+def _history_columns(df: pd.DataFrame) -> dict:
+    """
+    Turn a single-ticker yfinance frame into column arrays, once.
+
+    Accepts both flat columns and the (Price, Ticker) MultiIndex returned by
+    recent yfinance versions. Duplicate dates keep the last row; NaN becomes
+    None so missing values are stored as NULL.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is None:
+        index = index.tz_localize(settings.TIME_ZONE, ambiguous="NaT", nonexistent="shift_forward")
+
+    days = index.tz_localize(None).normalize()
+    keep = ~days.duplicated(keep="last")
+
+    columns = {
+        "date": [d.date() for d in days[keep]],
+        "datetime": list(index[keep].to_pydatetime()),
+    }
+    for field in HISTORY_FIELDS:
+        values = df[field].to_numpy(dtype=np.float64)[keep]
+        columns[field.lower()] = np.where(np.isnan(values), None, values).tolist()
+    return columns
+
+
+def _store_history(ticker_obj: Ticker, df: pd.DataFrame) -> Tuple[int, int]:
+    """
+    Persist yfinance DataFrame rows into TickerData.
+
+    Bars are upserted with one INSERT ... ON CONFLICT (ticker, date) DO UPDATE
+    per chunk. Returns (created, updated) counts, derived from the dates that
+    already existed in the written range.
+    """
 
     if df.empty:
-        return 0
-
-    df = df.reset_index()
-    rows_written = 0
-
-    for _, row in df.iterrows():
-        trade_date = row["Date"].dt.date
-        date = _normalize_date(trade_date.iloc[0])
-        defaults = {
-            "open": row["Open"].iloc[0],
-            "high": row["High"].iloc[0],
-            "low": row["Low"].iloc[0],
-            "close": row["Close"].iloc[0],
-            "volume": row["Volume"].iloc[0],
-            "datetime": getattr(row["Date"], "to_pydatetime", lambda: None)(),
-        }
-
-        _, created = TickerData.objects.update_or_create(
+        return 0, 0
+
+    columns = _history_columns(df)
+    dates = columns["date"]
+    if not dates:
+        return 0, 0
+    first_date, last_date = min(dates), max(dates)
+
+    existing = set(
+        TickerData.objects.filter(
+            ticker=ticker_obj, date__gte=first_date, date__lte=last_date
+        ).values_list("date", flat=True)
+    )
+    rows_updated = sum(1 for d in dates if d in existing)
+    rows_created = len(dates) - rows_updated
+
+    objs = [
+        TickerData(
             ticker=ticker_obj,
-            date=date,
-            defaults=defaults,
+            date=d,
+            datetime=dt,
+            open=o,
+            high=h,
+            low=l,
+            close=c,
+            volume=v,
+        )
+        for d, dt, o, h, l, c, v in zip(
+            dates,
+            columns["datetime"],
+            columns["open"],
+            columns["high"],
+            columns["low"],
+            columns["close"],
+            columns["volume"],
+        )
+    ]
+
+    for i in range(0, len(objs), STORE_CHUNK_SIZE):
+        TickerData.objects.bulk_create(
+            objs[i:i + STORE_CHUNK_SIZE],
+            update_conflicts=True,
+            unique_fields=["ticker", "date"],
+            update_fields=["datetime", "open", "high", "low", "close", "volume"],
         )
-        rows_written += 1 if created else 0
 
-    return rows_written
+    # Re-aggregate the weekly/monthly periods these bars fall into
+    update_rollups([ticker_obj.pk], since=first_date)
+
+    refresh_latest_quotes([ticker_obj.pk])
+
+    # Invalidate cached get_prices panels that include this ticker (after the
+    # rollups, so a new version never pairs with old ones). Store files are
+    # named after the version, so readers use the DB until the export lands.
+    Ticker.objects.filter(pk=ticker_obj.pk).update(data_version=F("data_version") + 1)
+    bump_market_version()
+
+    # Keep the memory-mapped file store in step when it backs get_prices
+    if file_backend_enabled():
+        get_store().export_tickers([ticker_obj.pk], since=first_date)
+
+    price_cache.invalidate_tickers([ticker_obj.pk])
 
-def yahooFinance_Download(ticker_symbol, start, end, progress, auto_adjust):
-    df = yf.download(
+    return rows_created, rows_updated
+
+def yahooFinance_Download(ticker_symbol, start, end, progress, auto_adjust, timeout=10):
+    """Download daily bars through the configured market-data provider."""
+    df = get_provider().history(
             ticker_symbol,
             start=start - timedelta(days=1),
             end=end + timedelta(days=1),  # inclusive end date
-            progress=progress,
-            auto_adjust=auto_adjust,
+            timeout=timeout,
         )
     # print(df)
     sector = df
     return df, sector
 
-def refresh_ticker_history(symbols: Iterable[str]) -> List[SyncResult]:
-    """
-    Ensure Ticker and TickerData tables are populated for the provided symbols.
+def _download_symbol(ticker_obj: Ticker) -> str:
+    # The index is quoted by Yahoo without the exchange suffix
+    return ticker_obj.ticker if ticker_obj.ticker == Index_Symbol else ticker_obj.symbol
+
+
+def _split_download(df: pd.DataFrame, download_symbols: List[str]) -> dict:
     """
-    today = date.today()
-    results: List[SyncResult] = []
-    seen = set()
+    Split a multi-ticker `yf.download` frame into per-ticker frames.
 
-    for symbol in symbols:
-        if symbol in seen:
+    Each piece keeps the (Price, Ticker) column MultiIndex of a single-ticker
+    download, with the all-NaN rows introduced by aligning tickers on a common
+    date index removed.
+    """
+    if df is None or df.empty:
+        return {sym: pd.DataFrame() for sym in download_symbols}
+
+    if not isinstance(df.columns, pd.MultiIndex):
+        # Flat columns only happen for a single ticker
+        return {download_symbols[0]: df} if len(download_symbols) == 1 else {}
+
+    available = set(df.columns.get_level_values(1))
+    frames = {}
+    for sym in download_symbols:
+        if sym not in available:
+            frames[sym] = pd.DataFrame()
             continue
-        seen.add(symbol)
+        frames[sym] = df.xs(sym, axis=1, level=1, drop_level=False).dropna(how="all")
+    return frames
 
-        ticker_obj = ensure_ticker(symbol)
 
-        if ticker_obj is None:
-            results.append(
-                SyncResult(symbol=symbol, updated=False, start=None, end=None, error="invalid symbol")
+@dataclass
+class FetchJob:
+    """One multi-ticker provider request covering a shared refresh window."""
+    start: date
+    end: date
+    members: List[Tuple[str, Ticker]]
+    download_symbols: List[str]
+
+    @property
+    def download_arg(self):
+        return self.download_symbols if len(self.download_symbols) > 1 else self.download_symbols[0]
+
+
+def build_fetch_jobs(windows: dict) -> List[FetchJob]:
+    """
+    Turn {(start, end): [(symbol, ticker_obj), ...]} into provider requests of
+    at most MARKET_DATA_BATCH_SIZE tickers sharing the same window.
+    """
+    batch_size = max(int(getattr(settings, "MARKET_DATA_BATCH_SIZE", 50)), 1)
+
+    jobs: List[FetchJob] = []
+    for (start, end), members in windows.items():
+        for i in range(0, len(members), batch_size):
+            batch = members[i:i + batch_size]
+            jobs.append(
+                FetchJob(
+                    start=start,
+                    end=end,
+                    members=batch,
+                    download_symbols=[_download_symbol(ticker_obj) for _, ticker_obj in batch],
+                )
             )
+    return jobs
+
+
+def fetch_concurrently(
+    jobs: List[FetchJob],
+    fetcher: Optional[Callable] = None,
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[FetchJob, Optional[pd.DataFrame], Optional[str]]]:
+    """
+    Run provider downloads on a bounded thread pool, paced by a token bucket.
+
+    Yields (job, frame, error) in completion order so the caller can write
+    each result while the remaining requests are still in flight. Settings:
+
+        MARKET_DATA_FETCH_CONCURRENCY  worker threads
+        MARKET_DATA_RATE_LIMIT         requests per second (<= 0 disables)
+        MARKET_DATA_FETCH_TIMEOUT      per-request timeout in seconds
+
+    A job that has not finished once every request has had its timeout is
+    reported with a timeout error rather than blocking the refresh.
+    """
+    if not jobs:
+        return
+
+    fetcher = fetcher or yahooFinance_Download
+    concurrency = max(int(concurrency or getattr(settings, "MARKET_DATA_FETCH_CONCURRENCY", 4)), 1)
+    rate = getattr(settings, "MARKET_DATA_RATE_LIMIT", 8.0) if rate is None else rate
+    timeout = float(timeout or getattr(settings, "MARKET_DATA_FETCH_TIMEOUT", 30))
+    bucket = TokenBucket(rate=rate)
+
+    def run(job: FetchJob) -> pd.DataFrame:
+        bucket.acquire()
+        df, _ = fetcher(
+            job.download_arg,
+            start=job.start - timedelta(days=1),
+            end=job.end + timedelta(days=1),  # inclusive end date
+            progress=False,
+            auto_adjust=True,
+            timeout=timeout,
+        )
+        return df
+
+    # Enough wall time for every wave of requests plus rate-limit pacing
+    waves = -(-len(jobs) // concurrency)
+    deadline = timeout * (waves + 1) + (len(jobs) / rate if rate and rate > 0 else 0)
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="market-fetch")
+    futures = {pool.submit(run, job): job for job in jobs}
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            pending.discard(future)
+            job = futures[future]
+            try:
+                yield job, future.result(), None
+            except Exception as exc:
+                yield job, None, str(exc) or exc.__class__.__name__
+    except FuturesTimeout:
+        for future in pending:
+            yield futures[future], None, f"timed out after {timeout:.0f}s"
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def refresh_ticker_history(symbols: Iterable[str], fetcher: Optional[Callable] = None) -> List[SyncResult]:
+    """
+    Ensure Ticker and TickerData tables are populated for the provided symbols.
+
+    Symbols sharing the same refresh window are fetched together in one
+    multi-ticker download (at most MARKET_DATA_BATCH_SIZE per request) and the
+    combined frame is split per ticker for storage. Downloads run concurrently
+    (see `fetch_concurrently`); `fetcher` overrides the provider call. Results
+    are returned in input order, one SyncResult per symbol.
+    """
+    results: dict = {}
+    order: List[str] = []
+    windows: dict = {}
+
+    for plan in plan_ticker_refresh(symbols):
+        symbol, ticker_obj, start, end = plan.symbol, plan.ticker, plan.start, plan.end
+        order.append(symbol)
+
+        if ticker_obj is None:
+            results[symbol] = SyncResult(symbol=symbol, updated=False, start=None, end=None, error="invalid symbol")
             continue
-        start, end = _window_for_refresh(ticker_obj, today)
         print(f"Accessing Values for {symbol} from {start} to {end}")
         if start is None or end is None or start > end:
-            results.append(
-                SyncResult(symbol=ticker_obj.symbol, updated=False, start=start, end=end)
-            )
+            results[symbol] = SyncResult(symbol=ticker_obj.symbol, updated=False, start=start, end=end)
             continue
-        if symbol == Index_Symbol:
-            df, sector = yahooFinance_Download(
-            ticker_obj.ticker,
-            start=start - timedelta(days=1),
-            end=end + timedelta(days=1),  # inclusive end date
-            progress=False,
-            auto_adjust=True,
-        )
-        else:
-            df, sector = yahooFinance_Download(
-                ticker_obj.symbol,
-                start=start - timedelta(days=1),
-                end=end + timedelta(days=1),  # inclusive end date
-                progress=False,
-                auto_adjust=True,
-            )
-        # hldng_obj = StockHolding.objects.get(company_symbol=ticker_obj.ticker, Exchange=ticker_obj.exchange)
-        # hldng_obj.sector = 
- 
-        if df is None or df.empty:
-            results.append(
-                SyncResult(symbol=ticker_obj.symbol, updated=False, start=start, end=end, error="no data returned")
-            )
+
+        windows.setdefault((start, end), []).append((symbol, ticker_obj))
+
+    jobs = build_fetch_jobs(windows)
+
+    # Downloads run on the pool; DB writes stay on this (single writer) thread
+    for job, df, error in fetch_concurrently(jobs, fetcher=fetcher):
+        start, end = job.start, job.end
+
+        if error is not None:
+            for symbol, ticker_obj in job.members:
+                results[symbol] = SyncResult(
+                    symbol=ticker_obj.symbol, updated=False, start=start, end=end, error=error
+                )
             continue
 
-        rows_written = _store_history(ticker_obj, df)
+        frames = _split_download(df, job.download_symbols)
 
-        results.append(
-            SyncResult(
+        for (symbol, ticker_obj), download_symbol in zip(job.members, job.download_symbols):
+            sym_df = frames.get(download_symbol)
+            if sym_df is None or sym_df.empty:
+                results[symbol] = SyncResult(
+                    symbol=ticker_obj.symbol, updated=False, start=start, end=end, error="no data returned"
+                )
+                continue
+
+            rows_created, rows_updated = _store_history(ticker_obj, sym_df)
+
+            results[symbol] = SyncResult(
                 symbol=ticker_obj.symbol,
                 updated=True,
                 start=start,
                 end=end,
-                rows_written=rows_written,
+                rows_written=rows_created,
+                rows_updated=rows_updated,
             )
-        )
 
-    return results
\ No newline at end of file
+    return [results[symbol] for symbol in order]
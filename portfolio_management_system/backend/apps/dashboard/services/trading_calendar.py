@@ -0,0 +1,237 @@
+# dashboard/services/trading_calendar.py
+
+"""Exchange trading calendars (ASX, PSX).
+
+Each calendar precomputes a sorted datetime64[D] array of trading days from
+its weekend and holiday rules, so trading-day tests and next/previous lookups
+are a binary search (`np.searchsorted`) instead of walking day by day. The
+array covers CALENDAR_FIRST_YEAR up to a few years ahead and is extended
+transparently when a date outside that range is queried.
+
+Holidays that cannot be derived from rules (e.g. PSX Eid closures, which
+follow the lunar calendar, or one-off ASX closures) can be added with the
+TRADING_CALENDAR_EXTRA_HOLIDAYS setting: {"PSX": ["2026-03-20", ...]}.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, Optional, Set
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from dateutil.easter import easter
+from django.conf import settings
+
+CALENDAR_FIRST_YEAR = 2000
+# Years precomputed past the current one before extending on demand
+CALENDAR_LOOKAHEAD_YEARS = 3
+
+
+@dataclass(frozen=True)
+class SessionTimes:
+    tz: str
+    open: time
+    close: time
+    early_close: time
+
+
+# ---------------------------------------------------------------------------
+# Holiday rules
+# ---------------------------------------------------------------------------
+
+def _next_monday_if_weekend(day: date) -> date:
+    if day.weekday() == 5:
+        return day + timedelta(days=2)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def asx_holidays(year: int) -> Set[date]:
+    """ASX market holidays (NSW public holidays observed by the exchange)."""
+    good_friday = easter(year) - timedelta(days=2)
+    holidays = {
+        _next_monday_if_weekend(date(year, 1, 1)),   # New Year's Day
+        _next_monday_if_weekend(date(year, 1, 26)),  # Australia Day
+        good_friday,
+        good_friday + timedelta(days=3),             # Easter Monday
+        date(year, 4, 25),                           # Anzac Day (not substituted)
+        _nth_weekday(year, 6, 0, 2),                 # King's Birthday
+    }
+
+    christmas, boxing = date(year, 12, 25), date(year, 12, 26)
+    if christmas.weekday() == 5:                     # Sat/Sun -> Mon/Tue
+        holidays |= {christmas + timedelta(days=2), boxing + timedelta(days=2)}
+    elif christmas.weekday() == 6:                   # Sun/Mon -> Tue/Mon
+        holidays |= {christmas + timedelta(days=2), boxing}
+    elif christmas.weekday() == 4:                   # Fri/Sat -> Fri/Mon
+        holidays |= {christmas, boxing + timedelta(days=2)}
+    else:
+        holidays |= {christmas, boxing}
+    return holidays
+
+
+def asx_half_days(year: int) -> Set[date]:
+    """Early (2:10pm) closes on the last trading days before Christmas and New Year."""
+    return {date(year, 12, 24), date(year, 12, 31)}
+
+
+def psx_holidays(year: int) -> Set[date]:
+    """PSX fixed-date holidays; lunar (Eid/Ashura) closures come from settings."""
+    return {
+        date(year, 2, 5),    # Kashmir Solidarity Day
+        date(year, 3, 23),   # Pakistan Day
+        date(year, 5, 1),    # Labour Day
+        date(year, 8, 14),   # Independence Day
+        date(year, 11, 9),   # Iqbal Day
+        date(year, 12, 25),  # Quaid-e-Azam Day
+    }
+
+
+def psx_half_days(year: int) -> Set[date]:
+    return set()
+
+
+# ---------------------------------------------------------------------------
+# Calendar
+# ---------------------------------------------------------------------------
+
+class TradingCalendar:
+    def __init__(
+        self,
+        name: str,
+        sessions: SessionTimes,
+        holiday_rule: Callable[[int], Set[date]],
+        half_day_rule: Callable[[int], Set[date]],
+        extra_holidays: Iterable[date] = (),
+    ):
+        self.name = name
+        self.sessions = sessions
+        self.tz = ZoneInfo(sessions.tz)
+        self._holiday_rule = holiday_rule
+        self._half_day_rule = half_day_rule
+        self._extra_holidays = {date.fromisoformat(str(d)) for d in extra_holidays}
+        self._lock = threading.Lock()
+        self._first_year = self._last_year = None
+        self._build(CALENDAR_FIRST_YEAR, date.today().year + CALENDAR_LOOKAHEAD_YEARS)
+
+    def _build(self, first_year: int, last_year: int) -> None:
+        holidays: Set[date] = set(self._extra_holidays)
+        half_days: Set[date] = set()
+        for year in range(first_year, last_year + 1):
+            holidays |= self._holiday_rule(year)
+            half_days |= self._half_day_rule(year)
+
+        span = np.arange(
+            np.datetime64(date(first_year, 1, 1), "D"),
+            np.datetime64(date(last_year, 12, 31), "D") + 1,
+        )
+        holiday_array = np.array(sorted(holidays), dtype="datetime64[D]")
+        days = span[np.is_busday(span, holidays=holiday_array)]
+
+        self._days = days
+        self._half_days = np.array(sorted(half_days - holidays), dtype="datetime64[D]")
+        self._first_year, self._last_year = first_year, last_year
+
+    def _ensure(self, day: date) -> None:
+        if self._first_year <= day.year <= self._last_year:
+            return
+        with self._lock:
+            if not self._first_year <= day.year <= self._last_year:
+                self._build(min(self._first_year, day.year - 1), max(self._last_year, day.year + 1))
+
+    # ------------------------------------------------------------------
+    # Day lookups
+    # ------------------------------------------------------------------
+
+    def is_trading_day(self, day: date) -> bool:
+        self._ensure(day)
+        target = np.datetime64(day, "D")
+        i = np.searchsorted(self._days, target)
+        return bool(i < len(self._days) and self._days[i] == target)
+
+    def next_trading_day(self, day: date, inclusive: bool = False) -> date:
+        """First trading day after `day` (or on it, when `inclusive`)."""
+        self._ensure(day + timedelta(days=14))
+        i = np.searchsorted(self._days, np.datetime64(day, "D"), side="left" if inclusive else "right")
+        return self._days[i].astype(date)
+
+    def previous_trading_day(self, day: date, inclusive: bool = False) -> date:
+        """Last trading day before `day` (or on it, when `inclusive`)."""
+        self._ensure(day - timedelta(days=14))
+        i = np.searchsorted(self._days, np.datetime64(day, "D"), side="right" if inclusive else "left")
+        return self._days[i - 1].astype(date)
+
+    def trading_days(self, start: date, end: date) -> np.ndarray:
+        """datetime64[D] trading days with start <= day <= end."""
+        self._ensure(start)
+        self._ensure(end)
+        lo = np.searchsorted(self._days, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self._days, np.datetime64(end, "D"), side="right")
+        return self._days[lo:hi]
+
+    def is_half_day(self, day: date) -> bool:
+        self._ensure(day)
+        target = np.datetime64(day, "D")
+        i = np.searchsorted(self._half_days, target)
+        return bool(i < len(self._half_days) and self._half_days[i] == target)
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def session_open(self, day: date) -> datetime:
+        return datetime.combine(day, self.sessions.open, tzinfo=self.tz)
+
+    def session_close(self, day: date) -> datetime:
+        close = self.sessions.early_close if self.is_half_day(day) else self.sessions.close
+        return datetime.combine(day, close, tzinfo=self.tz)
+
+    def is_open(self, moment: datetime) -> bool:
+        local = moment.astimezone(self.tz)
+        day = local.date()
+        return self.is_trading_day(day) and self.session_open(day) <= local <= self.session_close(day)
+
+    def last_session_started(self, moment: datetime) -> date:
+        """Most recent trading day whose session had opened by `moment`."""
+        local = moment.astimezone(self.tz)
+        day = local.date()
+        if self.is_trading_day(day) and local >= self.session_open(day):
+            return day
+        return self.previous_trading_day(day)
+
+
+EXCHANGES = {
+    "ASX": (
+        SessionTimes(tz="Australia/Sydney", open=time(10, 0), close=time(16, 10), early_close=time(14, 10)),
+        asx_holidays,
+        asx_half_days,
+    ),
+    "PSX": (
+        SessionTimes(tz="Asia/Karachi", open=time(9, 30), close=time(15, 30), early_close=time(12, 30)),
+        psx_holidays,
+        psx_half_days,
+    ),
+}
+
+_calendars: Dict[str, TradingCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(exchange: Optional[str] = "ASX") -> TradingCalendar:
+    """Shared calendar for `exchange` (unknown exchanges use the ASX rules)."""
+    exchange = exchange if exchange in EXCHANGES else "ASX"
+    with _calendars_lock:
+        if exchange not in _calendars:
+            sessions, holiday_rule, half_day_rule = EXCHANGES[exchange]
+            extra = getattr(settings, "TRADING_CALENDAR_EXTRA_HOLIDAYS", {}).get(exchange, ())
+            _calendars[exchange] = TradingCalendar(exchange, sessions, holiday_rule, half_day_rule, extra)
+        return _calendars[exchange]
@@ -0,0 +1,63 @@
+# dashboard/services/valuation.py
+
+"""Set-based revaluation of StockHolding after a price refresh.
+
+`revalue_holdings` runs two UPDATE statements regardless of how many
+holdings there are: LTP from each ticker's LatestQuote (via a correlated
+subquery), then market_value and UnRealized_PnL from the new LTP. It runs
+once at the end of every refresh (the snapshot chord callback and the
+on-demand price update task), so read endpoints never write valuations.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.dashboard.models import LatestQuote, StockHolding
+from apps.dashboard.services.dashboard_versions import bump_market_version
+
+
+def _latest_close(ticker_field: str):
+    """Last close of the quote whose Ticker.<ticker_field> equals the holding's company_symbol."""
+    return Subquery(
+        LatestQuote.objects
+        .filter(last_close__isnull=False, **{f"ticker__{ticker_field}": OuterRef("company_symbol")})
+        .order_by("-last_date")
+        .values("last_close")[:1],
+        output_field=FloatField(),
+    )
+
+
+def revalue_holdings(symbols: Optional[Iterable[str]] = None) -> int:
+    """
+    Refresh LTP, market_value and UnRealized_PnL of all holdings, or of those
+    whose company_symbol matches `symbols` (base tickers or ".AX" symbols).
+    Holdings without a quote keep their LTP. Returns the rows revalued.
+    """
+    holdings = StockHolding.objects.all()
+    if symbols is not None:
+        names = {s for s in symbols if s}
+        names |= {s.split(".")[0] for s in names}
+        if not names:
+            return 0
+        holdings = holdings.filter(company_symbol__in=names)
+
+    with transaction.atomic():
+        # An exact symbol match ("BHP.AX") wins over a base-ticker match ("BHP")
+        holdings.filter(number_of_shares__gt=0).update(
+            LTP=Coalesce(_latest_close("symbol"), _latest_close("ticker"), F("LTP"))
+        )
+        revalued = holdings.update(
+            market_value=F("number_of_shares") * F("LTP"),
+            UnRealized_PnL=Case(
+                When(number_of_shares__gt=0, then=F("number_of_shares") * F("LTP") - F("total_cost")),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+        )
+        bump_market_version()
+    return revalued
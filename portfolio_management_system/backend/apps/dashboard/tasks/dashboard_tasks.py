@@ -0,0 +1,29 @@
+from celery import group, shared_task
+from celery.utils.log import get_task_logger
+
+from apps.dashboard.services.dashboard_cache import active_user_ids, warm_user_dashboards
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.dashboard_tasks.warm_active_dashboards")
+def warm_active_dashboards(self, user_ids=None):
+    """
+    Fan out one `warm_user_dashboard` per recently active user (default:
+    logged in within DASHBOARD_WARMUP_ACTIVE_DAYS) so the first dashboard
+    load after a market refresh is a cache hit.
+    """
+    targets = list(user_ids if user_ids is not None else active_user_ids())
+    if targets:
+        group(warm_user_dashboard.s(user_id) for user_id in targets).apply_async()
+    logger.info("Dashboard warm-up queued for %s users", len(targets))
+    return {"queued": len(targets)}
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.dashboard_tasks.warm_user_dashboard")
+def warm_user_dashboard(self, user_id: int):
+    try:
+        return warm_user_dashboards(user_id)
+    except Exception as exc:
+        logger.exception("Dashboard warm-up failed for user %s", user_id)
+        return {"user": user_id, "warmed": [], "skipped": [str(exc)]}
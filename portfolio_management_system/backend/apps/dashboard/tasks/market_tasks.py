@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Iterable, List
 
-from celery import shared_task
+from celery import chord, shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
 from django.db.models import Q
 from apps.dashboard.constants import Index_Symbol
 from apps.dashboard.models import StockHolding, Ticker
+from apps.dashboard.services.backfill import backfill_gaps
+from apps.dashboard.services.dashboard_versions import bump_market_version
 from apps.dashboard.services.market_schedule import (
     acquire_refresh_lock,
     REFRESH_LOCK_SECS,
@@ -17,10 +22,27 @@ from apps.dashboard.services.market_schedule import (
     should_refresh_market_data,
 )
 from apps.dashboard.services.ticker_sync import refresh_ticker_history
+from apps.dashboard.services.valuation import revalue_holdings
+from apps.dashboard.tasks.dashboard_tasks import warm_active_dashboards
 from celery.utils.log import get_task_logger
 
 logger = get_task_logger(__name__)
 
+def _snapshot_settings():
+    chunk_size = max(int(getattr(settings, "MARKET_SNAPSHOT_CHUNK_SIZE", 25)), 1)
+    soft_limit = int(getattr(settings, "MARKET_SNAPSHOT_CHUNK_SOFT_TIME_LIMIT", 120))
+    hard_limit = int(getattr(settings, "MARKET_SNAPSHOT_CHUNK_TIME_LIMIT", soft_limit + 30))
+    return chunk_size, soft_limit, hard_limit
+
+
+def _summarize(results) -> dict:
+    return {
+        "updated": [res.symbol for res in results if res.updated],
+        "skipped": [res.symbol for res in results if not res.updated and res.error is None],
+        "errors": [f"{res.symbol}: {res.error}" for res in results if res.error],
+    }
+
+
 @shared_task(bind=True, name="apps.dashboard.tasks.market_tasks.capture_asx_market_snapshot")
 def capture_asx_market_snapshot(self, trigger_reason: str = "manual"):
     """
@@ -28,6 +50,12 @@ def capture_asx_market_snapshot(self, trigger_reason: str = "manual"):
 
     Includes safeguards to avoid duplicate concurrent updates and records the
     timestamp of the last successful run for catch-up scheduling.
+
+    Symbols are split into MARKET_SNAPSHOT_CHUNK_SIZE chunks refreshed by
+    `refresh_snapshot_chunk` subtasks across the worker pool; the chord
+    callback `finalize_market_snapshot` aggregates their results, records the
+    refresh after revaluing holdings, releases the lock (held until then) and
+    queues the dashboard warm-up for active users.
     """
     now = market_now()
     last_refresh = get_last_refresh()
@@ -41,33 +69,96 @@ def capture_asx_market_snapshot(self, trigger_reason: str = "manual"):
             "reason": "data is fresh",
             "last_refresh": last_refresh.isoformat() if last_refresh else None,
         }
-    if not acquire_refresh_lock(trigger_reason=trigger_reason, timeout_seconds=REFRESH_LOCK_SECS):
-        return {"skipped": True, "reason": "Refresh done within timeout seconds"}
 
+    chunk_size, soft_limit, hard_limit = _snapshot_settings()
+    # The lock must outlive the slowest chunk plus the callback
+    lock_secs = max(REFRESH_LOCK_SECS, hard_limit + 60)
+    token = acquire_refresh_lock(trigger_reason=trigger_reason, timeout_seconds=lock_secs)
+    if token is None:
+        return {"skipped": True, "reason": "Refresh already in progress"}
+
+    dispatched = False
     try:
+        # Another worker may have finished a refresh while we waited for the lock
+        if not should_refresh_market_data(get_last_refresh(), now=now, allow_closed_catch_up=True):
+            return {"skipped": True, "reason": "data is fresh"}
+
         symbols = _tracked_asx_symbols()
         if not symbols:
             return {"skipped": True, "reason": "no ASX symbols configured"}
         if Index_Symbol+".AX" not in symbols:
             symbols.append(Index_Symbol)
-        
-        results = refresh_ticker_history(symbols)
-        updated = [res.symbol for res in results if res.updated]
-        skipped = [res.symbol for res in results if not res.updated and res.error is None]
-        errors = [f"{res.symbol}: {res.error}" for res in results if res.error]
 
-        record_last_refresh(now)
+        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+        header = [
+            refresh_snapshot_chunk.s(chunk).set(soft_time_limit=soft_limit, time_limit=hard_limit)
+            for chunk in chunks
+        ]
+        callback = finalize_market_snapshot.s(
+            token=token, started_at=now.isoformat(), trigger_reason=trigger_reason
+        ).on_error(market_snapshot_failed.s(token=token))
+        chord(header)(callback)
+        dispatched = True
+
+        return {
+            "trigger": trigger_reason,
+            "dispatched_chunks": len(chunks),
+            "symbols": len(symbols),
+        }
+    finally:
+        if not dispatched:
+            release_refresh_lock(token)
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.market_tasks.refresh_snapshot_chunk")
+def refresh_snapshot_chunk(self, symbols: List[str]):
+    """Refresh one chunk of snapshot symbols; always returns a summary for the chord."""
+    try:
+        return _summarize(refresh_ticker_history(symbols))
+    except SoftTimeLimitExceeded:
+        return {"updated": [], "skipped": [], "errors": [f"{s}: chunk timed out" for s in symbols]}
+    except Exception as exc:
+        logger.exception("Snapshot chunk failed")
+        return {"updated": [], "skipped": [], "errors": [f"{s}: {exc}" for s in symbols]}
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.market_tasks.finalize_market_snapshot")
+def finalize_market_snapshot(self, chunk_results, token: int, started_at: str, trigger_reason: str):
+    """
+    Chord callback: aggregate chunk summaries, revalue holdings, record the
+    refresh and release the lock.
+    """
+    try:
+        summary = {"updated": [], "skipped": [], "errors": []}
+        for result in chunk_results:
+            for key in summary:
+                summary[key].extend(result.get(key, []))
+
+        revalued = revalue_holdings()
+
+        started = datetime.fromisoformat(started_at)
+        recorded = record_last_refresh(started, token=token)
+        bump_market_version()
+        if recorded:
+            # Precompute dashboards against the new refresh stamp
+            warm_active_dashboards.delay()
 
         return {
             "trigger": trigger_reason,
-            "updated": updated,
-            "skipped": skipped,
-            "errors": errors,
-            "last_refresh": now.isoformat(),
+            **summary,
+            "chunks": len(chunk_results),
+            "holdings_revalued": revalued,
+            "last_refresh": started.isoformat() if recorded else None,
         }
     finally:
-        
-        release_refresh_lock()
+        release_refresh_lock(token)
+
+
+@shared_task(name="apps.dashboard.tasks.market_tasks.market_snapshot_failed")
+def market_snapshot_failed(request, exc, traceback, token: int = None):
+    """Chord error callback: a chunk was killed (hard time limit), so free the lock."""
+    logger.error("Market snapshot %s failed: %r", request.id, exc)
+    release_refresh_lock(token)
 
 
 def _tracked_asx_symbols() -> List[str]:
@@ -94,9 +185,27 @@ def schedule_asx_market_check(self):
     Periodic task run by Celery beat.
 
     Decides if a refresh is necessary (including catch-up after downtime)
-    and queues the snapshot task when appropriate.
+    and queues the snapshot task when appropriate. Non-trading days and
+    closed hours with nothing to catch up do not enqueue anything.
     """
     schedule_market_refresh_if_needed(
         trigger_reason="celery-beat",
         allow_closed_catch_up=True,
-    )
\ No newline at end of file
+    )
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.market_tasks.backfill_ticker_gaps")
+def backfill_ticker_gaps(self, ticker_ids=None):
+    """
+    Re-fetch trading days missing from the middle of stored series and
+    report missing bars per ticker before and after.
+    """
+    summary = backfill_gaps(ticker_ids)
+    logger.info(
+        "Gap backfill: %s requests, %s rows written, missing before=%s after=%s",
+        summary["requests"],
+        summary["rows_written"],
+        sum(summary["missing_before"].values()),
+        sum(summary["missing_after"].values()),
+    )
+    return summary
@@ -0,0 +1,17 @@
+from celery import shared_task
+
+from apps.dashboard.services.metadata import enrich_metadata, missing_metadata_symbols
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.metadata_tasks.enrich_ticker_metadata_task")
+def enrich_ticker_metadata_task(self, symbols=None):
+    """
+    Fetch company metadata for `symbols` (default: every held symbol that has
+    never been enriched) and fill placeholder names/sectors on holdings.
+    """
+    targets = list(symbols or missing_metadata_symbols())
+    results = enrich_metadata(targets)
+    return {
+        "enriched": [m.symbol for m in results if not m.error],
+        "errors": [f"{m.symbol}: {m.error}" for m in results if m.error],
+    }
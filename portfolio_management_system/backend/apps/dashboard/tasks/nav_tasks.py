@@ -0,0 +1,26 @@
+from datetime import date
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from apps.dashboard.services.nav import append_portfolio_nav, recompute_portfolio_nav
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.nav_tasks.append_daily_nav")
+def append_daily_nav(self):
+    """
+    Post-close beat job: append each portfolio's NAV up to the last closed
+    session (catching up any days missed since its last row).
+    """
+    written = append_portfolio_nav()
+    logger.info("Appended %s NAV rows", written)
+    return {"written": written}
+
+
+@shared_task(bind=True, name="apps.dashboard.tasks.nav_tasks.recompute_nav")
+def recompute_nav(self, portfolio_ids, since=None):
+    """Rewrite NAV rows from `since` (ISO date; None = full history) after a back-dated change."""
+    written = recompute_portfolio_nav(portfolio_ids, date.fromisoformat(since) if since else None)
+    return {"portfolios": list(portfolio_ids), "since": since, "written": written}
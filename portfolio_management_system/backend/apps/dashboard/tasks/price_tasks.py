@@ -5,6 +5,7 @@ from django.core.cache import cache
 
 from apps.dashboard.services.market_data import get_prices
 from apps.dashboard.services.ticker_sync import refresh_ticker_history, symbols_from_user_portfolios
+from apps.dashboard.services.valuation import revalue_holdings
 
 
 @shared_task(bind=True)
@@ -17,6 +18,7 @@ def update_symbol_prices_task(self, symbols, user_id):
     today = date.today()
 
     sync_results = refresh_ticker_history(target_symbols)
+    revalue_holdings(target_symbols)
 
     updated = [res.symbol for res in sync_results if res.updated]
     skipped = [res.symbol for res in sync_results if not res.updated and res.error is None]
@@ -0,0 +1,201 @@
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import pandas as pd
+import redis
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.dashboard.management.commands.stress_refresh_lock import check_fencing, race_lock
+from apps.dashboard.models import LatestQuote, Portfolio, StockHolding, Ticker, TickerData, deposit, transaction
+from apps.dashboard.services.dashboard import calculate_dashboard_holdings
+from apps.dashboard.services.dashboard_versions import bump_portfolio_versions
+from apps.dashboard.services.holdings_snapshot import SNAPSHOT_QUERY_BUDGET
+from apps.dashboard.services.ledger import replay_ledger
+from apps.dashboard.services.market_data import get_prices
+from apps.dashboard.services.performance import TXN_FIELDS, replay_positions
+from apps.dashboard.services.price_cache import price_cache
+from apps.dashboard.services.refresh_state import RedisRefreshState
+
+
+def make_portfolio_user(username, holdings, portfolios=2):
+    """User with `holdings` positions spread over `portfolios`, each quoted and paying a dividend."""
+    user = User.objects.create_user(username=username, password="x")
+    owned = [
+        Portfolio.objects.create(user=user, name=f"{username}-{i}", total_investment=1000, total_amount=500)
+        for i in range(portfolios)
+    ]
+    today = date.today()
+    for i in range(holdings):
+        code = f"{username[:3].upper()}{i}"
+        ticker = Ticker.objects.create(ticker=code)
+        LatestQuote.objects.create(
+            ticker=ticker, last_date=today, last_close=10 + i,
+            prev_date=today - timedelta(days=1), prev_close=9 + i,
+        )
+        holding = StockHolding.objects.create(
+            portfolio=owned[i % portfolios], company_symbol=code, company_name=code,
+            sector="Materials" if i % 2 else "Financials",
+            number_of_shares=10, investment_amount=100, total_cost=100, average_buy_price=10, LTP=10 + i,
+        )
+        transaction.objects.create(
+            Holding=holding, symbol=code, transaction_type="Buy",
+            Quantity=10, Buy_Price=10, Total=100, date_transaction=today - timedelta(days=30),
+        )
+        transaction.objects.create(
+            Holding=holding, symbol=code, transaction_type="Dividend Deposit",
+            Total=5, date_transaction=today - timedelta(days=10),
+        )
+    for portfolio in owned:
+        deposit.objects.create(portfolio=portfolio, total_amount=1000, currency="AUD")
+    return user
+
+
+class HoldingsQueryBudgetTests(TestCase):
+    """The holdings payload costs SNAPSHOT_QUERY_BUDGET queries whatever the number of positions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.few = make_portfolio_user("few", holdings=3)
+        cls.many = make_portfolio_user("many", holdings=60)
+
+    def assert_within_budget(self, user, portfolio_id):
+        with self.assertNumQueries(SNAPSHOT_QUERY_BUDGET):
+            payload = calculate_dashboard_holdings(user, portfolio_id)
+        return payload
+
+    def test_few_holdings(self):
+        payload = self.assert_within_budget(self.few, "all")
+        self.assertEqual(len(payload["holdings"]), 3)
+
+    def test_many_holdings(self):
+        payload = self.assert_within_budget(self.many, "all")
+        self.assertEqual(len(payload["holdings"]), 60)
+
+    def test_single_portfolio(self):
+        portfolio = Portfolio.objects.filter(user=self.many).order_by("id").first()
+        payload = self.assert_within_budget(self.many, str(portfolio.id))
+        self.assertEqual(len(payload["holdings"]), 30)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "holdings-view"}})
+class HoldingsViewQueryBudgetTests(TestCase):
+    """Through the view and dashboard_cache: a miss costs the snapshot budget, a hit no query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_portfolio_user("view", holdings=20)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch("apps.dashboard.api.views.portfolio.schedule_market_refresh_if_needed")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_holdings(self, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(reverse("dashboard_holdings"))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_miss_then_hit(self):
+        built = self.get_holdings(SNAPSHOT_QUERY_BUDGET)
+        self.assertEqual(self.get_holdings(0), built)
+
+    def test_version_bump_rebuilds(self):
+        self.get_holdings(SNAPSHOT_QUERY_BUDGET)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_portfolio_versions(Portfolio.objects.filter(user=self.user).values_list("id", flat=True))
+        self.get_holdings(SNAPSHOT_QUERY_BUDGET)
+
+
+class LedgerCashTests(SimpleTestCase):
+    """PositionLedger and PortfolioNAV replay the same transactions to the same cash."""
+
+    TRANSACTIONS = [
+        ("AAA", date(2024, 1, 2), "Buy", 100, 10.0, 9.5, 1009.5),
+        ("BBB", date(2024, 1, 3), "Buy", 50, 20.0, 9.5, 1009.5),
+        ("AAA", date(2024, 1, 10), "Dividend Deposit", 0, 0.0, 0.0, 45.0),
+        ("BBB", date(2024, 1, 10), "Dividend Reinvestment", 2, 21.0, 0.0, 42.0),
+        ("AAA", date(2024, 1, 15), "Sell", 40, 12.0, 9.5, 470.5),
+        ("BBB", date(2024, 1, 17), "Dividend Deposit", 52, 0.5, 0.0, 26.0),
+        ("AAA", date(2024, 1, 22), "Sell", 60, 11.0, 9.5, 650.5),
+    ]
+
+    def test_cash_matches_on_every_day(self):
+        days = pd.bdate_range("2024-01-01", "2024-01-31")
+        replayed = replay_positions(days, self.TRANSACTIONS, [], pd.DataFrame(index=days))
+        nav_cash = replayed["CashValue"] - replayed["Value"] - replayed["CashDeposits"]
+
+        rows = [dict(zip(TXN_FIELDS, t), portfolio_id=1, id=i) for i, t in enumerate(self.TRANSACTIONS)]
+        entries = replay_ledger(rows)
+        for day in days:
+            ledger_cash = sum(
+                next((cash for d, _, _, cash in reversed(states) if d <= day.date()), 0.0)
+                for states in entries.values()
+            )
+            self.assertAlmostEqual(ledger_cash, nav_cash[day], places=6, msg=str(day.date()))
+        self.assertAlmostEqual(nav_cash.iloc[-1], -1009.5 - 1009.5 + 45.0 + 470.5 + 26.0 + 650.5)
+
+
+@override_settings(PRICE_CACHE_ENABLED=True, PRICE_STORE_BACKEND="db")
+class PriceCacheKeyTests(TestCase):
+    """get_prices caches by day, whatever time of day the bounds carry."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for code in ("AAA", "BBB"):
+            ticker = Ticker.objects.create(ticker=code)
+            TickerData.objects.bulk_create(
+                TickerData(ticker=ticker, date=date(2024, 1, 1) + timedelta(days=i), open=1, high=1, low=1, close=1, volume=1)
+                for i in range(30)
+            )
+
+    def setUp(self):
+        price_cache.clear()
+        self.addCleanup(price_cache.clear)
+
+    def test_datetimes_on_the_same_day_hit(self):
+        get_prices(["AAA", "BBB"], start=datetime(2024, 1, 5, 9, 30, 1, 5), end=datetime(2024, 1, 20, 9, 30, 1, 5))
+        hits = price_cache.hits
+        get_prices(["AAA", "BBB"], start=datetime(2024, 1, 5, 16, 2, 7, 9), end=datetime(2024, 1, 20, 16, 2, 7, 9))
+        get_prices(["AAA", "BBB"], start=date(2024, 1, 5), end=date(2024, 1, 20))
+        self.assertEqual(price_cache.hits, hits + 2)
+        self.assertEqual(price_cache.stats()["entries"], 1)
+
+
+class RedisRefreshLockTests(SimpleTestCase):
+    """The stress_refresh_lock race and fencing checks, on the configured Redis (skipped without one)."""
+
+    PREFIX = "pms:market-refresh:test"
+
+    def setUp(self):
+        client = redis.Redis.from_url(
+            getattr(settings, "MARKET_REFRESH_REDIS_URL", settings.REDIS_URL),
+            socket_timeout=2, socket_connect_timeout=2,
+        )
+        try:
+            client.ping()
+        except redis.RedisError as exc:
+            self.skipTest(f"Redis unavailable: {exc}")
+        self.state = RedisRefreshState(client, self.PREFIX)
+        self.clear()
+        self.addCleanup(self.clear)
+
+    def clear(self):
+        self.state.client.delete(self.state.lock_key, self.state.fence_key, self.state.state_key)
+
+    def test_one_holder_at_a_time(self):
+        acquisitions, max_holders, failures = race_lock(self.state, workers=16, attempts=20, hold_ms=2.0)
+        self.assertEqual(failures, [])
+        self.assertEqual(max_holders, 1)
+        self.assertGreater(acquisitions, 0)
+
+    def test_expired_holder_is_fenced_off(self):
+        self.assertEqual(check_fencing(self.state), [])
@@ -2,22 +2,17 @@
 
 from datetime import date, timedelta
 
+from apps.dashboard.services.trading_calendar import get_calendar
 
-def weekday_dates():
-    today = date.today()
-    
-    # If today is Saturday (5), go back to Friday (4)
-    if today.weekday() < 5:
-        today = today + timedelta(days=1)
-    # If today is Sunday (6), go back to Friday (4)
-    elif today.weekday() == 6:
-        today = today - timedelta(days=1)
-    
-    # Yesterday (ensuring it's also a weekday)
-    yesterday = today - timedelta(days=2)
-    if yesterday.weekday() == 5:  # Saturday
-        yesterday = yesterday - timedelta(days=1)
-    elif yesterday.weekday() == 6:  # Sunday
-        yesterday = yesterday - timedelta(days=2)
-    
-    return today, yesterday
+
+def weekday_dates(exchange: str = "ASX"):
+    """
+    Window covering the last two trading days, as (end, start): `end` is the
+    day after the most recent trading day (exclusive bound) and `start` is the
+    trading day before it.
+    """
+    calendar = get_calendar(exchange)
+    last = calendar.previous_trading_day(date.today(), inclusive=True)
+    yesterday = calendar.previous_trading_day(last)
+
+    return last + timedelta(days=1), yesterday
@@ -127,15 +127,84 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_TIMEZONE = "Australia/Sydney"
-CELERY_IMPORTS = ["apps.dashboard.tasks.market_tasks",]
+CELERY_IMPORTS = ["apps.dashboard.tasks.market_tasks", "apps.dashboard.tasks.metadata_tasks", "apps.dashboard.tasks.dashboard_tasks", "apps.dashboard.tasks.nav_tasks",]
 CELERY_BEAT_SCHEDULE = {
     "asx-market-window": {
         "task": "apps.dashboard.tasks.market_tasks.schedule_asx_market_check",
         # Run frequently during the trading day (and slightly around it) Mon-Fri
         "schedule": crontab(minute="*/15", hour="7-18", day_of_week="1-5"),
     },
+    "ticker-gap-backfill": {
+        "task": "apps.dashboard.tasks.market_tasks.backfill_ticker_gaps",
+        "schedule": crontab(minute=0, hour=6, day_of_week="6"),
+    },
+    # After the last post-close market check (hour 18)
+    "portfolio-nav-append": {
+        "task": "apps.dashboard.tasks.nav_tasks.append_daily_nav",
+        "schedule": crontab(minute=15, hour=19, day_of_week="1-5"),
+    },
 }
 CELERY_BEAT_MAX_LOOP_INTERVAL = 60
+
+# -----------------------------------------------------------------------------
+# Market data
+# -----------------------------------------------------------------------------
+
+# Per-process LRU in front of get_prices (apps.dashboard.services.price_cache)
+PRICE_CACHE_ENABLED = True
+PRICE_CACHE_MAX_BYTES = int(os.getenv("PRICE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Market-data source (apps.dashboard.services.providers): "yfinance" or
+# "replay" (offline fixtures from MARKET_DATA_FIXTURES_DIR, else synthetic series)
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+MARKET_DATA_FIXTURES_DIR = Path(os.getenv("MARKET_DATA_FIXTURES_DIR", BASE_DIR / "market_fixtures"))
+MARKET_DATA_REPLAY_LATENCY = float(os.getenv("MARKET_DATA_REPLAY_LATENCY", 0))  # seconds per call
+
+# Max symbols per multi-ticker provider download in refresh_ticker_history
+MARKET_DATA_BATCH_SIZE = int(os.getenv("MARKET_DATA_BATCH_SIZE", 50))
+
+# Concurrent provider fetches in ticker_sync (DB writes stay single-threaded).
+# The pool only beats one-at-a-time fetching while the rate limit is above
+# 1 / request latency; 8/s keeps 4 workers ahead for any request over 125ms
+# (a multi-ticker download takes far longer).
+MARKET_DATA_FETCH_CONCURRENCY = int(os.getenv("MARKET_DATA_FETCH_CONCURRENCY", 4))
+MARKET_DATA_RATE_LIMIT = float(os.getenv("MARKET_DATA_RATE_LIMIT", 8.0))  # requests/sec
+MARKET_DATA_FETCH_TIMEOUT = float(os.getenv("MARKET_DATA_FETCH_TIMEOUT", 30))  # seconds
+
+# Gaps separated by at most this many trading days are fetched as one window
+BACKFILL_MERGE_GAP_DAYS = int(os.getenv("BACKFILL_MERGE_GAP_DAYS", 5))
+
+# Exchange closures not derivable from rules (apps.dashboard.services.trading_calendar),
+# e.g. PSX Eid holidays: {"PSX": ["2026-03-20", "2026-03-21"]}
+TRADING_CALENDAR_EXTRA_HOLIDAYS = {}
+
+# get_prices backend: "db" (TickerData / TickerRollup) or "file" (memory-mapped
+# .npy columns under PRICE_STORE_DIR, see apps.dashboard.services.price_store).
+# The worker writes the store and the backend reads it, so both need the same
+# PRICE_STORE_DIR (the `price_store` volume in docker-compose.yml).
+PRICE_STORE_BACKEND = os.getenv("PRICE_STORE_BACKEND", "db")
+PRICE_STORE_DIR = Path(os.getenv("PRICE_STORE_DIR", BASE_DIR / "price_store"))
+
+# Market-refresh lock / last-refresh state (apps.dashboard.services.refresh_state):
+# "redis" (SET NX PX lock with fencing tokens) or "db" (MarketRefreshState row lock).
+# With "redis" the MarketRefreshState row is only written as an audit trail.
+MARKET_REFRESH_STATE_BACKEND = os.getenv("MARKET_REFRESH_STATE_BACKEND", "redis")
+MARKET_REFRESH_REDIS_URL = os.getenv("MARKET_REFRESH_REDIS_URL", REDIS_URL)
+MARKET_REFRESH_REDIS_PREFIX = os.getenv("MARKET_REFRESH_REDIS_PREFIX", "pms:market-refresh")
+
+# Snapshot fan-out: symbols per refresh_snapshot_chunk subtask and its time limits (seconds)
+MARKET_SNAPSHOT_CHUNK_SIZE = int(os.getenv("MARKET_SNAPSHOT_CHUNK_SIZE", 25))
+MARKET_SNAPSHOT_CHUNK_SOFT_TIME_LIMIT = int(os.getenv("MARKET_SNAPSHOT_CHUNK_SOFT_TIME_LIMIT", 120))
+MARKET_SNAPSHOT_CHUNK_TIME_LIMIT = int(os.getenv("MARKET_SNAPSHOT_CHUNK_TIME_LIMIT", 150))
+
+# Request-path refresh scheduling enqueues at most one snapshot per window (seconds)
+MARKET_REFRESH_DEBOUNCE_SECS = int(os.getenv("MARKET_REFRESH_DEBOUNCE_SECS", 15 * 60))
+
+# Cached dashboard payloads (apps.dashboard.services.dashboard_cache); after each
+# snapshot they are precomputed for users who logged in within the warm-up window
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 6 * 60 * 60))  # seconds
+DASHBOARD_WARMUP_ACTIVE_DAYS = int(os.getenv("DASHBOARD_WARMUP_ACTIVE_DAYS", 7))
+
 # -----------------------------------------------------------------------------
 # Static / Media
 # -----------------------------------------------------------------------------
@@ -5,7 +5,7 @@ import DividendConfirmTable from './DashboardDividendPage';
 import { useEffect, useState, useRef, useMemo } from 'react';
 import { toast } from 'react-hot-toast';
 import { getCurrentUser } from "@/lib/auth";
-import { getDashboardHoldings, getPortfolioPerformance } from "@/services/api";
+import { getDashboardHoldings, getPortfolioPerformance, getTransactions } from "@/services/api";
 import PortfolioPerformanceChart from '@/components/charts/PortfolioPerformanceChart';
 import PortfolioValueChart from '@/components/charts/PortfolioValueChart';
 import SectorAllocationChart from '@/components/charts/SectorAllocationChart';
@@ -45,16 +45,35 @@ function loadScriptOnce(src, id) {
 
 /* ========= Stock Details Modal component ========= */
 
-function StockDetailsModal({ c, transactions }) {
+function StockDetailsModal({ c, portfolio }) {
   const modalId = `stockdetails-${c.CompanySymbol}`;
   const tvChartId = `tradingview_${c.CompanySymbol}`;
   const symbolInfoHostId = `tv_symbol_info_${c.CompanySymbol}`;
 
-  const holdingTxns = useMemo(() => {
-    return (transactions || []).filter(
-      (t) => String(t.Holding) === String(c.id)
-    );
-  }, [transactions, c.id]);
+  // Transactions are paged from the transactions endpoint when the modal opens
+  const [holdingTxns, setHoldingTxns] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [txnsLoading, setTxnsLoading] = useState(false);
+
+  const loadTransactions = async (cursor = null) => {
+    setTxnsLoading(true);
+    try {
+      const page = await getTransactions({
+        portfolio: portfolio || ALL_PORTFOLIOS,
+        symbol: c.CompanySymbol,
+        cursor,
+      });
+      setHoldingTxns((prev) => (cursor ? [...prev, ...page.results] : page.results));
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      toast.error(err.message || 'Failed to load transactions');
+    } finally {
+      setTxnsLoading(false);
+    }
+  };
+
+  const loadTransactionsRef = useRef(loadTransactions);
+  loadTransactionsRef.current = loadTransactions;
 
   useEffect(() => {
     if (typeof window === 'undefined') return;
@@ -62,6 +81,8 @@ function StockDetailsModal({ c, transactions }) {
     if (!modalEl) return;
 
     const onShown = async () => {
+      loadTransactionsRef.current();
+
       // 1) Symbol info widget (external-embedding)
       const symbolInfoHost = document.getElementById(symbolInfoHostId);
       if (symbolInfoHost) {
@@ -251,6 +272,19 @@ function StockDetailsModal({ c, transactions }) {
                   </tbody>
                 </table>
               </div>
+
+              {(nextCursor || txnsLoading) && (
+                <div className="text-center mt-2">
+                  <button
+                    type="button"
+                    className="btn btn-sm btn-outline-secondary"
+                    disabled={txnsLoading}
+                    onClick={() => loadTransactions(nextCursor)}
+                  >
+                    {txnsLoading ? 'Loading...' : 'Load more'}
+                  </button>
+                </div>
+              )}
             </div>
 
             <div className="col-12 justify-content-center">
@@ -576,7 +610,6 @@ export default function DashboardPageClient() {
   const filteredHoldings = showOpenOnly
     ? holdings.filter((h) => h["NumberShares"] > 0)
     : holdings;
-  const transactions = summary.transactions || [];
 
   const performanceTitle =
     valueMode === 'Value'
@@ -1164,7 +1197,7 @@ export default function DashboardPageClient() {
         <div className="row">
 
         {filteredHoldings.map((c) => (
-          <StockDetailsModal key={`modal-${c.id || c.CompanySymbol}`} c={c} transactions={transactions} />
+          <StockDetailsModal key={`modal-${c.id || c.CompanySymbol}`} c={c} portfolio={selectedPortfolio} />
         ))}
 
           {/* === Fetch Dividends Modal === */}
@@ -1,4 +1,6 @@
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL || 'http://localhost:8000';
+// Points per chart series; longer histories are downsampled server-side
+const CHART_MAX_POINTS = 500;
 
 function getCookie(name) {
     if (typeof document === 'undefined') return null;
@@ -52,8 +54,19 @@ export async function getDashboardHoldings(portfolio = 'all') {
   }
 }
 
-export async function getPortfolioPerformance(timeframe = '3m', portfolio = 'all') {
-  const params = new URLSearchParams({ timeframe, portfolio });
+export function getTransactions({ portfolio = 'all', symbol, types = [], dateFrom, dateTo, cursor, pageSize } = {}) {
+  const params = new URLSearchParams({ portfolio });
+  if (symbol) params.set('symbol', symbol);
+  types.forEach((t) => params.append('type', t));
+  if (dateFrom) params.set('date_from', dateFrom);
+  if (dateTo) params.set('date_to', dateTo);
+  if (cursor) params.set('cursor', cursor);
+  if (pageSize) params.set('page_size', String(pageSize));
+  return apiFetch(`/api/v1/dashboard/transactions/?${params.toString()}`);
+}
+
+export async function getPortfolioPerformance(timeframe = '3m', portfolio = 'all', maxPoints = CHART_MAX_POINTS) {
+  const params = new URLSearchParams({ timeframe, portfolio, max_points: String(maxPoints) });
   return apiFetch(`/api/v1/dashboard/performance/?${params.toString()}`);
 }
 
@@ -62,11 +75,17 @@ export function getPortfolioInsights(portfolio = 'all') {
   return apiFetch(`/api/v1/dashboard/insights/?${params.toString()}`);
 }
 
-export function getPriceHistory(symbol, range = '1y') {
-  const params = new URLSearchParams({ symbol, range });
+export function getPriceHistory(symbol, range = '1y', maxPoints = CHART_MAX_POINTS) {
+  const params = new URLSearchParams({ symbol, range, max_points: String(maxPoints) });
   return apiFetch(`/api/v1/dashboard/prices/history/?${params.toString()}`);
 }
 
+export function getQuotes(symbols = []) {
+  const params = new URLSearchParams();
+  if (symbols.length) params.set('symbols', symbols.join(','));
+  return apiFetch(`/api/v1/dashboard/prices/quotes/?${params.toString()}`);
+}
+
 export function getUserPortfolios() {
   return apiFetch('/api/v1/dashboard/portfolios/');
 }